@@ -5,8 +5,45 @@ const BASE_URL = 'http://127.0.0.1:8090';
 class API {
     static baseUrl = BASE_URL;
 
+    // 按URL缓存带ETag的GET响应，重新请求时发送 If-None-Match
+    static etagCache = new Map();
+
+    static async conditionalGet(endpoint) {
+        const cached = this.etagCache.get(endpoint);
+        const response = await fetch(`${BASE_URL}${endpoint}`, {
+            headers: {
+                'Content-Type': 'application/json',
+                ...(cached ? { 'If-None-Match': cached.etag } : {})
+            }
+        });
+
+        // 数据未变化，直接使用本地缓存
+        if (response.status === 304 && cached) {
+            return cached;
+        }
+
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.detail || 'API request failed');
+        }
+
+        const result = {
+            data: await response.json(),
+            nextCursor: response.headers.get('X-Next-Cursor')
+        };
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            this.etagCache.set(endpoint, { etag, ...result });
+        }
+        return result;
+    }
+
     static async request(endpoint, options = {}) {
         try {
+            if (!options.method || options.method === 'GET') {
+                return (await this.conditionalGet(endpoint)).data;
+            }
+
             const response = await fetch(`${BASE_URL}${endpoint}`, {
                 ...options,
                 headers: {
@@ -27,6 +64,49 @@ class API {
         }
     }
 
+    // 分页列表请求：返回本页数据和下一页游标
+    static async getPage(endpoint, params = {}) {
+        const query = new URLSearchParams(
+            Object.entries(params).filter(([, value]) => value !== undefined && value !== null)
+        ).toString();
+        const { data, nextCursor } = await this.conditionalGet(`${endpoint}${query ? `?${query}` : ''}`);
+
+        return {
+            items: data,
+            nextCursor
+        };
+    }
+
+    // 沿游标取完全部分页，仅用于单个作者的论文等数量有限的集合
+    static async getAllPages(endpoint, params = {}) {
+        const items = [];
+        let cursor;
+        do {
+            const page = await this.getPage(endpoint, { ...params, cursor });
+            items.push(...page.items);
+            cursor = page.nextCursor;
+        } while (cursor);
+        return items;
+    }
+
+    static async getAuthors(params = {}) {
+        return this.getPage('/authors', params);
+    }
+
+    static async getPapers(params = {}) {
+        return this.getPage('/papers', params);
+    }
+
+    // 按标题前缀搜索论文（输入联想）
+    static async searchPapers(query, limit = 20) {
+        const params = new URLSearchParams({ q: query, limit, fields: 'id,title' });
+        return this.request(`/papers/search?${params}`);
+    }
+
+    static async getCitations(params = {}) {
+        return this.getPage('/citations', params);
+    }
+
     // 作者相关API`
     static async generateKeys() {
         return this.request('/auth/generate-keys', {
@@ -127,6 +207,13 @@ class API {
     static async getTokenStats() {
         return this.request('/stats/tokens');
     }
+
+    // 订阅按时间窗口合并的统计增量（SSE），断线后由浏览器自动重连
+    static subscribeStats(onDelta, coalesce = 2) {
+        const source = new EventSource(`${BASE_URL}/events/stream?coalesce=${coalesce}`);
+        source.addEventListener('stats_delta', (event) => onDelta(JSON.parse(event.data)));
+        return source;
+    }
 }
 
 // 导出API类
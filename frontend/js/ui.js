@@ -5,6 +5,7 @@ class UI {
         this.modalContent = document.getElementById('modalContent');
         this.closeModalBtn = document.querySelector('.close');
         this.currentUser = null;
+        this.listCursors = {};  // 各分页列表下一页的游标
         this.setupEventListeners();
     }
 
@@ -85,6 +86,15 @@ class UI {
 
         // 更新图表
         this.updateCitationNetworkChart(networkStats);
+
+        // 实时更新统计卡片，无需轮询
+        if (!this.statsSource) {
+            this.statsSource = API.subscribeStats((delta) => {
+                document.getElementById('totalPapers').textContent = delta.totals.total_papers;
+                document.getElementById('totalCitations').textContent = delta.totals.total_citations;
+                document.getElementById('totalTokens').textContent = delta.totals.total_supply.toFixed(4);
+            });
+        }
     }
 
     // 更新引用网络图表
@@ -200,8 +210,9 @@ class UI {
                     <select id="citingPaper" required></select>
                 </div>
                 <div class="form-group">
-                    <label for="citedPaper">Cited Paper</label>
-                    <select id="citedPaper" required></select>
+                    <label for="citedPaperSearch">Cited Paper</label>
+                    <input type="text" id="citedPaperSearch" placeholder="Search by title..." autocomplete="off">
+                    <select id="citedPaper" size="6" required></select>
                 </div>
                 <button type="submit" class="btn-primary">Create Citation</button>
             </form>
@@ -294,6 +305,7 @@ class UI {
                         <select id="existingAuthors" class="form-control">
                             <option value="">Select an author...</option>
                         </select>
+                        <button type="button" id="moreAuthorsBtn" class="btn-primary" style="margin-top: 10px; display: none;">Load More Authors</button>
                         <button id="selectAuthorBtn" class="btn-primary" style="margin-top: 10px;">Connect Selected Author</button>
                     </div>
                     <div class="option-section" style="margin-top: 20px;">
@@ -310,13 +322,21 @@ class UI {
             `;
             this.showModal(content);
 
-            // 加载现有作者列表
-            const authors = await API.request('/authors');
-            const select = document.getElementById('existingAuthors');
-            select.innerHTML = '<option value="">Select an author...</option>' + 
-                authors.map(author => 
-                    `<option value="${author.id}">${author.name}</option>`
-                ).join('');
+            // 加载现有作者列表，其余分页按需追加
+            let authorsCursor;
+            const moreAuthorsBtn = document.getElementById('moreAuthorsBtn');
+            const loadAuthorOptions = async () => {
+                const { items: authors, nextCursor } = await API.getAuthors({ limit: 200, fields: 'id,name', cursor: authorsCursor });
+                document.getElementById('existingAuthors').insertAdjacentHTML('beforeend',
+                    authors.map(author => 
+                        `<option value="${author.id}">${author.name}</option>`
+                    ).join(''));
+                authorsCursor = nextCursor;
+                moreAuthorsBtn.style.display = nextCursor ? '' : 'none';
+            };
+            moreAuthorsBtn.addEventListener('click', () => loadAuthorOptions().catch(
+                error => this.showError('Failed to load authors: ' + error.message)));
+            await loadAuthorOptions();
 
             // 处理选择现有作者
             document.getElementById('selectAuthorBtn').addEventListener('click', async () => {
@@ -454,18 +474,41 @@ class UI {
         setTimeout(() => toast.remove(), 3000);
     }
 
+    // 渲染分页列表：append为true时沿上一页的游标追加，还有下一页时在列表后显示“加载更多”
+    async renderPagedList(containerId, fetchPage, renderItem, append, loadMore) {
+        const container = document.getElementById(containerId);
+        const { items, nextCursor } = await fetchPage(append ? this.listCursors[containerId] : undefined);
+        const html = items.map(renderItem).join('');
+        if (append) {
+            container.insertAdjacentHTML('beforeend', html);
+        } else {
+            container.innerHTML = html;
+        }
+        this.listCursors[containerId] = nextCursor;
+
+        let moreBtn = document.getElementById(`${containerId}More`);
+        if (!moreBtn) {
+            moreBtn = document.createElement('button');
+            moreBtn.id = `${containerId}More`;
+            moreBtn.className = 'btn-primary';
+            moreBtn.textContent = 'Load More';
+            moreBtn.style.marginTop = '20px';
+            moreBtn.addEventListener('click', loadMore);
+            container.after(moreBtn);
+        }
+        moreBtn.style.display = nextCursor ? '' : 'none';
+    }
+
     // 加载作者数据
-    async loadAuthorsData() {
+    async loadAuthorsData(append = false) {
         try {
-            const authors = await API.request('/authors');
-            const container = document.getElementById('authorsGrid');
-            
-            container.innerHTML = authors.map(author => `
+            await this.renderPagedList('authorsGrid',
+                cursor => API.getAuthors({ limit: 50, order: 'desc', cursor }),
+                author => `
                 <div class="author-card">
                     <h3>${author.name}</h3>
                     <div class="author-info">
                         <p><strong>ID:</strong> ${author.id}</p>
-                        <p><strong>Public Key:</strong> ${author.public_key.substring(0, 20)}...</p>
                         <p><strong>Created:</strong> ${new Date(author.created_at).toLocaleString()}</p>
                     </div>
                     <div class="author-actions">
@@ -474,19 +517,18 @@ class UI {
                         </button>
                     </div>
                 </div>
-            `).join('');
+            `, append, () => this.loadAuthorsData(true));
         } catch (error) {
             this.showError('Failed to load authors: ' + error.message);
         }
     }
 
     // 加载论文数据
-    async loadPapersData() {
+    async loadPapersData(append = false) {
         try {
-            const papers = await API.request('/papers');
-            const container = document.getElementById('papersList');
-            
-            container.innerHTML = papers.map(paper => `
+            await this.renderPagedList('papersList',
+                cursor => API.getPapers({ limit: 50, order: 'desc', fields: 'id,title,authors,citations,created_at', cursor }),
+                paper => `
                 <div class="paper-card">
                     <h3>${paper.title}</h3>
                     <div class="paper-info">
@@ -501,19 +543,18 @@ class UI {
                         </button>
                     </div>
                 </div>
-            `).join('');
+            `, append, () => this.loadPapersData(true));
         } catch (error) {
             this.showError('Failed to load papers: ' + error.message);
         }
     }
 
     // 加载引用数据
-    async loadCitationsData() {
+    async loadCitationsData(append = false) {
         try {
-            const citations = await API.request('/citations');
-            const container = document.getElementById('citationsList');
-            
-            container.innerHTML = citations.map(citation => `
+            await this.renderPagedList('citationsList',
+                cursor => API.getCitations({ limit: 50, order: 'desc', cursor }),
+                citation => `
                 <div class="citation-card">
                     <div class="citation-info">
                         <p><strong>ID:</strong> ${citation.id}</p>
@@ -527,7 +568,7 @@ class UI {
                         </button>
                     </div>
                 </div>
-            `).join('');
+            `, append, () => this.loadCitationsData(true));
         } catch (error) {
             this.showError('Failed to load citations: ' + error.message);
         }
@@ -557,17 +598,40 @@ class UI {
 
     // 加载论文列表（用于创建引用）
     async loadPapersForCitation() {
+        const citingSelect = document.getElementById('citingPaper');
+        const citedSelect = document.getElementById('citedPaper');
+        const searchInput = document.getElementById('citedPaperSearch');
+        const toOptions = list => list.map(paper => 
+            `<option value="${paper.id}">${paper.title}</option>`
+        ).join('');
+
+        // 被引论文按标题前缀联想搜索，输入为空时列出被引次数最多的论文
+        let searchSeq = 0;
+        let searchTimer = null;
+        const searchCited = async () => {
+            const seq = ++searchSeq;
+            const query = searchInput.value.trim();
+            const papers = query
+                ? await API.searchPapers(query, 20)
+                : (await API.getPapers({ sort: 'citation_count', order: 'desc', limit: 20, fields: 'id,title' })).items;
+            // 忽略已被更新输入取代的响应
+            if (seq === searchSeq) {
+                citedSelect.innerHTML = toOptions(papers);
+            }
+        };
+        searchInput.addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => searchCited().catch(
+                error => this.showError('Failed to search papers: ' + error.message)), 250);
+        });
+
         try {
-            const papers = await API.request('/papers');
-            const citingSelect = document.getElementById('citingPaper');
-            const citedSelect = document.getElementById('citedPaper');
-            
-            const options = papers.map(paper => 
-                `<option value="${paper.id}">${paper.title}</option>`
-            ).join('');
-            
-            citingSelect.innerHTML = options;
-            citedSelect.innerHTML = options;
+            // 引用论文只能是当前作者的论文，单个作者的论文数量有限，取完全部分页
+            const [ownPapers] = await Promise.all([
+                API.getAllPages('/papers', { author_id: this.currentUser.id, limit: 200, order: 'desc', fields: 'id,title' }),
+                searchCited()
+            ]);
+            citingSelect.innerHTML = toOptions(ownPapers);
         } catch (error) {
             this.showError('Failed to load papers for citation: ' + error.message);
         }
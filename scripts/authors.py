@@ -0,0 +1,152 @@
+"""
+作者目录
+从 AuthorToken 的 AuthorRegistered 日志增量发现已注册作者，
+新作者和已扫描到的区块号以JSON行追加写入本地日志，启动时重放并压缩冗余记录。
+"""
+
+import json
+import os
+from web3 import Web3
+
+# 每次 eth_getLogs 查询的最大区块数
+DISCOVERY_RANGE = 10000
+
+# 没有发现新作者时，检查点至少前进这么多区块才写入日志；重启后最多重新扫描这么多区块
+CHECKPOINT_INTERVAL = 1000
+
+
+class AuthorDirectory:
+    """追加写入的作者目录，记录按注册顺序排列的作者地址和扫描检查点"""
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path  # 旧版 registered_authors.json，只在首次启动时读取
+        self.authors = []
+        self._known = set()
+        self.checkpoint = -1  # 已扫描到的区块号
+        self._persisted = -1  # 日志中记录的检查点，内存中的检查点可能领先于它
+
+    def load(self):
+        if os.path.exists(self.path):
+            applied = 0
+            with open(self.path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 进程中断可能留下不完整的最后一行
+                        continue
+                    self._apply(record)
+                    applied += 1
+            self._persisted = self.checkpoint
+            if applied > len(self.authors) + 1:
+                self._compact()
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            with open(self.legacy_path, 'r') as f:
+                legacy_authors = json.load(f).get('authors', [])
+            self.record(legacy_authors)
+        print(f"已加载 {len(self.authors)} 个已注册作者")
+
+    def _apply(self, record):
+        author = record.get('author')
+        if author and author not in self._known:
+            self._known.add(author)
+            self.authors.append(author)
+        if 'checkpoint' in record:
+            self.checkpoint = max(self.checkpoint, record['checkpoint'])
+        if 'rewind' in record:
+            self.checkpoint = record['rewind']
+
+    def _compact(self):
+        """把日志重写为每个作者一行加一个检查点，写入临时文件后原子替换"""
+        records = [{'author': author} for author in self.authors]
+        if self.checkpoint >= 0:
+            records.append({'checkpoint': self.checkpoint})
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def _append(self, records):
+        with open(self.path, 'a') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+        for record in records:
+            self._apply(record)
+
+    def record(self, authors, checkpoint=None):
+        """追加新作者；checkpoint 表示该区块及之前的注册事件已全部扫描"""
+        records = [{'author': author} for author in dict.fromkeys(authors) if author not in self._known]
+        if checkpoint is not None and checkpoint > self.checkpoint:
+            if records or checkpoint - self._persisted >= CHECKPOINT_INTERVAL:
+                records.append({'checkpoint': checkpoint})
+                self._persisted = checkpoint
+            else:
+                # 链头只前进了少量区块且没有新作者：只更新内存中的检查点
+                self.checkpoint = checkpoint
+        if not records:
+            return []
+        self._append(records)
+        return [record['author'] for record in records if 'author' in record]
+
+    def rewind(self, block_number):
+        """链被重置（检查点超过链头）时从指定区块之后重新扫描"""
+        self._append([{'rewind': block_number}])
+        self._persisted = block_number
+
+    def __contains__(self, author):
+        return author in self._known
+
+    def __len__(self):
+        return len(self.authors)
+
+    def __iter__(self):
+        return iter(list(self.authors))
+
+
+def registration_filter(entry, from_block, to_block):
+    return {
+        'fromBlock': from_block,
+        'toBlock': to_block,
+        'address': entry.address,
+        'topics': [Web3.to_hex(entry.topics['AuthorRegistered'])]
+    }
+
+
+def authors_from_logs(logs):
+    """AuthorRegistered(address indexed author)：作者地址在第二个主题中"""
+    return [Web3.to_checksum_address('0x' + Web3.to_hex(log['topics'][1])[-40:]) for log in logs]
+
+
+def discover_authors(w3, directory, entry):
+    """同步 Web3：从检查点之后扫描注册事件，返回新发现的作者"""
+    latest = w3.eth.block_number
+    if directory.checkpoint > latest:
+        directory.rewind(-1)
+    discovered = []
+    start = directory.checkpoint + 1
+    while start <= latest:
+        end = min(latest, start + DISCOVERY_RANGE - 1)
+        logs = w3.eth.get_logs(registration_filter(entry, start, end))
+        discovered.extend(directory.record(authors_from_logs(logs), end))
+        start = end + 1
+    return discovered
+
+
+async def discover_authors_async(w3, directory, entry):
+    """AsyncWeb3 版本的 discover_authors"""
+    latest = await w3.eth.block_number
+    if directory.checkpoint > latest:
+        directory.rewind(-1)
+    discovered = []
+    start = directory.checkpoint + 1
+    while start <= latest:
+        end = min(latest, start + DISCOVERY_RANGE - 1)
+        logs = await w3.eth.get_logs(registration_filter(entry, start, end))
+        discovered.extend(directory.record(authors_from_logs(logs), end))
+        start = end + 1
+    return discovered
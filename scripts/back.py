@@ -1,95 +1,166 @@
-import json
+import asyncio
+import contextlib
 import os
-from web3 import Web3
+import aiohttp
+from web3 import AsyncWeb3, Web3
 from eth_account import Account
 from eth_account.messages import encode_defunct
+from authors import AuthorDirectory, discover_authors_async
+from gas import AsyncGasOracle
+from indexer import EventIndexer
+from nonces import AsyncNonceManager, signer_account
+from registry import ContractRegistry
+from rpc_batch import AsyncBatchReader, ContractCall, RPCError
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
 
 app = FastAPI()
 
-# 连接到本地Hardhat节点
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+# 连接到本地Hardhat节点：异步provider，所有RPC请求共享一个aiohttp会话（启动时创建）
+NODE_URL = 'http://127.0.0.1:8545'
+w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(NODE_URL))
 
-# 检查连接
-if not w3.is_connected():
-    print("未能连接到以太坊节点！")
-    exit(1)
+# 与节点之间的最大并发连接数
+RPC_MAX_CONNECTIONS = int(os.environ.get('RPC_MAX_CONNECTIONS', '200'))
 
-print(f"已连接到以太坊节点，当前区块号: {w3.eth.block_number}")
+http_session = None
 
 # 数据文件路径
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-AUTHORS_FILE = os.path.join(DATA_DIR, 'registered_authors.json')
+DATA_DIR = os.environ.get('DATA_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+AUTHORS_FILE = os.path.join(DATA_DIR, 'registered_authors.json')  # 旧版作者列表，只在首次启动时读取
+AUTHORS_LOG = os.path.join(DATA_DIR, 'authors.log')
 
 # 确保数据目录存在
 os.makedirs(DATA_DIR, exist_ok=True)
 
-# 全局变量：存储所有注册过的作者地址
-registered_authors = set()
-
-def load_registered_authors():
-    global registered_authors
-    try:
-        if os.path.exists(AUTHORS_FILE):
-            with open(AUTHORS_FILE, 'r') as f:
-                data = json.load(f)
-                registered_authors = set(data.get('authors', []))
-                print(f"已加载 {len(registered_authors)} 个已注册作者")
-    except Exception as e:
-        print(f"加载已注册作者信息时出错: {str(e)}")
-        registered_authors = set()
-
-# 保存已注册作者信息
-def save_registered_authors():
-    try:
-        data = {
-            'authors': list(registered_authors),
-            'last_updated': w3.eth.get_block('latest').timestamp
-        }
-        with open(AUTHORS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        print(f"保存已注册作者信息时出错: {str(e)}")
-
-# 在脚本启动时加载已注册作者信息
-load_registered_authors()
-
-# 加载合约ABI
-def load_contract(contract_name):
-    # 合约地址（使用刚才部署的地址）
-    contract_addresses = {
-        'AuthorToken': '0x5FbDB2315678afecb367f032d93F642f64180aa3',
-        'CitationNetwork': '0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0',
-        'ProfitDistribution': '0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9',
-        'IdentityManagement': '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512'
-    }
-    
-    # 加载ABI
-    artifacts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'artifacts/contracts')
-    contract_json_path = os.path.join(artifacts_dir, f"{contract_name}.sol/{contract_name}.json")
+# 作者目录：由 AuthorRegistered 事件增量发现，新作者追加写入 authors.log
+author_directory = AuthorDirectory(AUTHORS_LOG, legacy_path=AUTHORS_FILE)
+author_directory.load()
+
+# 合约注册表：ABI只加载一次，地址来自部署清单（可用 CONTRACT_MANIFEST 指定路径）
+# AsyncWeb3 无法同步查询链ID，注册表在启动时创建
+contract_registry = None
+
+# 只读调用的批量读取器，RPC_BATCH_SIZE 为每个批量请求包含的调用数
+batch_reader = AsyncBatchReader(NODE_URL, chunk_size=int(os.environ.get('RPC_BATCH_SIZE', '100')))
+
+# 链上事件索引：只读接口默认从本地索引读取，READ_FROM_INDEX=0 时始终直接调用合约
+INDEXER_ENABLED = os.environ.get('INDEXER_ENABLED', '1') != '0'
+READ_FROM_INDEX = os.environ.get('READ_FROM_INDEX', '1') != '0'
+INDEXER_START_BLOCK = int(os.environ.get('INDEXER_START_BLOCK', '0'))
+INDEXER_CONFIRMATIONS = int(os.environ.get('INDEXER_CONFIRMATIONS', '0'))
+indexer = None
+# 本进程已确认的写交易所在的最高区块；索引追上该区块前读取回退到合约调用，保证能读到自己的写入
+latest_write_block = -1
+
+# 索引已追上链头且包含最近一次写入时才从索引读取，否则回退到直接调用合约
+def index_ready():
+    return READ_FROM_INDEX and indexer is not None and indexer.covers(latest_write_block)
+
+def note_write(receipts):
+    global latest_write_block
+    for receipt in receipts:
+        latest_write_block = max(latest_write_block, receipt['blockNumber'])
+
+@app.on_event("startup")
+async def connect_node():
+    global http_session, contract_registry, indexer
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=RPC_MAX_CONNECTIONS),
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+    await w3.provider.cache_async_session(http_session)
+    batch_reader.session = http_session
     
-    try:
-        with open(contract_json_path, 'r') as f:
-            contract_json = json.load(f)
-            contract_abi = contract_json['abi']
-    except FileNotFoundError:
-        print(f"找不到合约ABI文件: {contract_json_path}")
-        return None
+    # 检查连接
+    if not await w3.is_connected():
+        raise RuntimeError("未能连接到以太坊节点！")
     
-    # 获取合约地址
-    contract_address = contract_addresses.get(contract_name)
-    if not contract_address:
-        print(f"警告: {contract_name}合约地址未设置")
-        return None
+    contract_registry = ContractRegistry(w3, chain_id=await w3.eth.chain_id)
+    print(f"已连接到以太坊节点，当前区块号: {await w3.eth.block_number}")
+    
+    # 从上次的检查点继续发现新注册的作者
+    discovered = await discover_authors_async(w3, author_directory, contract_registry.entry('AuthorToken'))
+    print(f"发现 {len(discovered)} 个新注册作者，共 {len(author_directory)} 个")
+    
+    if INDEXER_ENABLED:
+        index_file = os.environ.get('INDEX_DB_FILE') or os.path.join(DATA_DIR, f'chain_index_{contract_registry.chain_id}.db')
+        indexer = EventIndexer(w3, contract_registry, index_file,
+                               start_block=INDEXER_START_BLOCK, confirmations=INDEXER_CONFIRMATIONS)
+        await indexer.open()
+        indexer.start()
+
+@app.on_event("shutdown")
+async def close_node():
+    # 先发送尚未执行的 PageRank 更新，再关闭会话
+    await pagerank_updater.close()
+    if indexer is not None:
+        await indexer.close()
+    if http_session is not None:
+        await http_session.close()
+
+# 按账户在本地分配nonce，同一账户的交易可以连续发送
+nonce_manager = AsyncNonceManager(w3)
+
+# gas价格按区块缓存，gas上限按函数和参数形状缓存估算值；GAS_MARGIN 为估算值的安全余量
+gas_oracle = AsyncGasOracle(w3, margin=float(os.environ.get('GAS_MARGIN', '1.2')),
+                            price_ttl=float(os.environ.get('GAS_PRICE_TTL', '2')),
+                            state_ttl=float(os.environ.get('GAS_STATE_TTL', '10')))
+
+# 加载合约
+def load_contract(contract_name):
+    return contract_registry.contract(contract_name)
+
+# 签名并发送合约交易，不等待回执，返回交易哈希
+# gas 为估算失败时使用的gas上限；retry 为True时交易因gas耗尽失败会重新估算并重发一次
+# private_key 也可以是账户对象，重发信息中只保存账户对象，不保存私钥字符串
+async def submit_transaction(private_key, function_call, gas, retry=True):
+    account = signer_account(private_key)
+    gas_price, gas_limit = await asyncio.gather(
+        gas_oracle.gas_price(),
+        gas_oracle.gas_limit(function_call, account.address, gas)
+    )
     
-    # 创建合约实例
-    contract = w3.eth.contract(address=contract_address, abi=contract_abi)
-    return contract
+    async def build(nonce):
+        return await function_call.build_transaction({
+            'from': account.address,
+            'nonce': nonce,
+            'gas': gas_limit,
+            'gasPrice': gas_price
+        })
+    
+    tx_hash = await nonce_manager.send(account, build)
+    gas_oracle.track(tx_hash, function_call, account.address, gas_limit, (account, function_call, gas) if retry else None)
+    return tx_hash
+
+# 并发等待一组交易的回执，并用实际gas用量修正估算；gas耗尽的交易重发一次，返回重发交易的回执
+async def wait_for_receipts(tx_hashes):
+    receipts = await nonce_manager.wait_for_receipts(tx_hashes)
+    retries = {}
+    for index, receipt in enumerate(receipts):
+        retry = gas_oracle.observe_receipt(receipt)
+        if retry is not None:
+            retries[index] = retry
+    if retries:
+        resent = {}
+        for index, (account, function_call, gas) in retries.items():
+            print(f"交易 {Web3.to_hex(receipts[index]['transactionHash'])} gas耗尽，重新估算后重发")
+            resent[index] = await submit_transaction(account, function_call, gas, retry=False)
+        for index, receipt in zip(resent, await nonce_manager.wait_for_receipts(list(resent.values()))):
+            gas_oracle.observe_receipt(receipt)
+            receipts[index] = receipt
+    note_write(receipts)
+    return receipts
+
+# 签名并发送合约交易，等待回执
+async def send_transaction(private_key, function_call, gas):
+    tx_hash = await submit_transaction(private_key, function_call, gas)
+    receipt, = await wait_for_receipts([tx_hash])
+    return tx_hash, receipt
 
 # 创建账户或加载现有账户
-def get_account(private_key=None):
+async def get_account(private_key=None):
     if private_key:
         if isinstance(private_key, str):
             return Account.from_key(private_key)
@@ -104,18 +175,21 @@ def get_account(private_key=None):
         
         # 从测试账户转账一些 ETH
         test_account = Account.from_key("0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80")
-        nonce = w3.eth.get_transaction_count(test_account.address)
-        tx = {
-            'from': test_account.address,
-            'to': acct.address,
-            'value': Web3.to_wei(1, 'ether'),  # 转账 1 ETH
-            'nonce': nonce,
-            'gas': 21000,
-            'gasPrice': w3.eth.gas_price
-        }
-        signed_tx = w3.eth.account.sign_transaction(tx, test_account.key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        gas_price = await gas_oracle.gas_price()
+        
+        async def build(nonce):
+            return {
+                'from': test_account.address,
+                'to': acct.address,
+                'value': Web3.to_wei(1, 'ether'),  # 转账 1 ETH
+                'nonce': nonce,
+                'gas': 21000,
+                'gasPrice': gas_price,
+                'chainId': contract_registry.chain_id
+            }
+        
+        tx_hash = await nonce_manager.send(test_account.key, build)
+        receipt = await w3.eth.wait_for_transaction_receipt(tx_hash)
         
         if receipt.status == 1:
             print(f"已向新账户转账 1 ETH")
@@ -128,33 +202,39 @@ def get_account(private_key=None):
 def is_valid_address(address):
     return Web3.is_address(address) and Web3.is_checksum_address(address)
 
-def check_contract_deployed(contract):
+async def check_contract_deployed(contract):
+    # 已确认部署的合约不再重复检查
+    entry = contract_registry.entry_for_address(contract.address)
+    if entry is not None and entry.deployed:
+        return True
     try:
         # 尝试获取合约代码
-        code = w3.eth.get_code(contract.address)
+        code = await w3.eth.get_code(contract.address)
         if len(code) <= 2:  # 0x 前缀
             return False
             
         # 尝试调用合约的任意函数
         if hasattr(contract.functions, 'owner'):
-            contract.functions.owner().call()
+            await contract.functions.owner().call()
         elif hasattr(contract.functions, 'getAuthorInfo'):
-            contract.functions.getAuthorInfo(contract.address).call()
+            await contract.functions.getAuthorInfo(contract.address).call()
         elif hasattr(contract.functions, 'getAuthorLineage'):
-            contract.functions.getAuthorLineage(contract.address).call()
+            await contract.functions.getAuthorLineage(contract.address).call()
         elif hasattr(contract.functions, 'getDistributionInfo'):
-            contract.functions.getDistributionInfo(contract.address).call()
+            await contract.functions.getDistributionInfo(contract.address).call()
+        if entry is not None:
+            entry.deployed = True
         return True
     except Exception as e:
         print(f"合约检查失败: {str(e)}")
         return False
 
-def check_balance(address):
-    balance = w3.eth.get_balance(address)
+async def check_balance(address):
+    balance = await w3.eth.get_balance(address)
     return balance > Web3.to_wei(0.1, 'ether')  # 确保有至少0.1 ETH
 
 # 作者注册
-def register_author(private_key):
+async def register_author(private_key):
     # 确保 private_key 是字符串
     if not isinstance(private_key, str):
         print("错误：无效的私钥格式")
@@ -168,84 +248,146 @@ def register_author(private_key):
         print("错误：无法加载合约")
         return False
         
-    if not check_contract_deployed(author_token):
+    if not await check_contract_deployed(author_token):
         print("错误：合约未正确部署")
         return False
         
-    if not check_balance(account.address):
+    if not await check_balance(account.address):
         print("错误：账户余额不足")
         return False
     
     try:
         # 检查是否已注册
-        author_info = author_token.functions.getAuthorInfo(account.address).call()
+        author_info = await author_token.functions.getAuthorInfo(account.address).call()
         if author_info[3]:  # isRegistered
             print("错误：该地址已经注册为作者")
             return False
             
-        # 注册作者身份
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = author_token.functions.registerAuthor().build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        
-        if receipt.status == 1:
-            # 注册成功，添加到已注册作者集合中并保存
-            registered_authors.add(account.address)
-            save_registered_authors()  # 保存到文件
-            print(f"作者注册交易哈希: {tx_hash.hex()}")
-            print(f"交易状态: 成功")
-        else:
-            print(f"作者注册交易哈希: {tx_hash.hex()}")
-            print(f"交易状态: 失败")
-            return False
-        
-        # 生成公钥哈希并注册身份
+        # 生成公钥哈希
         message = f"Register author identity for {account.address}"
         message_hash = encode_defunct(text=message)
         signed_message = Account.sign_message(message_hash, private_key)
         # 将 r 和 s 转换为十六进制字符串
         r_hex = hex(signed_message.r)[2:].zfill(64)  # 确保64个字符
         s_hex = hex(signed_message.s)[2:].zfill(64)  # 确保64个字符
-        public_key_hash = w3.keccak(hexstr=r_hex + s_hex)
-        
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.registerIdentity(
-            public_key_hash,
-            f"ipfs://author/{account.address}"
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
+        public_key_hash = Web3.keccak(hexstr=r_hex + s_hex)
         
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        # 身份注册要在作者注册成功之后发送：作者注册失败时不应留下孤立的身份记录
+        author_tx_hash = await submit_transaction(private_key, author_token.functions.registerAuthor(), 2000000)
+        (author_receipt,) = await wait_for_receipts([author_tx_hash])
+        print(f"作者注册交易哈希: {author_tx_hash.hex()}")
+        if author_receipt.status != 1:
+            print(f"交易状态: 失败")
+            return False
+        # 注册成功，添加到已注册作者集合中并保存
+        author_directory.record([account.address])
+        print(f"交易状态: 成功")
         
-        print(f"身份注册交易哈希: {tx_hash.hex()}")
-        print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
+        try:
+            identity_tx_hash = await submit_transaction(private_key, identity_mgmt.functions.registerIdentity(
+                public_key_hash,
+                f"ipfs://author/{account.address}"
+            ), 2000000)
+            (identity_receipt,) = await wait_for_receipts([identity_tx_hash])
+            print(f"身份注册交易哈希: {identity_tx_hash.hex()}")
+            identity_error = None if identity_receipt.status == 1 else "交易失败"
+        except Exception as e:
+            identity_error = str(e)
+        if identity_error is not None:
+            print(f"部分失败：地址 {account.address} 已注册为作者，但身份注册未成功（{identity_error}），需要单独重新注册身份")
+            return False
+        print(f"交易状态: 成功")
         
         return True
     except Exception as e:
         print(f"注册作者时出错: {str(e)}")
         return False
 
+# PageRank 更新间隔（秒）：间隔内的多次引用只触发一次 updatePageRanks
+PAGERANK_INTERVAL = float(os.environ.get('PAGERANK_INTERVAL', '10'))
+
+class PageRankUpdater:
+    """合并 PageRank 更新：引用写入后只标记待更新，后台任务按间隔发送一次 updatePageRanks"""
+    
+    def __init__(self, interval):
+        self.interval = interval
+        self._private_key = None  # 待执行更新使用的账户私钥（合约所有者）
+        self._task = None
+        self._wakeup = None
+        self.updates = 0
+    
+    def schedule(self, private_key):
+        """标记需要更新（需在事件循环中调用）"""
+        self._private_key = private_key
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._wakeup.set()
+    
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.interval)
+            self._wakeup.clear()
+            await self.update_now()
+    
+    async def update_now(self):
+        private_key, self._private_key = self._private_key, None
+        if private_key is None:
+            return
+        author_token = load_contract('AuthorToken')
+        try:
+            tx_hash, receipt = await send_transaction(private_key, author_token.functions.updatePageRanks(
+                10,  # iterations: 迭代次数
+                85   # dampingFactor: 阻尼系数（0.85 * 100）
+            ), 5000000)  # 需要更多 gas
+            
+            if receipt.status == 1:
+                self.updates += 1
+                print("PageRank 得分已更新")
+            else:
+                print("PageRank 得分更新失败")
+        except Exception as e:
+            print(f"更新 PageRank 得分时出错: {str(e)}")
+    
+    async def close(self):
+        """停止后台任务并执行尚未发送的更新"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.update_now()
+
+pagerank_updater = PageRankUpdater(PAGERANK_INTERVAL)
+
 # 添加引用
-def add_citation1(private_key, cited_address, paper_hash):
+class CitationInconsistent(Exception):
+    """两个合约中只有一个成功写入了引用"""
+
+# 正在处理的引用 (引用者, 被引用者, 论文哈希)：同一引用的并发请求只放行第一个
+citations_in_flight = set()
+# (引用者, 被引用者) -> [锁, 使用数]
+citation_pair_locks = {}
+
+@contextlib.asynccontextmanager
+async def citation_pair_lock(citer, cited):
+    """同一对引用者和被引用者的引用依次写入：AuthorToken 的引用ID由 (引用者, 被引用者, 区块时间戳) 计算，
+    两次引用落在同一区块时后一笔交易会回滚"""
+    entry = citation_pair_locks.setdefault((citer, cited), [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del citation_pair_locks[(citer, cited)]
+
+async def add_citation1(private_key, cited_address, paper_hash):
     if not is_valid_address(cited_address):
         print("错误：无效的被引用者地址")
         return None
         
-    account = get_account(private_key)
+    account = await get_account(private_key)
     citation_network = load_contract('CitationNetwork')
     author_token = load_contract('AuthorToken')
     
@@ -253,97 +395,81 @@ def add_citation1(private_key, cited_address, paper_hash):
         print("错误：无法加载合约")
         return None
         
-    if not check_contract_deployed(citation_network) or not check_contract_deployed(author_token):
+    if not await check_contract_deployed(citation_network) or not await check_contract_deployed(author_token):
         print("错误：合约未正确部署")
         return None
-        
-    if not check_balance(account.address):
-        print("错误：账户余额不足")
+    
+    in_flight_key = (account.address, Web3.to_checksum_address(cited_address), paper_hash)
+    if in_flight_key in citations_in_flight:
+        print("错误：相同的引用正在处理中")
         return None
+    citations_in_flight.add(in_flight_key)
     
     try:
-        # 检查被引用者是否已注册
-        cited_info = author_token.functions.getAuthorInfo(cited_address).call()
-        if not cited_info[3]:  # isRegistered
-            print("错误：被引用者尚未注册为作者")
-            return None
+        # 与 CitationNetwork 中的引用ID计算方式一致
+        citation_key = Web3.solidity_keccak(['address', 'address', 'string'], [account.address, cited_address, paper_hash])
+        
+        async with citation_pair_lock(account.address, in_flight_key[1]):
+            # 余额、被引用者注册状态、引用是否已存在和合约所有者互不依赖，并发查询
+            has_balance, cited_info, existing_citation, owner_address = await asyncio.gather(
+                check_balance(account.address),
+                author_token.functions.getAuthorInfo(cited_address).call(),
+                citation_network.functions.citations(citation_key).call(),
+                author_token.functions.owner().call()
+            )
+            if not has_balance:
+                print("错误：账户余额不足")
+                return None
             
-        # 1. 首先在 CitationNetwork 中添加引用
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = citation_network.functions.addCitation(
-            cited_address,
-            paper_hash
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 3000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        
-        if receipt.status != 1:
-            print(f"添加引用到 CitationNetwork 失败")
+            # 检查被引用者是否已注册
+            if not cited_info[3]:  # isRegistered
+                print("错误：被引用者尚未注册为作者")
+                return None
+            
+            # 两笔交易同时发出，重复引用必须提前拒绝，否则只有 AuthorToken 会计数
+            if existing_citation[3] != 0:  # timestamp
+                print("错误：该引用已存在")
+                return None
+                
+            # 两个合约的写入互不依赖：按连续的nonce依次发送，再并发等待回执
+            network_tx_hash = await submit_transaction(private_key, citation_network.functions.addCitation(
+                cited_address,
+                paper_hash
+            ), 3000000)
+            token_tx_hash = await submit_transaction(private_key, author_token.functions.addCitation(
+                cited_address  # 只传入被引用者地址
+            ), 3000000)
+            network_receipt, token_receipt = await wait_for_receipts([network_tx_hash, token_tx_hash])
+        
+        if network_receipt.status != 1 and token_receipt.status != 1:
+            print(f"添加引用到 CitationNetwork 和 AuthorToken 均失败")
             return None
+        # 只有一个合约写入成功时两边的状态已不一致，需要明确报告而不是当作普通失败
+        if network_receipt.status != 1:
+            raise CitationInconsistent(
+                f"AuthorToken 已记录引用并铸币（交易 {token_tx_hash.hex()}），"
+                f"但 CitationNetwork 写入失败（交易 {network_tx_hash.hex()}）"
+            )
+        if token_receipt.status != 1:
+            raise CitationInconsistent(
+                f"CitationNetwork 已记录引用（交易 {network_tx_hash.hex()}），"
+                f"但 AuthorToken 写入失败（交易 {token_tx_hash.hex()}），未铸币"
+            )
             
         # 获取引用ID（从事件日志中）
         citation_id = None
-        logs = citation_network.events.CitationAdded().process_receipt(receipt)
+        logs = citation_network.events.CitationAdded().process_receipt(network_receipt)
         if logs:
             citation_id = logs[0]['args']['citationId'].hex()
             print(f"引用ID: {citation_id}")
         
-        # 2. 然后在 AuthorToken 中更新引用信息
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = author_token.functions.addCitation(
-            cited_address  # 只传入被引用者地址
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 3000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        
-        if receipt.status != 1:
-            print(f"添加引用到 AuthorToken 失败")
-            return None
-            
-        # 3. 更新 PageRank 得分（需要合约所有者权限）
-        try:
-            # 获取合约所有者地址
-            owner_address = author_token.functions.owner().call()
-            # 如果当前用户是合约所有者，则更新 PageRank
-            if account.address.lower() == owner_address.lower():
-                nonce = w3.eth.get_transaction_count(account.address)
-                tx = author_token.functions.updatePageRanks(
-                    10,  # iterations: 迭代次数
-                    85   # dampingFactor: 阻尼系数（0.85 * 100）
-                ).build_transaction({
-                    'from': account.address,
-                    'nonce': nonce,
-                    'gas': 5000000,  # 需要更多 gas
-                    'gasPrice': w3.eth.gas_price
-                })
-                
-                signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-                tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-                receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-                
-                if receipt.status == 1:
-                    print("PageRank 得分已更新")
-                else:
-                    print("PageRank 得分更新失败")
-            else:
-                print("注意：当前用户不是合约所有者，无法更新 PageRank 得分")
-                print(f"请使用合约所有者地址 ({owner_address}) 来更新 PageRank")
-        except Exception as e:
-            print(f"更新 PageRank 得分时出错: {str(e)}")
+        # 更新 PageRank 得分（需要合约所有者权限），由后台任务合并执行
+        if account.address.lower() == owner_address.lower():
+            pagerank_updater.schedule(private_key)
+            print(f"PageRank 得分将在 {PAGERANK_INTERVAL} 秒内更新")
+        else:
+            print("注意：当前用户不是合约所有者，无法更新 PageRank 得分")
+            print(f"请使用合约所有者地址 ({owner_address}) 来更新 PageRank")
             
         print(f"成功添加引用")
         print(f"被引用者: {cited_address}")
@@ -351,18 +477,22 @@ def add_citation1(private_key, cited_address, paper_hash):
         print(f"引用ID: {citation_id}")
         
         # 显示更新后的引用信息
-        cited_info = author_token.functions.getAuthorInfo(cited_address).call()
+        cited_info = await author_token.functions.getAuthorInfo(cited_address).call()
         print(f"\n更新后的引用信息:")
         print(f"被引用次数: {cited_info[1]}")
         print(f"PageRank得分: {cited_info[2]}")
         
         return citation_id
+    except CitationInconsistent:
+        raise
     except Exception as e:
         print(f"添加引用时出错: {str(e)}")
         return None
+    finally:
+        citations_in_flight.discard(in_flight_key)
 
 # 获取作者信息
-def get_author_info_backend(author_address):
+async def get_author_info_backend(author_address):
     if not is_valid_address(author_address):
         print("错误：无效的作者地址")
         return None
@@ -373,12 +503,15 @@ def get_author_info_backend(author_address):
         print("错误：无法加载合约")
         return None
         
-    if not check_contract_deployed(author_token):
+    if not await check_contract_deployed(author_token):
         print("错误：合约未正确部署")
         return None
     
     try:
-        author_info = author_token.functions.getAuthorInfo(author_address).call()
+        if index_ready():
+            author_info = indexer.view.author_info(author_address)
+        else:
+            author_info = await author_token.functions.getAuthorInfo(author_address).call()
         print(f"作者地址: {author_info[0]}")
         print(f"被引用次数: {author_info[1]}")
         print(f"PageRank得分: {author_info[2]}")
@@ -390,14 +523,17 @@ def get_author_info_backend(author_address):
         return None
 
 # 获取作者引用家族
-def get_author_lineage(author_address):
+async def get_author_lineage(author_address):
     citation_network = load_contract('CitationNetwork')
     
     if not citation_network:
         return None
     
     try:
-        lineage = citation_network.functions.getAuthorLineage(author_address).call()
+        if index_ready():
+            lineage = indexer.view.author_lineage(author_address)
+        else:
+            lineage = await citation_network.functions.getAuthorLineage(author_address).call()
         print(f"作者 {author_address} 的引用家族成员:")
         for member in lineage:
             print(f"- {member}")
@@ -408,7 +544,7 @@ def get_author_lineage(author_address):
         return None
 
 # 获取作者分配份额
-def get_author_share(distribution_id, author_address):
+async def get_author_share(distribution_id, author_address):
     if not is_valid_address(author_address):
         print("错误：无效的作者地址")
         return None
@@ -420,7 +556,10 @@ def get_author_share(distribution_id, author_address):
         return None
     
     try:
-        share = profit_distribution.functions.getAuthorShare(distribution_id, author_address).call()
+        if index_ready():
+            share = indexer.view.author_share(distribution_id, author_address)
+        else:
+            share = await profit_distribution.functions.getAuthorShare(distribution_id, author_address).call()
         print(f"分配期ID: {distribution_id}")
         print(f"作者地址: {share[0]}")
         print(f"份额百分比: {share[1]}%")
@@ -433,7 +572,7 @@ def get_author_share(distribution_id, author_address):
         return None
 
 # 提取收益
-def withdraw_share(private_key, distribution_id):
+async def withdraw_share(private_key, distribution_id):
     account = Account.from_key(private_key)
     profit_distribution = load_contract('ProfitDistribution')
     
@@ -443,7 +582,7 @@ def withdraw_share(private_key, distribution_id):
     
     try:
         # 检查是否有可提取的份额
-        share = profit_distribution.functions.getAuthorShare(distribution_id, account.address).call()
+        share = await profit_distribution.functions.getAuthorShare(distribution_id, account.address).call()
         if share[1] == 0:  # sharePercentage
             print("错误：没有可提取的份额")
             return False
@@ -451,17 +590,9 @@ def withdraw_share(private_key, distribution_id):
             print("错误：份额已提取")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = profit_distribution.functions.withdrawShare(distribution_id).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = await send_transaction(
+            private_key, profit_distribution.functions.withdrawShare(distribution_id), 2000000
+        )
         
         print(f"提取收益交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -472,7 +603,7 @@ def withdraw_share(private_key, distribution_id):
         return False
 
 # 验证身份
-def verify_identity(private_key, author_address):
+async def verify_identity(private_key, author_address):
     if not is_valid_address(author_address):
         print("错误：无效的作者地址")
         return False
@@ -486,21 +617,13 @@ def verify_identity(private_key, author_address):
     
     try:
         # 检查是否是管理员
-        if account.address != identity_mgmt.functions.owner().call():
+        if account.address != await identity_mgmt.functions.owner().call():
             print("错误：只有管理员可以验证身份")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.verifyIdentity(author_address).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = await send_transaction(
+            private_key, identity_mgmt.functions.verifyIdentity(author_address), 2000000
+        )
         
         print(f"验证身份交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -511,7 +634,7 @@ def verify_identity(private_key, author_address):
         return False
 
 # 更新身份信息
-def update_identity(private_key, author_address, new_public_key_hash, metadata_uri, is_revoked):
+async def update_identity(private_key, author_address, new_public_key_hash, metadata_uri, is_revoked):
     if not is_valid_address(author_address):
         print("错误：无效的作者地址")
         return False
@@ -525,26 +648,16 @@ def update_identity(private_key, author_address, new_public_key_hash, metadata_u
     
     try:
         # 检查是否是管理员
-        if account.address != identity_mgmt.functions.owner().call():
+        if account.address != await identity_mgmt.functions.owner().call():
             print("错误：只有管理员可以更新身份")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.setIdentity(
+        tx_hash, receipt = await send_transaction(private_key, identity_mgmt.functions.setIdentity(
             author_address,
             new_public_key_hash,
             metadata_uri,
             is_revoked
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        ), 2000000)
         
         print(f"更新身份交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -555,7 +668,7 @@ def update_identity(private_key, author_address, new_public_key_hash, metadata_u
         return False
 
 # 撤销身份
-def revoke_identity(private_key, author_address):
+async def revoke_identity(private_key, author_address):
     if not is_valid_address(author_address):
         print("错误：无效的作者地址")
         return False
@@ -569,21 +682,13 @@ def revoke_identity(private_key, author_address):
     
     try:
         # 检查是否是管理员
-        if account.address != identity_mgmt.functions.owner().call():
+        if account.address != await identity_mgmt.functions.owner().call():
             print("错误：只有管理员可以撤销身份")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.revokeIdentity(author_address).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = await send_transaction(
+            private_key, identity_mgmt.functions.revokeIdentity(author_address), 2000000
+        )
         
         print(f"撤销身份交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -594,7 +699,7 @@ def revoke_identity(private_key, author_address):
         return False
 
 # 验证引用
-def verify_citation(private_key, citation_id, proof):
+async def verify_citation(private_key, citation_id, proof):
     account = Account.from_key(private_key)
     citation_network = load_contract('CitationNetwork')
     
@@ -604,21 +709,13 @@ def verify_citation(private_key, citation_id, proof):
     
     try:
         # 检查是否是管理员
-        if account.address != citation_network.functions.owner().call():
+        if account.address != await citation_network.functions.owner().call():
             print("错误：只有管理员可以验证引用")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = citation_network.functions.verifyCitation(citation_id, proof).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = await send_transaction(
+            private_key, citation_network.functions.verifyCitation(citation_id, proof), 2000000
+        )
         
         print(f"验证引用交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -629,7 +726,7 @@ def verify_citation(private_key, citation_id, proof):
         return False
 
 # 获取完整的作者引用信息
-def get_complete_citation_info(author_address):
+async def get_complete_citation_info(author_address):
     if not is_valid_address(author_address):
         print("错误：无效的作者地址")
         return None
@@ -642,18 +739,26 @@ def get_complete_citation_info(author_address):
         return None
     
     try:
-        # 从 AuthorToken 获取基本信息
-        author_info = author_token.functions.getAuthorInfo(author_address).call()
+        if index_ready():
+            author_info = indexer.view.author_info(author_address)
+            direct_citers = indexer.view.author_direct_citers(author_address)
+            lineage = indexer.view.author_lineage(author_address)
+        else:
+            # 三个只读调用互不依赖，并发查询
+            author_info, direct_citers, lineage = await asyncio.gather(
+                author_token.functions.getAuthorInfo(author_address).call(),
+                citation_network.functions.getDirectCiters(author_address).call(),
+                citation_network.functions.getAuthorLineage(author_address).call()
+            )
+        
+        # 从 AuthorToken 获取的基本信息
         print("\n作者基本信息:")
         print(f"作者地址: {author_info[0]}")
         print(f"被引用次数 (AuthorToken): {author_info[1]}")
         print(f"PageRank得分: {author_info[2]}")
         print(f"是否已注册: {author_info[3]}")
         
-        # 从 CitationNetwork 获取引用网络信息
-        direct_citers = citation_network.functions.getDirectCiters(author_address).call()
-        lineage = citation_network.functions.getAuthorLineage(author_address).call()
-        
+        # 从 CitationNetwork 获取的引用网络信息
         print("\n引用网络信息:")
         print(f"直接引用者数量: {len(direct_citers)}")
         print("直接引用者列表:")
@@ -684,8 +789,62 @@ def get_complete_citation_info(author_address):
         print(f"获取完整引用信息时出错: {str(e)}")
         return None
 
+# 从索引读取作者信息、直接引用者和引用家族
+def index_authors_info(addresses, owner_address):
+    authors_info = []
+    for address in addresses:
+        author_info = indexer.view.author_info(address)
+        if not author_info[3]:  # isRegistered
+            continue
+        authors_info.append({
+            'address': author_info[0],
+            'citation_count': author_info[1],
+            'pagerank_score': author_info[2],
+            'is_registered': author_info[3],
+            'direct_citers_count': len(indexer.view.direct_citers.get(address, ())),
+            'lineage_size': len(indexer.view.lineage.get(address, ())),
+            'is_owner': address.lower() == owner_address.lower()
+        })
+    return authors_info
+
+# 批量读取作者信息、直接引用者和引用家族
+async def fetch_authors_info(addresses, owner_address):
+    if index_ready():
+        return index_authors_info(addresses, owner_address)
+    
+    author_token = contract_registry.entry('AuthorToken')
+    citation_network = contract_registry.entry('CitationNetwork')
+    
+    # 每个作者3个只读调用，全部按批次合并为JSON-RPC批量请求
+    calls = []
+    for address in addresses:
+        calls.append(ContractCall(author_token, 'getAuthorInfo', address))
+        calls.append(ContractCall(citation_network, 'getDirectCiters', address))
+        calls.append(ContractCall(citation_network, 'getAuthorLineage', address))
+    results = await batch_reader.call_many(calls)
+    
+    authors_info = []
+    for index, address in enumerate(addresses):
+        author_info, direct_citers, lineage = results[index * 3:index * 3 + 3]
+        error = next((r for r in (author_info, direct_citers, lineage) if isinstance(r, RPCError)), None)
+        if error is not None:
+            print(f"获取作者 {address} 信息时出错: {str(error)}")
+            continue
+        if not author_info[3]:  # isRegistered
+            continue
+        authors_info.append({
+            'address': author_info[0],
+            'citation_count': author_info[1],
+            'pagerank_score': author_info[2],
+            'is_registered': author_info[3],
+            'direct_citers_count': len(direct_citers),
+            'lineage_size': len(lineage),
+            'is_owner': address.lower() == owner_address.lower()
+        })
+    return authors_info
+
 # 获取所有作者信息
-def get_all_authors_info():
+async def get_all_authors_info():
     author_token = load_contract('AuthorToken')
     citation_network = load_contract('CitationNetwork')
     
@@ -695,88 +854,15 @@ def get_all_authors_info():
     
     try:
         print("\n正在获取所有作者信息...")
-        print(f"当前已注册作者数量: {len(registered_authors)}")
-        print("已注册作者列表:")
-        for author in registered_authors:
-            print(f"- {author}")
+        # 增量扫描检查点之后的注册事件
+        await discover_authors_async(w3, author_directory, contract_registry.entry('AuthorToken'))
+        print(f"当前已注册作者数量: {len(author_directory)}")
         
         # 获取合约所有者地址
-        owner_address = author_token.functions.owner().call()
+        owner_address = await author_token.functions.owner().call()
         print(f"\n合约所有者地址: {owner_address}")
         
-        authors_info = []
-        # 首先处理已注册的作者
-        for address in registered_authors:
-            try:
-                author_info = author_token.functions.getAuthorInfo(address).call()
-                if author_info[3]:  # isRegistered
-                    # 获取引用网络信息
-                    direct_citers = citation_network.functions.getDirectCiters(address).call()
-                    lineage = citation_network.functions.getAuthorLineage(address).call()
-                    
-                    author_data = {
-                        'address': author_info[0],
-                        'citation_count': author_info[1],
-                        'pagerank_score': author_info[2],
-                        'is_registered': author_info[3],
-                        'direct_citers_count': len(direct_citers),
-                        'lineage_size': len(lineage),
-                        'is_owner': address.lower() == owner_address.lower()
-                    }
-                    authors_info.append(author_data)
-                    
-                    print(f"\n作者 {address}:")
-                    print(f"被引用次数: {author_data['citation_count']}")
-                    print(f"PageRank得分: {author_data['pagerank_score']}")
-                    print(f"直接引用者数量: {author_data['direct_citers_count']}")
-                    print(f"引用家族大小: {author_data['lineage_size']}")
-                    if author_data['is_owner']:
-                        print("(合约所有者)")
-            except Exception as e:
-                print(f"获取作者 {address} 信息时出错: {str(e)}")
-                continue
-        
-        # 然后检查测试账户
-        test_accounts = [
-            "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266",  # 测试账户 #0
-            "0x70997970C51812dc3A010C7d01b50e0d17dc79C8",  # 测试账户 #1
-            "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"   # 测试账户 #2
-        ]
-        
-        for address in test_accounts:
-            if address not in registered_authors:  # 只处理未注册的测试账户
-                try:
-                    author_info = author_token.functions.getAuthorInfo(address).call()
-                    if author_info[3]:  # isRegistered
-                        # 如果发现已注册但未记录的测试账户，添加到注册作者列表
-                        registered_authors.add(address)
-                        save_registered_authors()
-                        
-                        # 获取引用网络信息
-                        direct_citers = citation_network.functions.getDirectCiters(address).call()
-                        lineage = citation_network.functions.getAuthorLineage(address).call()
-                        
-                        author_data = {
-                            'address': author_info[0],
-                            'citation_count': author_info[1],
-                            'pagerank_score': author_info[2],
-                            'is_registered': author_info[3],
-                            'direct_citers_count': len(direct_citers),
-                            'lineage_size': len(lineage),
-                            'is_owner': address.lower() == owner_address.lower()
-                        }
-                        authors_info.append(author_data)
-                        
-                        print(f"\n测试账户 {address}:")
-                        print(f"被引用次数: {author_data['citation_count']}")
-                        print(f"PageRank得分: {author_data['pagerank_score']}")
-                        print(f"直接引用者数量: {author_data['direct_citers_count']}")
-                        print(f"引用家族大小: {author_data['lineage_size']}")
-                        if author_data['is_owner']:
-                            print("(合约所有者)")
-                except Exception as e:
-                    print(f"获取测试账户 {address} 信息时出错: {str(e)}")
-                    continue
+        authors_info = await fetch_authors_info(list(author_directory), owner_address)
         
         if not authors_info:
             print("\n未找到任何已注册的作者")
@@ -787,7 +873,7 @@ def get_all_authors_info():
             authors_info.sort(key=lambda x: x['pagerank_score'], reverse=True)
             print("\n作者排名（按 PageRank 得分）:")
             for i, author in enumerate(authors_info, 1):
-                print(f"{i}. 地址: {author['address']}")
+                print(f"{i}. 地址: {author['address']}{' (合约所有者)' if author['is_owner'] else ''}")
                 print(f"   PageRank得分: {author['pagerank_score']}")
                 print(f"   被引用次数: {author['citation_count']}")
                 print(f"   直接引用者数量: {author['direct_citers_count']}")
@@ -798,10 +884,8 @@ def get_all_authors_info():
         print(f"获取所有作者信息时出错: {str(e)}")
         return None
 
-    
-
-
 # FastAPI 路由定义
+# 路由处理函数以 _route 结尾，避免覆盖同名的链上操作函数
 class AuthorInfoRequest(BaseModel):
     private_key: str
 
@@ -813,10 +897,14 @@ class CitationRequest(BaseModel):
     cited_address: str
     paper_hash: str
 
+class WithdrawRequest(BaseModel):
+    private_key: str
+    distribution_id: int
+
 @app.post("/register_author/")
-async def register_author(request: AuthorInfoRequest):
+async def register_author_route(request: AuthorInfoRequest):
     private_key = request.private_key
-    ret=get_account(private_key)
+    ret = await get_account(private_key)
     # if not success:
         # raise HTTPException(status_code=400, detail="注册作者失败")
     return {"message": ret}
@@ -827,60 +915,69 @@ async def add_citation(request: CitationRequest):
     cited_address = request.cited_address
     paper_hash = request.paper_hash
     
-    citation_id = add_citation1(private_key, cited_address, paper_hash)
+    try:
+        citation_id = await add_citation1(private_key, cited_address, paper_hash)
+    except CitationInconsistent as e:
+        raise HTTPException(status_code=500, detail=f"引用只写入了一个合约: {e}")
     if citation_id is None:
         raise HTTPException(status_code=400, detail="添加引用失败")
     return {"citation_id": citation_id}
 
 @app.get("/get_author_info/{author_address}")
 async def get_author_info(author_address: str):
-    author_info = get_author_info_backend(author_address)
+    author_info = await get_author_info_backend(author_address)
     if author_info is None:
         raise HTTPException(status_code=400, detail="获取作者信息失败")
     return {"author_info": author_info}
 
-
-
-
 @app.get("/get_author_lineage/")
-async def get_author_lineage(request: AuthorInfoRequest):
-    author_address = request.address
-    lineage = get_author_lineage(author_address)
+async def get_author_lineage_route(request: AuthorInfoRequest1):
+    author_address = request.author_address
+    lineage = await get_author_lineage(author_address)
     if lineage is None:
         raise HTTPException(status_code=400, detail="获取作者引用家族失败")
     return {"lineage": lineage}
 
 @app.get("/get_all_authors_info/")
-async def get_all_authors_info():
-    authors_info = get_all_authors_info()
+async def get_all_authors_info_route():
+    authors_info = await get_all_authors_info()
     if authors_info is None:
         raise HTTPException(status_code=400, detail="获取所有作者信息失败")
     return {"authors_info": authors_info}
 
 @app.get("/get_complete_citation_info/")
-async def get_complete_citation_info(request: AuthorInfoRequest):
-    author_address = request.address
-    citation_info = get_complete_citation_info(author_address)
+async def get_complete_citation_info_route(request: AuthorInfoRequest1):
+    author_address = request.author_address
+    citation_info = await get_complete_citation_info(author_address)
     if citation_info is None:
         raise HTTPException(status_code=400, detail="获取完整引用信息失败")
     return {"citation_info": citation_info}
 
 @app.post("/withdraw_share/")
-async def withdraw_share(request: AuthorInfoRequest):
-    private_key = request.address
-    success = withdraw_share(private_key)
+async def withdraw_share_route(request: WithdrawRequest):
+    success = await withdraw_share(request.private_key, request.distribution_id)
     if not success:
         raise HTTPException(status_code=400, detail="提取收益失败")
     return {"message": "收益提取成功"}
 
 @app.post("/verify_citation/")
-async def verify_citation(request: CitationRequest):
+async def verify_citation_route(request: CitationRequest):
     citation_id = request.paper_hash
     proof = request.cited_address
-    success = verify_citation(request.private_key, citation_id, proof)
+    success = await verify_citation(request.private_key, citation_id, proof)
     if not success:
         raise HTTPException(status_code=400, detail="验证引用失败")
     return {"message": "引用验证成功"}
 
+@app.get("/gas_status/")
+async def gas_status():
+    return gas_oracle.stats()
+
+@app.get("/indexer_status/")
+async def indexer_status():
+    if indexer is None:
+        return {"enabled": False}
+    return {"enabled": True, "read_from_index": READ_FROM_INDEX, **indexer.stats()}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
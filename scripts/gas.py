@@ -0,0 +1,204 @@
+"""
+Gas价格预言机与gas估算缓存
+gas价格按区块缓存（同时有TTL，观察到新区块的回执后立即失效）；
+gas上限按 (合约, 函数, 参数形状) 缓存 estimate_gas 的结果并加安全余量，
+交易确认后回执中的 gasUsed 更高时上调（只升不降）。
+gas用量随链上状态增长的函数按 (发送方, 具体参数) 只缓存几秒；gas耗尽的交易丢弃估算后重发一次。
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# gas用量取决于链上状态（引用图规模、作者数量）的函数，估算值只在短时间内复用
+STATE_DEPENDENT_FUNCTIONS = frozenset({'addCitation', 'updatePageRanks'})
+
+
+def freeze(value):
+    """把参数中的列表转换为元组，用作缓存键"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+
+
+def argument_shape(value):
+    """参数形状：字符串、字节和数组按长度的数量级区分，其余按类型区分"""
+    if isinstance(value, (str, bytes, bytearray)):
+        return (type(value).__name__, len(value).bit_length())
+    if isinstance(value, (list, tuple)):
+        return ('list', len(value).bit_length(), tuple(argument_shape(item) for item in value[:1]))
+    return type(value).__name__
+
+
+def call_key(function_call):
+    return (function_call.address, function_call.fn_name, tuple(argument_shape(arg) for arg in function_call.args))
+
+
+def estimate_key(function_call, sender):
+    """估算缓存键：一般函数按参数形状，状态相关的函数按发送方和具体参数"""
+    if function_call.fn_name in STATE_DEPENDENT_FUNCTIONS:
+        return ('state', function_call.address, function_call.fn_name, sender, freeze(function_call.args))
+    return call_key(function_call)
+
+
+class GasBook:
+    """gas价格和gas上限的缓存状态，不涉及RPC"""
+
+    def __init__(self, margin=1.2, price_ttl=2.0, state_ttl=10.0, max_pending=10000, pending_ttl=600.0):
+        self.margin = margin  # 在估算值上增加的安全余量
+        self.price_ttl = price_ttl  # gas价格最长缓存时间（秒）
+        self.state_ttl = state_ttl  # 状态相关函数的估算缓存时间（秒）
+        self.max_pending = max_pending
+        self.pending_ttl = pending_ttl  # 超过该时间仍未观察到回执的交易不再跟踪（秒）
+        self._price = None  # (gas价格, 获取时间, 获取时的最新区块)
+        self._latest_block = -1  # 从回执中观察到的最新区块
+        self._estimates = {}  # 形状键 -> 基准gas
+        self._state_estimates = OrderedDict()  # 状态键 -> (基准gas, 过期时间)，按写入顺序排列
+        self._pending = OrderedDict()  # 交易哈希 -> (估算键, gas上限, 重发信息, 跟踪时间)
+        self._lock = threading.Lock()
+        self.estimate_calls = 0
+        self.price_calls = 0
+        self.out_of_gas = 0
+
+    def _cached_price(self):
+        if self._price is None:
+            return None
+        price, fetched_at, block_number = self._price
+        if time.monotonic() - fetched_at > self.price_ttl or self._latest_block > block_number:
+            return None
+        return price
+
+    def _store_price(self, price):
+        self._price = (price, time.monotonic(), self._latest_block)
+        self.price_calls += 1
+        return price
+
+    def _base(self, key):
+        if key[0] != 'state':
+            return self._estimates.get(key)
+        entry = self._state_estimates.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def _set_base(self, key, base):
+        if key[0] != 'state':
+            self._estimates[key] = base
+            return
+        now = time.monotonic()
+        entry = self._state_estimates.get(key)
+        if entry is not None and entry[1] > now:
+            # 回执上调估算时保留原过期时间，不延长缓存
+            self._state_estimates[key] = (base, entry[1])
+            return
+        self._state_estimates.pop(key, None)
+        self._state_estimates[key] = (base, now + self.state_ttl)
+        # 过期时间随写入顺序递增，过期的条目总在队首
+        while self._state_estimates and next(iter(self._state_estimates.values()))[1] <= now:
+            self._state_estimates.popitem(last=False)
+
+    def _drop_base(self, key):
+        (self._state_estimates if key[0] == 'state' else self._estimates).pop(key, None)
+
+    def _limit(self, key):
+        base = self._base(key)
+        return None if base is None else math.ceil(base * self.margin)
+
+    def _store_estimate(self, key, estimate):
+        with self._lock:
+            self._set_base(key, estimate)
+            self.estimate_calls += 1
+            return math.ceil(estimate * self.margin)
+
+    def _cached_limit(self, function_call, sender):
+        """可直接使用的缓存gas上限，没有可用的估算时返回None"""
+        with self._lock:
+            return self._limit(estimate_key(function_call, sender))
+
+    def track(self, tx_hash, function_call, sender, gas_limit, retry=None):
+        """记录已发送交易对应的调用，确认后用回执修正估算；retry 为gas耗尽时重发所需的信息，
+        应为账户对象等签名者引用而不是私钥，超过 pending_ttl 未确认时随记录一起丢弃"""
+        now = time.monotonic()
+        with self._lock:
+            self._pending[bytes(tx_hash)] = (estimate_key(function_call, sender), gas_limit, retry, now)
+            while self._pending and (len(self._pending) > self.max_pending
+                                     or next(iter(self._pending.values()))[3] <= now - self.pending_ttl):
+                self._pending.popitem(last=False)
+
+    def observe_receipt(self, receipt):
+        """用回执修正估算；交易因gas耗尽失败时丢弃估算并返回 track 时记录的 retry，否则返回None"""
+        with self._lock:
+            self._latest_block = max(self._latest_block, receipt['blockNumber'])
+            tracked = self._pending.pop(bytes(receipt['transactionHash']), None)
+            if tracked is None:
+                return None
+            key, gas_limit, retry, _ = tracked
+            gas_used = receipt['gasUsed']
+            if receipt['status'] != 1 and gas_used >= gas_limit:
+                # gas耗尽导致失败：丢弃估算，重发时重新估算
+                self._drop_base(key)
+                self.out_of_gas += 1
+                return retry
+            base = self._base(key)
+            # 只升不降：较低的用量可能只是这次走了较短的执行路径
+            if base is None or gas_used > base:
+                self._set_base(key, gas_used)
+            return None
+
+    def stats(self):
+        return {
+            'cached_estimates': len(self._estimates),
+            'cached_state_estimates': len(self._state_estimates),
+            'pending': len(self._pending),
+            'estimate_calls': self.estimate_calls,
+            'price_calls': self.price_calls,
+            'out_of_gas': self.out_of_gas,
+            'latest_block': self._latest_block
+        }
+
+
+class GasOracle(GasBook):
+    """同步 Web3 使用的gas预言机"""
+
+    def __init__(self, w3, **kwargs):
+        super().__init__(**kwargs)
+        self.w3 = w3
+
+    def gas_price(self):
+        price = self._cached_price()
+        return price if price is not None else self._store_price(self.w3.eth.gas_price)
+
+    def gas_limit(self, function_call, sender, fallback):
+        """缓存的gas上限；估算失败（如交易会回滚）时使用 fallback"""
+        limit = self._cached_limit(function_call, sender)
+        if limit is not None:
+            return limit
+        try:
+            return self._store_estimate(estimate_key(function_call, sender), function_call.estimate_gas({'from': sender}))
+        except Exception:
+            return fallback
+
+
+class AsyncGasOracle(GasBook):
+    """AsyncWeb3 使用的gas预言机"""
+
+    def __init__(self, w3, **kwargs):
+        super().__init__(**kwargs)
+        self.w3 = w3
+
+    async def gas_price(self):
+        price = self._cached_price()
+        return price if price is not None else self._store_price(await self.w3.eth.gas_price)
+
+    async def gas_limit(self, function_call, sender, fallback):
+        limit = self._cached_limit(function_call, sender)
+        if limit is not None:
+            return limit
+        try:
+            return self._store_estimate(estimate_key(function_call, sender),
+                                        await function_call.estimate_gas({'from': sender}))
+        except Exception:
+            return fallback
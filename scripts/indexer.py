@@ -0,0 +1,420 @@
+"""
+链上事件索引
+通过 eth_getLogs 按自适应的区块范围拉取四个合约的事件，原始日志写入本地SQLite，
+并在内存中重放为与合约视图函数形状一致的数据（作者信息、引用家族、直接引用者、分配份额、身份）。
+记录已索引区块的哈希作为检查点，发现链重组时回滚到分叉点之后重新索引。
+"""
+
+import asyncio
+import functools
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+
+ZERO_ADDRESS = '0x' + '0' * 40
+
+# 需要索引的事件：合约名 -> 事件名
+INDEXED_EVENTS = {
+    'AuthorToken': ('AuthorRegistered', 'CitationAdded', 'TokensMinted', 'PageRankUpdated'),
+    'CitationNetwork': ('CitationAdded', 'CitationVerified'),
+    'ProfitDistribution': ('AuthorShareCalculated', 'ProfitDistributed', 'AuthorWithdrawal'),
+    'IdentityManagement': ('IdentityRegistered', 'IdentityVerified', 'MetadataUpdated')
+}
+
+# 节点因查询范围过大或结果过多拒绝 eth_getLogs 时的错误信息
+RANGE_ERRORS = ('query returned more than', 'block range', 'too many', 'limit exceeded', 'response size', 'timeout')
+
+
+def is_range_error(error):
+    message = str(error).lower()
+    return any(text in message for text in RANGE_ERRORS)
+
+
+def to_storable(value):
+    """事件参数转为可JSON序列化的值（bytes转十六进制）"""
+    if isinstance(value, (bytes, bytearray)):
+        return Web3.to_hex(value)
+    if isinstance(value, (list, tuple)):
+        return [to_storable(item) for item in value]
+    return value
+
+
+class ChainView:
+    """由事件重放得到的链上状态，只包含只读接口需要的部分"""
+
+    def __init__(self):
+        self.authors = {}  # 地址 -> [被引用次数, PageRank得分]，按注册顺序
+        self.minted = {}  # 地址 -> 引用奖励累计铸造的代币
+        self.lineage = {}  # 地址 -> 引用家族（与合约中的数组顺序一致）
+        self._lineage_members = {}  # 地址 -> 引用家族集合，用于去重
+        self.direct_citers = {}  # 地址 -> 直接引用者
+        self.citations = {}  # 引用ID -> {'citer', 'cited', 'verified'}
+        self.shares = {}  # 分配期ID -> {作者地址 -> [份额百分比, 分配金额, 是否已提取]}
+        self.identities = {}  # 地址 -> {'public_key_hash', 'metadata_uri', 'is_verified'}
+        self.handlers = {
+            ('AuthorToken', 'AuthorRegistered'): self._author_registered,
+            ('AuthorToken', 'CitationAdded'): self._token_citation_added,
+            ('AuthorToken', 'TokensMinted'): self._tokens_minted,
+            ('AuthorToken', 'PageRankUpdated'): self._pagerank_updated,
+            ('CitationNetwork', 'CitationAdded'): self._network_citation_added,
+            ('CitationNetwork', 'CitationVerified'): self._citation_verified,
+            ('ProfitDistribution', 'AuthorShareCalculated'): self._share_calculated,
+            ('ProfitDistribution', 'ProfitDistributed'): self._profit_distributed,
+            ('ProfitDistribution', 'AuthorWithdrawal'): self._author_withdrawal,
+            ('IdentityManagement', 'IdentityRegistered'): self._identity_registered,
+            ('IdentityManagement', 'IdentityVerified'): self._identity_verified,
+            ('IdentityManagement', 'MetadataUpdated'): self._metadata_updated
+        }
+
+    def apply(self, contract_name, event_name, args):
+        handler = self.handlers.get((contract_name, event_name))
+        if handler is not None:
+            handler(args)
+
+    # AuthorToken
+    def _author_registered(self, args):
+        self.authors.setdefault(args['author'], [0, 0])
+
+    def _token_citation_added(self, args):
+        self.authors.setdefault(args['cited'], [0, 0])[0] += 1
+
+    def _tokens_minted(self, args):
+        self.minted[args['author']] = self.minted.get(args['author'], 0) + args['amount']
+
+    def _pagerank_updated(self, args):
+        self.authors.setdefault(args['author'], [0, 0])[1] = args['newScore']
+
+    # CitationNetwork：引用家族的更新规则与合约中的 _updateCitationLineage 一致
+    def _add_to_lineage(self, author, member):
+        members = self._lineage_members.setdefault(author, set())
+        if member not in members:
+            members.add(member)
+            self.lineage.setdefault(author, []).append(member)
+
+    def _network_citation_added(self, args):
+        citer, cited = args['citer'], args['cited']
+        self.citations[args['citationId']] = {'citer': citer, 'cited': cited, 'verified': False}
+
+        cited_ancestors = list(self.lineage.get(cited, []))
+        self._add_to_lineage(citer, cited)
+        for ancestor in cited_ancestors:
+            if ancestor != citer:
+                self._add_to_lineage(citer, ancestor)
+        for citer_of_citer in self.direct_citers.get(citer, []):
+            self._add_to_lineage(citer_of_citer, cited)
+            for ancestor in cited_ancestors:
+                if ancestor != citer_of_citer:
+                    self._add_to_lineage(citer_of_citer, ancestor)
+
+        citers = self.direct_citers.setdefault(cited, [])
+        if citer not in citers:
+            citers.append(citer)
+
+    def _citation_verified(self, args):
+        citation = self.citations.get(args['citationId'])
+        if citation is not None:
+            citation['verified'] = True
+
+    # ProfitDistribution
+    def _share_calculated(self, args):
+        self.shares.setdefault(args['distributionId'], {})[args['author']] = [args['sharePercentage'], 0, False]
+
+    def _profit_distributed(self, args):
+        # 份额计算事件先于 ProfitDistributed 发出；分配金额按合约 getPeriodTotalAmount 的规则计算
+        distribution_id = args['distributionId']
+        period_total = args['totalAmount'] if distribution_id == 1 else args['totalAmount'] // (distribution_id - 1)
+        for share in self.shares.get(distribution_id, {}).values():
+            share[1] = period_total * share[0] // 100
+
+    def _author_withdrawal(self, args):
+        # 合约只翻转提取标记，记录的份额金额保持不变（提取金额按当期总额计算，可能不同）
+        share = self.shares.setdefault(args['distributionId'], {}).setdefault(args['author'], [0, 0, False])
+        share[2] = True
+
+    # IdentityManagement
+    def _identity_registered(self, args):
+        identity = self.identities.setdefault(args['author'], {'metadata_uri': '', 'is_verified': False})
+        identity['public_key_hash'] = args['publicKeyHash']
+
+    def _identity_verified(self, args):
+        # 合约中验证和撤销身份都发出 IdentityVerified，状态随事件翻转
+        identity = self.identities.setdefault(args['author'], {'public_key_hash': None, 'metadata_uri': ''})
+        identity['is_verified'] = not identity.get('is_verified', False)
+
+    def _metadata_updated(self, args):
+        identity = self.identities.setdefault(args['author'], {'public_key_hash': None, 'is_verified': False})
+        identity['metadata_uri'] = args['metadataURI']
+
+    # 与合约视图函数返回值形状一致的读取接口
+    def author_info(self, address):
+        """同 AuthorToken.getAuthorInfo：(地址, 被引用次数, PageRank得分, 是否已注册)"""
+        author = self.authors.get(address)
+        if author is None:
+            return (ZERO_ADDRESS, 0, 0, False)
+        return (address, author[0], author[1], True)
+
+    def author_addresses(self):
+        """同 AuthorToken.authorAddresses：按注册顺序"""
+        return list(self.authors)
+
+    def author_lineage(self, address):
+        return list(self.lineage.get(address, []))
+
+    def author_direct_citers(self, address):
+        return list(self.direct_citers.get(address, []))
+
+    def author_share(self, distribution_id, address):
+        """同 ProfitDistribution.getAuthorShare：(地址, 份额百分比, 分配金额, 是否已提取)"""
+        share = self.shares.get(distribution_id, {}).get(address)
+        if share is None:
+            return (ZERO_ADDRESS, 0, 0, False)
+        return (address, share[0], share[1], share[2])
+
+
+class EventIndexer:
+    """后台事件索引任务"""
+
+    def __init__(self, w3, registry, db_path, start_block=0, confirmations=0, initial_range=2000,
+                 max_range=100000, target_logs=2000, reorg_window=128, poll_interval=2.0):
+        self.w3 = w3  # AsyncWeb3
+        self.registry = registry
+        self.db_path = db_path
+        self.start_block = start_block
+        self.confirmations = confirmations  # 只索引已有足够确认数的区块
+        self.block_range = initial_range  # 当前每次 eth_getLogs 查询的区块数，按结果自适应调整
+        self.max_range = max_range
+        self.target_logs = target_logs  # 单次查询返回的日志数超过该值时缩小范围
+        self.reorg_window = reorg_window  # 保留最近多少个区块的哈希用于发现重组
+        self.poll_interval = poll_interval
+        self.view = ChainView()
+        self.checkpoint = None  # (区块号, 区块哈希)，该区块及之前的日志已全部索引
+        self.ready = False  # 至少追上过一次链头后才用于服务读取
+        self.indexed_logs = 0
+        self.reorgs = 0
+        self._sources = {}  # (合约地址, 事件主题) -> (合约缓存项, 事件名)
+        self._conn = None
+        self._task = None
+        # SQLite读写和日志重放在单个后台线程中执行，不阻塞事件循环，同时保证对连接的访问是串行的
+        self._executor = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def open(self):
+        """打开本地存储并重放已索引的日志"""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='indexer')
+        self.checkpoint, self.view = await self._run(self._open_db)
+
+        for contract_name, event_names in INDEXED_EVENTS.items():
+            entry = self.registry.entry(contract_name)
+            if entry is None:
+                continue
+            for event_name in event_names:
+                self._sources[(entry.address, Web3.to_hex(entry.topics[event_name]))] = (entry, event_name)
+
+    def _open_db(self):
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS logs (
+                block_number INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                transaction_hash TEXT NOT NULL,
+                contract TEXT NOT NULL,
+                event TEXT NOT NULL,
+                args TEXT NOT NULL,
+                PRIMARY KEY (block_number, log_index)
+            );
+            CREATE TABLE IF NOT EXISTS blocks (
+                number INTEGER PRIMARY KEY,
+                hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                block_number INTEGER NOT NULL,
+                block_hash TEXT NOT NULL
+            );
+        ''')
+        row = self._conn.execute('SELECT block_number, block_hash FROM checkpoint WHERE id = 1').fetchone()
+        return (tuple(row) if row else None), self._replay()
+
+    def _replay(self):
+        """在后台线程中由已存储的日志构建新的视图，完成后再替换，读取方不会看到重放到一半的状态"""
+        view = ChainView()
+        rows = self._conn.execute('SELECT contract, event, args FROM logs ORDER BY block_number, log_index')
+        for contract_name, event_name, args in rows:
+            view.apply(contract_name, event_name, json.loads(args))
+        return view
+
+    async def _block_hash(self, number):
+        try:
+            block = await self.w3.eth.get_block(number)
+        except Exception:
+            # 节点重启或重组后区块可能已不存在
+            return None
+        return Web3.to_hex(block['hash'])
+
+    async def _check_reorg(self):
+        """检查点区块的哈希与节点不一致时，回滚到最近的共同祖先"""
+        if self.checkpoint is None:
+            return
+        number, stored_hash = self.checkpoint
+        if await self._block_hash(number) == stored_hash:
+            return
+
+        fork_block = self.start_block - 1
+        rows = await self._run(self._recent_blocks, number)
+        for block_number, block_hash in rows:
+            if await self._block_hash(block_number) == block_hash:
+                fork_block = block_number
+                break
+        fork_block, self.checkpoint, self.view = await self._run(self._rollback, fork_block)
+        self.reorgs += 1
+        print(f"检测到链重组，索引回滚到区块 {fork_block}")
+
+    def _recent_blocks(self, number):
+        return self._conn.execute(
+            'SELECT number, hash FROM blocks WHERE number < ? ORDER BY number DESC', (number,)
+        ).fetchall()
+
+    def _rollback(self, fork_block):
+        """删除分叉点之后的数据并重放，返回 (实际回滚到的区块, 新检查点, 新视图)"""
+        with self._conn:
+            row = self._conn.execute('SELECT hash FROM blocks WHERE number = ?', (fork_block,)).fetchone()
+            if row is None:
+                # 分叉点早于保留的区块哈希（或节点已重置），从起始区块重新索引
+                fork_block = self.start_block - 1
+            self._conn.execute('DELETE FROM logs WHERE block_number > ?', (fork_block,))
+            self._conn.execute('DELETE FROM blocks WHERE number > ?', (fork_block,))
+            if row is None:
+                self._conn.execute('DELETE FROM checkpoint')
+                checkpoint = None
+            else:
+                self._conn.execute('UPDATE checkpoint SET block_number = ?, block_hash = ? WHERE id = 1',
+                                   (fork_block, row[0]))
+                checkpoint = (fork_block, row[0])
+        return fork_block, checkpoint, self._replay()
+
+    async def _get_logs(self, from_block, to_block):
+        """按当前范围查询日志，节点拒绝时缩小范围；返回 (实际查询到的区块, 日志)"""
+        while True:
+            end = min(to_block, from_block + self.block_range - 1)
+            try:
+                logs = await self.w3.eth.get_logs({
+                    'fromBlock': from_block,
+                    'toBlock': end,
+                    'address': list({address for address, _ in self._sources}),
+                    'topics': [list({topic for _, topic in self._sources})]
+                })
+            except Exception as e:
+                if self.block_range > 1 and is_range_error(e):
+                    self.block_range = max(1, self.block_range // 2)
+                    continue
+                raise
+            if len(logs) > self.target_logs:
+                self.block_range = max(1, self.block_range // 2)
+            elif len(logs) < self.target_logs // 4:
+                self.block_range = min(self.max_range, self.block_range * 2)
+            return end, logs
+
+    def _decode(self, end, end_hash, logs):
+        """解码日志，返回 (日志行, 区块号 -> 区块哈希)"""
+        rows, blocks = [], {end: end_hash}
+        for log in logs:
+            source = self._sources.get((Web3.to_checksum_address(log['address']), Web3.to_hex(log['topics'][0])))
+            if source is None:
+                continue
+            entry, event_name = source
+            event = entry.contract.events[event_name]().process_log(log)
+            args = {name: to_storable(value) for name, value in event['args'].items()}
+            rows.append((log['blockNumber'], log['logIndex'], Web3.to_hex(log['transactionHash']),
+                         entry.name, event_name, args))
+            blocks[log['blockNumber']] = Web3.to_hex(log['blockHash'])
+        return rows, blocks
+
+    def _write(self, end, end_hash, rows, blocks):
+        """一个范围内的日志、区块哈希和检查点在同一个事务中写入"""
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO logs (block_number, log_index, transaction_hash, contract, event, args) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(number, index, tx_hash, contract, event, json.dumps(args))
+                 for number, index, tx_hash, contract, event, args in rows]
+            )
+            self._conn.executemany('INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)', blocks.items())
+            self._conn.execute('DELETE FROM blocks WHERE number < ?', (end - self.reorg_window,))
+            self._conn.execute('INSERT OR REPLACE INTO checkpoint (id, block_number, block_hash) VALUES (1, ?, ?)',
+                               (end, end_hash))
+
+    async def _store(self, end, end_hash, logs):
+        rows, blocks = self._decode(end, end_hash, logs)
+        await self._run(self._write, end, end_hash, rows, blocks)
+        self.checkpoint = (end, end_hash)
+
+        # 视图只在事件循环线程中修改
+        for _, _, _, contract_name, event_name, args in rows:
+            self.view.apply(contract_name, event_name, args)
+        self.indexed_logs += len(rows)
+
+    async def sync_once(self):
+        """索引到当前链头，返回新索引的日志数"""
+        await self._check_reorg()
+        tip = await self.w3.eth.block_number - self.confirmations
+        indexed = 0
+        next_block = self.checkpoint[0] + 1 if self.checkpoint else self.start_block
+        while next_block <= tip:
+            end, logs = await self._get_logs(next_block, tip)
+            end_hash = await self._block_hash(end)
+            if end_hash is None:
+                break
+            await self._store(end, end_hash, logs)
+            indexed += len(logs)
+            next_block = end + 1
+        if next_block > tip:
+            self.ready = True
+        return indexed
+
+    def covers(self, block_number):
+        """索引是否已追上链头并包含指定区块（及之前）的全部日志"""
+        return self.ready and self.checkpoint is not None and self.checkpoint[0] >= block_number
+
+    async def run(self):
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"事件索引出错: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        """在事件循环中启动后台索引任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'ready': self.ready,
+            'checkpoint_block': self.checkpoint[0] if self.checkpoint else None,
+            'block_range': self.block_range,
+            'indexed_logs': self.indexed_logs,
+            'reorgs': self.reorgs,
+            'authors': len(self.view.authors),
+            'citations': len(self.view.citations)
+        }
@@ -6,14 +6,19 @@
 使用web3.py与智能合约交互
 """
 
-import json
 import os
 from web3 import Web3
 from eth_account import Account
 from eth_account.messages import encode_defunct
+from authors import AuthorDirectory, discover_authors
+from gas import GasOracle
+from nonces import NonceManager, signer_account
+from registry import ContractRegistry
+from rpc_batch import BatchReader, ContractCall, RPCError
 
 # 连接到本地Hardhat节点
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+NODE_URL = 'http://127.0.0.1:8545'
+w3 = Web3(Web3.HTTPProvider(NODE_URL))
 
 # 检查连接
 if not w3.is_connected():
@@ -24,73 +29,68 @@ print(f"已连接到以太坊节点，当前区块号: {w3.eth.block_number}")
 
 # 数据文件路径
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-AUTHORS_FILE = os.path.join(DATA_DIR, 'registered_authors.json')
+AUTHORS_FILE = os.path.join(DATA_DIR, 'registered_authors.json')  # 旧版作者列表，只在首次启动时读取
+AUTHORS_LOG = os.path.join(DATA_DIR, 'authors.log')
 
 # 确保数据目录存在
 os.makedirs(DATA_DIR, exist_ok=True)
 
-# 全局变量：存储所有注册过的作者地址
-registered_authors = set()
+# 作者目录：由 AuthorRegistered 事件增量发现，新作者追加写入 authors.log
+author_directory = AuthorDirectory(AUTHORS_LOG, legacy_path=AUTHORS_FILE)
+author_directory.load()
 
-# 加载已注册作者信息
-def load_registered_authors():
-    global registered_authors
-    try:
-        if os.path.exists(AUTHORS_FILE):
-            with open(AUTHORS_FILE, 'r') as f:
-                data = json.load(f)
-                registered_authors = set(data.get('authors', []))
-                print(f"已加载 {len(registered_authors)} 个已注册作者")
-    except Exception as e:
-        print(f"加载已注册作者信息时出错: {str(e)}")
-        registered_authors = set()
+# 合约注册表：ABI只加载一次，地址来自部署清单（可用 CONTRACT_MANIFEST 指定路径）
+contract_registry = ContractRegistry(w3)
 
-# 保存已注册作者信息
-def save_registered_authors():
-    try:
-        data = {
-            'authors': list(registered_authors),
-            'last_updated': w3.eth.get_block('latest').timestamp
-        }
-        with open(AUTHORS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        print(f"保存已注册作者信息时出错: {str(e)}")
+# 只读调用的批量读取器，RPC_BATCH_SIZE 为每个批量请求包含的调用数
+batch_reader = BatchReader(NODE_URL, chunk_size=int(os.environ.get('RPC_BATCH_SIZE', '100')))
 
-# 在脚本启动时加载已注册作者信息
-load_registered_authors()
+# 按账户在本地分配nonce，同一账户的交易可以连续发送
+nonce_manager = NonceManager(w3)
 
-# 加载合约ABI
+# gas价格按区块缓存，gas上限按函数和参数形状缓存估算值；GAS_MARGIN 为估算值的安全余量
+gas_oracle = GasOracle(w3, margin=float(os.environ.get('GAS_MARGIN', '1.2')),
+                       price_ttl=float(os.environ.get('GAS_PRICE_TTL', '2')),
+                       state_ttl=float(os.environ.get('GAS_STATE_TTL', '10')))
+
+# 加载合约
 def load_contract(contract_name):
-    # 合约地址（使用刚才部署的地址）
-    contract_addresses = {
-        'AuthorToken': '0x5FbDB2315678afecb367f032d93F642f64180aa3',
-        'CitationNetwork': '0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0',
-        'ProfitDistribution': '0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9',
-        'IdentityManagement': '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512'
-    }
-    
-    # 加载ABI
-    artifacts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'artifacts/contracts')
-    contract_json_path = os.path.join(artifacts_dir, f"{contract_name}.sol/{contract_name}.json")
-    
-    try:
-        with open(contract_json_path, 'r') as f:
-            contract_json = json.load(f)
-            contract_abi = contract_json['abi']
-    except FileNotFoundError:
-        print(f"找不到合约ABI文件: {contract_json_path}")
-        return None
-    
-    # 获取合约地址
-    contract_address = contract_addresses.get(contract_name)
-    if not contract_address:
-        print(f"警告: {contract_name}合约地址未设置")
-        return None
-    
-    # 创建合约实例
-    contract = w3.eth.contract(address=contract_address, abi=contract_abi)
-    return contract
+    return contract_registry.contract(contract_name)
+
+# 签名并发送合约交易，不等待回执，返回交易哈希
+# gas 为估算失败时使用的gas上限；retry 为True时交易因gas耗尽失败会重新估算并重发一次
+# private_key 也可以是账户对象，重发信息中只保存账户对象，不保存私钥字符串
+def submit_transaction(private_key, function_call, gas, retry=True):
+    account = signer_account(private_key)
+    gas_price = gas_oracle.gas_price()
+    gas_limit = gas_oracle.gas_limit(function_call, account.address, gas)
+    tx_hash = nonce_manager.send(account, lambda nonce: function_call.build_transaction({
+        'from': account.address,
+        'nonce': nonce,
+        'gas': gas_limit,
+        'gasPrice': gas_price
+    }))
+    gas_oracle.track(tx_hash, function_call, account.address, gas_limit, (account, function_call, gas) if retry else None)
+    return tx_hash
+
+# 等待一组交易的回执，并用实际gas用量修正估算；gas耗尽的交易重发一次，返回重发交易的回执
+def wait_for_receipts(tx_hashes):
+    receipts = nonce_manager.wait_for_receipts(tx_hashes)
+    for index, receipt in enumerate(receipts):
+        retry = gas_oracle.observe_receipt(receipt)
+        if retry is not None:
+            account, function_call, gas = retry
+            print(f"交易 {Web3.to_hex(receipt['transactionHash'])} gas耗尽，重新估算后重发")
+            tx_hash = submit_transaction(account, function_call, gas, retry=False)
+            receipts[index], = nonce_manager.wait_for_receipts([tx_hash])
+            gas_oracle.observe_receipt(receipts[index])
+    return receipts
+
+# 签名并发送合约交易，等待回执
+def send_transaction(private_key, function_call, gas):
+    tx_hash = submit_transaction(private_key, function_call, gas)
+    receipt, = wait_for_receipts([tx_hash])
+    return tx_hash, receipt
 
 # 创建账户或加载现有账户
 def get_account(private_key=None):
@@ -108,17 +108,15 @@ def get_account(private_key=None):
         
         # 从测试账户转账一些 ETH
         test_account = Account.from_key("0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80")
-        nonce = w3.eth.get_transaction_count(test_account.address)
-        tx = {
+        gas_price = gas_oracle.gas_price()
+        tx_hash = nonce_manager.send(test_account.key, lambda nonce: {
             'from': test_account.address,
             'to': acct.address,
             'value': Web3.to_wei(1, 'ether'),  # 转账 1 ETH
             'nonce': nonce,
             'gas': 21000,
-            'gasPrice': w3.eth.gas_price
-        }
-        signed_tx = w3.eth.account.sign_transaction(tx, test_account.key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            'gasPrice': gas_price
+        })
         receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
         
         if receipt.status == 1:
@@ -133,6 +131,10 @@ def is_valid_address(address):
     return Web3.is_address(address) and Web3.is_checksum_address(address)
 
 def check_contract_deployed(contract):
+    # 已确认部署的合约不再重复检查
+    entry = contract_registry.entry_for_address(contract.address)
+    if entry is not None and entry.deployed:
+        return True
     try:
         # 尝试获取合约代码
         code = w3.eth.get_code(contract.address)
@@ -148,6 +150,8 @@ def check_contract_deployed(contract):
             contract.functions.getAuthorLineage(contract.address).call()
         elif hasattr(contract.functions, 'getDistributionInfo'):
             contract.functions.getDistributionInfo(contract.address).call()
+        if entry is not None:
+            entry.deployed = True
         return True
     except Exception as e:
         print(f"合约检查失败: {str(e)}")
@@ -187,31 +191,7 @@ def register_author(private_key):
             print("错误：该地址已经注册为作者")
             return False
             
-        # 注册作者身份
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = author_token.functions.registerAuthor().build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        
-        if receipt.status == 1:
-            # 注册成功，添加到已注册作者集合中并保存
-            registered_authors.add(account.address)
-            save_registered_authors()  # 保存到文件
-            print(f"作者注册交易哈希: {tx_hash.hex()}")
-            print(f"交易状态: 成功")
-        else:
-            print(f"作者注册交易哈希: {tx_hash.hex()}")
-            print(f"交易状态: 失败")
-            return False
-        
-        # 生成公钥哈希并注册身份
+        # 生成公钥哈希
         message = f"Register author identity for {account.address}"
         message_hash = encode_defunct(text=message)
         signed_message = Account.sign_message(message_hash, private_key)
@@ -220,23 +200,31 @@ def register_author(private_key):
         s_hex = hex(signed_message.s)[2:].zfill(64)  # 确保64个字符
         public_key_hash = w3.keccak(hexstr=r_hex + s_hex)
         
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.registerIdentity(
-            public_key_hash,
-            f"ipfs://author/{account.address}"
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        # 身份注册要在作者注册成功之后发送：作者注册失败时不应留下孤立的身份记录
+        author_tx_hash = submit_transaction(private_key, author_token.functions.registerAuthor(), 2000000)
+        (author_receipt,) = wait_for_receipts([author_tx_hash])
+        print(f"作者注册交易哈希: {author_tx_hash.hex()}")
+        if author_receipt.status != 1:
+            print(f"交易状态: 失败")
+            return False
+        # 注册成功，添加到已注册作者集合中并保存
+        author_directory.record([account.address])
+        print(f"交易状态: 成功")
         
-        print(f"身份注册交易哈希: {tx_hash.hex()}")
-        print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
+        try:
+            identity_tx_hash = submit_transaction(private_key, identity_mgmt.functions.registerIdentity(
+                public_key_hash,
+                f"ipfs://author/{account.address}"
+            ), 2000000)
+            (identity_receipt,) = wait_for_receipts([identity_tx_hash])
+            print(f"身份注册交易哈希: {identity_tx_hash.hex()}")
+            identity_error = None if identity_receipt.status == 1 else "交易失败"
+        except Exception as e:
+            identity_error = str(e)
+        if identity_error is not None:
+            print(f"部分失败：地址 {account.address} 已注册为作者，但身份注册未成功（{identity_error}），需要单独重新注册身份")
+            return False
+        print(f"交易状态: 成功")
         
         return True
     except Exception as e:
@@ -273,20 +261,10 @@ def add_citation(private_key, cited_address, paper_hash):
             return None
             
         # 1. 首先在 CitationNetwork 中添加引用
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = citation_network.functions.addCitation(
+        tx_hash, receipt = send_transaction(private_key, citation_network.functions.addCitation(
             cited_address,
             paper_hash
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 3000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        ), 3000000)
         
         if receipt.status != 1:
             print(f"添加引用到 CitationNetwork 失败")
@@ -300,19 +278,9 @@ def add_citation(private_key, cited_address, paper_hash):
             print(f"引用ID: {citation_id}")
         
         # 2. 然后在 AuthorToken 中更新引用信息
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = author_token.functions.addCitation(
+        tx_hash, receipt = send_transaction(private_key, author_token.functions.addCitation(
             cited_address  # 只传入被引用者地址
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 3000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        ), 3000000)
         
         if receipt.status != 1:
             print(f"添加引用到 AuthorToken 失败")
@@ -324,20 +292,10 @@ def add_citation(private_key, cited_address, paper_hash):
             owner_address = author_token.functions.owner().call()
             # 如果当前用户是合约所有者，则更新 PageRank
             if account.address.lower() == owner_address.lower():
-                nonce = w3.eth.get_transaction_count(account.address)
-                tx = author_token.functions.updatePageRanks(
+                tx_hash, receipt = send_transaction(private_key, author_token.functions.updatePageRanks(
                     10,  # iterations: 迭代次数
                     85   # dampingFactor: 阻尼系数（0.85 * 100）
-                ).build_transaction({
-                    'from': account.address,
-                    'nonce': nonce,
-                    'gas': 5000000,  # 需要更多 gas
-                    'gasPrice': w3.eth.gas_price
-                })
-                
-                signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-                tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-                receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+                ), 5000000)  # 需要更多 gas
                 
                 if receipt.status == 1:
                     print("PageRank 得分已更新")
@@ -455,17 +413,7 @@ def withdraw_share(private_key, distribution_id):
             print("错误：份额已提取")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = profit_distribution.functions.withdrawShare(distribution_id).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = send_transaction(private_key, profit_distribution.functions.withdrawShare(distribution_id), 2000000)
         
         print(f"提取收益交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -494,17 +442,7 @@ def verify_identity(private_key, author_address):
             print("错误：只有管理员可以验证身份")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.verifyIdentity(author_address).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = send_transaction(private_key, identity_mgmt.functions.verifyIdentity(author_address), 2000000)
         
         print(f"验证身份交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -533,22 +471,12 @@ def update_identity(private_key, author_address, new_public_key_hash, metadata_u
             print("错误：只有管理员可以更新身份")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.setIdentity(
+        tx_hash, receipt = send_transaction(private_key, identity_mgmt.functions.setIdentity(
             author_address,
             new_public_key_hash,
             metadata_uri,
             is_revoked
-        ).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        ), 2000000)
         
         print(f"更新身份交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -577,17 +505,7 @@ def revoke_identity(private_key, author_address):
             print("错误：只有管理员可以撤销身份")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = identity_mgmt.functions.revokeIdentity(author_address).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = send_transaction(private_key, identity_mgmt.functions.revokeIdentity(author_address), 2000000)
         
         print(f"撤销身份交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -612,17 +530,7 @@ def verify_citation(private_key, citation_id, proof):
             print("错误：只有管理员可以验证引用")
             return False
             
-        nonce = w3.eth.get_transaction_count(account.address)
-        tx = citation_network.functions.verifyCitation(citation_id, proof).build_transaction({
-            'from': account.address,
-            'nonce': nonce,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash, receipt = send_transaction(private_key, citation_network.functions.verifyCitation(citation_id, proof), 2000000)
         
         print(f"验证引用交易哈希: {tx_hash.hex()}")
         print(f"交易状态: {'成功' if receipt.status == 1 else '失败'}")
@@ -688,6 +596,39 @@ def get_complete_citation_info(author_address):
         print(f"获取完整引用信息时出错: {str(e)}")
         return None
 
+# 批量读取作者信息、直接引用者和引用家族
+def fetch_authors_info(addresses, owner_address):
+    author_token = contract_registry.entry('AuthorToken')
+    citation_network = contract_registry.entry('CitationNetwork')
+    
+    # 每个作者3个只读调用，全部按批次合并为JSON-RPC批量请求
+    calls = []
+    for address in addresses:
+        calls.append(ContractCall(author_token, 'getAuthorInfo', address))
+        calls.append(ContractCall(citation_network, 'getDirectCiters', address))
+        calls.append(ContractCall(citation_network, 'getAuthorLineage', address))
+    results = batch_reader.call_many(calls)
+    
+    authors_info = []
+    for index, address in enumerate(addresses):
+        author_info, direct_citers, lineage = results[index * 3:index * 3 + 3]
+        error = next((r for r in (author_info, direct_citers, lineage) if isinstance(r, RPCError)), None)
+        if error is not None:
+            print(f"获取作者 {address} 信息时出错: {str(error)}")
+            continue
+        if not author_info[3]:  # isRegistered
+            continue
+        authors_info.append({
+            'address': author_info[0],
+            'citation_count': author_info[1],
+            'pagerank_score': author_info[2],
+            'is_registered': author_info[3],
+            'direct_citers_count': len(direct_citers),
+            'lineage_size': len(lineage),
+            'is_owner': address.lower() == owner_address.lower()
+        })
+    return authors_info
+
 # 获取所有作者信息
 def get_all_authors_info():
     author_token = load_contract('AuthorToken')
@@ -700,48 +641,22 @@ def get_all_authors_info():
     try:
         print("\n正在获取所有作者信息...")
         
-        # 合并测试账户和已注册作者地址
-        all_addresses = set([
-            "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266",  # 测试账户 #0
-            "0x70997970C51812dc3A010C7d01b50e0d17dc79C8",  # 测试账户 #1
-            "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"   # 测试账户 #2
-        ])
-        all_addresses.update(registered_authors)  # 添加所有已注册的作者地址
+        # 增量扫描检查点之后的注册事件
+        discover_authors(w3, author_directory, contract_registry.entry('AuthorToken'))
         
         # 获取合约所有者地址
         owner_address = author_token.functions.owner().call()
         print(f"\n合约所有者地址: {owner_address}")
         
-        authors_info = []
-        for address in all_addresses:
-            try:
-                author_info = author_token.functions.getAuthorInfo(address).call()
-                if author_info[3]:  # isRegistered
-                    # 获取引用网络信息
-                    direct_citers = citation_network.functions.getDirectCiters(address).call()
-                    lineage = citation_network.functions.getAuthorLineage(address).call()
-                    
-                    author_data = {
-                        'address': author_info[0],
-                        'citation_count': author_info[1],
-                        'pagerank_score': author_info[2],
-                        'is_registered': author_info[3],
-                        'direct_citers_count': len(direct_citers),
-                        'lineage_size': len(lineage),
-                        'is_owner': address.lower() == owner_address.lower()
-                    }
-                    authors_info.append(author_data)
-                    
-                    print(f"\n作者 {address}:")
-                    print(f"被引用次数: {author_data['citation_count']}")
-                    print(f"PageRank得分: {author_data['pagerank_score']}")
-                    print(f"直接引用者数量: {author_data['direct_citers_count']}")
-                    print(f"引用家族大小: {author_data['lineage_size']}")
-                    if author_data['is_owner']:
-                        print("(合约所有者)")
-            except Exception as e:
-                print(f"获取作者 {address} 信息时出错: {str(e)}")
-                continue
+        authors_info = fetch_authors_info(list(author_directory), owner_address)
+        for author_data in authors_info:
+            print(f"\n作者 {author_data['address']}:")
+            print(f"被引用次数: {author_data['citation_count']}")
+            print(f"PageRank得分: {author_data['pagerank_score']}")
+            print(f"直接引用者数量: {author_data['direct_citers_count']}")
+            print(f"引用家族大小: {author_data['lineage_size']}")
+            if author_data['is_owner']:
+                print("(合约所有者)")
         
         if not authors_info:
             print("\n未找到任何已注册的作者")
@@ -767,7 +682,7 @@ def get_all_authors_info():
 def main():
     print("学术引用系统交互脚本")
     print("====================")
-    print(f"当前已注册作者数量: {len(registered_authors)}")
+    print(f"当前已注册作者数量: {len(author_directory)}")
     print("1. 注册新作者")
     print("2. 添加引用")
     print("3. 查询作者信息")
@@ -883,20 +798,10 @@ def main():
                 print("错误：只有已注册的作者可以更新 PageRank 得分")
                 return
                 
-            nonce = w3.eth.get_transaction_count(account.address)
-            tx = author_token.functions.updatePageRanks(
+            tx_hash, receipt = send_transaction(private_key, author_token.functions.updatePageRanks(
                 10,  # iterations: 迭代次数
                 85   # dampingFactor: 阻尼系数（0.85 * 100）
-            ).build_transaction({
-                'from': account.address,
-                'nonce': nonce,
-                'gas': 5000000,  # 需要更多 gas
-                'gasPrice': w3.eth.gas_price
-            })
-            
-            signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            ), 5000000)  # 需要更多 gas
             
             if receipt.status == 1:
                 print("PageRank 得分更新成功")
@@ -0,0 +1,131 @@
+"""
+本地nonce管理
+按账户在本地分配nonce，同一账户的多笔交易可以连续发送，之后再批量确认回执；
+节点报告nonce错误时丢弃本地计数，从节点的pending交易数重新同步。
+"""
+
+import asyncio
+import threading
+from eth_account import Account
+
+# 节点返回这些错误时说明本地nonce与节点不一致
+NONCE_ERRORS = (
+    'nonce too low',
+    'nonce too high',
+    'invalid nonce',
+    'already known',
+    'replacement transaction underpriced'
+)
+
+
+def is_nonce_error(error):
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+
+def signer_account(signer):
+    """签名者可以是私钥或已加载的账户对象（LocalAccount）"""
+    return Account.from_key(signer) if isinstance(signer, (str, bytes, bytearray)) else signer
+
+
+class NonceBook:
+    """各账户下一个可用nonce的本地记录"""
+
+    def __init__(self):
+        self._next = {}  # 地址 -> 下一个nonce
+
+    def _take(self, address):
+        nonce = self._next[address]
+        self._next[address] = nonce + 1
+        return nonce
+
+    def release(self, address, nonce):
+        """分配的nonce未能发送：若是最后分配的则回收，否则重新同步，避免留下空洞"""
+        if self._next.get(address) == nonce + 1:
+            self._next[address] = nonce
+        else:
+            self.resync(address)
+
+    def resync(self, address):
+        """丢弃本地计数，下次分配时从节点重新读取"""
+        self._next.pop(address, None)
+
+
+class NonceManager(NonceBook):
+    """同步 Web3 使用的nonce管理器"""
+
+    def __init__(self, w3, max_retries=2):
+        super().__init__()
+        self.w3 = w3
+        self.max_retries = max_retries  # nonce错误后的重试次数
+        self._lock = threading.Lock()
+
+    def allocate(self, address):
+        with self._lock:
+            if address not in self._next:
+                self._next[address] = self.w3.eth.get_transaction_count(address, 'pending')
+            return self._take(address)
+
+    def send(self, signer, build_transaction):
+        """分配nonce并发送交易，不等待回执
+        signer 为私钥或账户对象；build_transaction(nonce) 返回未签名的交易字典；返回交易哈希
+        """
+        account = signer_account(signer)
+        for attempt in range(self.max_retries + 1):
+            nonce = self.allocate(account.address)
+            try:
+                signed_tx = account.sign_transaction(build_transaction(nonce))
+                return self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            except Exception as e:
+                with self._lock:
+                    if is_nonce_error(e):
+                        self.resync(account.address)
+                    else:
+                        self.release(account.address, nonce)
+                if not is_nonce_error(e) or attempt == self.max_retries:
+                    raise
+
+    def wait_for_receipts(self, tx_hashes, timeout=120):
+        """批量确认回执：交易已全部发出，总等待时间约等于最后一笔交易的确认时间"""
+        return [self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout) for tx_hash in tx_hashes]
+
+
+class AsyncNonceManager(NonceBook):
+    """AsyncWeb3 使用的nonce管理器"""
+
+    def __init__(self, w3, max_retries=2):
+        super().__init__()
+        self.w3 = w3
+        self.max_retries = max_retries
+        self._locks = {}  # 地址 -> asyncio.Lock，只在从节点同步时使用
+
+    async def allocate(self, address):
+        if address not in self._next:
+            lock = self._locks.setdefault(address, asyncio.Lock())
+            async with lock:
+                if address not in self._next:
+                    self._next[address] = await self.w3.eth.get_transaction_count(address, 'pending')
+        # 已同步的账户直接在本地分配，中间没有 await，不会与其他协程交错
+        return self._take(address)
+
+    async def send(self, signer, build_transaction):
+        """与 NonceManager.send 相同，build_transaction(nonce) 为协程函数"""
+        account = signer_account(signer)
+        for attempt in range(self.max_retries + 1):
+            nonce = await self.allocate(account.address)
+            try:
+                signed_tx = account.sign_transaction(await build_transaction(nonce))
+                return await self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            except Exception as e:
+                if is_nonce_error(e):
+                    self.resync(account.address)
+                else:
+                    self.release(account.address, nonce)
+                if not is_nonce_error(e) or attempt == self.max_retries:
+                    raise
+
+    async def wait_for_receipts(self, tx_hashes, timeout=120):
+        """并发等待一组交易的回执"""
+        return await asyncio.gather(*(
+            self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout) for tx_hash in tx_hashes
+        ))
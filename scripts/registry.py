@@ -0,0 +1,140 @@
+"""
+合约注册表
+每个合约的ABI只从Hardhat编译产物中加载一次，地址从部署清单读取，
+合约对象以及函数选择器、事件主题在进程生命周期内缓存。
+"""
+
+import json
+import os
+from web3 import Web3
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACTS_DIR = os.path.join(ROOT_DIR, 'artifacts', 'contracts')
+DEPLOYMENTS_DIR = os.path.join(ROOT_DIR, 'ignition', 'deployments')
+
+# Hardhat Ignition 部署模块名（见 ignition/modules/CitationSystem.js）
+IGNITION_MODULE = 'CitationSystemModule'
+
+# Hardhat本地链
+HARDHAT_CHAIN_ID = 31337
+
+# 没有部署清单时使用的地址（本地Hardhat节点上按默认顺序部署的结果）
+FALLBACK_ADDRESSES = {
+    'AuthorToken': '0x5FbDB2315678afecb367f032d93F642f64180aa3',
+    'CitationNetwork': '0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0',
+    'ProfitDistribution': '0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9',
+    'IdentityManagement': '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512'
+}
+
+
+def abi_type(param):
+    """ABI参数的规范类型名（展开tuple）"""
+    type_name = param['type']
+    if type_name.startswith('tuple'):
+        inner = ','.join(abi_type(component) for component in param['components'])
+        return f"({inner}){type_name[len('tuple'):]}"
+    return type_name
+
+
+def abi_signature(item):
+    """函数或事件的规范签名，如 addCitation(address,string)"""
+    return f"{item['name']}({','.join(abi_type(param) for param in item.get('inputs', []))})"
+
+
+class ContractEntry:
+    """单个合约的缓存：ABI、地址、合约对象、选择器和事件主题"""
+
+    def __init__(self, name, abi, address, contract):
+        self.name = name
+        self.abi = abi
+        self.address = address
+        self.contract = contract
+        self.functions = {}  # 函数名 -> ABI条目
+        self.selectors = {}  # 函数名 -> 4字节选择器
+        self.events = {}  # 事件名 -> ABI条目
+        self.topics = {}  # 事件名 -> 主题哈希
+        for item in abi:
+            if item.get('type') == 'function':
+                self.functions[item['name']] = item
+                self.selectors[item['name']] = Web3.keccak(text=abi_signature(item))[:4]
+            elif item.get('type') == 'event':
+                self.events[item['name']] = item
+                self.topics[item['name']] = Web3.keccak(text=abi_signature(item))
+        self.deployed = False  # 已确认链上存在代码后不再检查
+
+
+class ContractRegistry:
+    """按合约名缓存合约对象，适用于同步 Web3 和 AsyncWeb3"""
+
+    def __init__(self, w3, manifest_path=None, chain_id=None):
+        self.w3 = w3
+        self.manifest_path = manifest_path or os.environ.get('CONTRACT_MANIFEST')
+        self.chain_id = chain_id
+        self._addresses = None
+        self._entries = {}
+
+    def _manifest_file(self):
+        if self.manifest_path:
+            return self.manifest_path
+        chain_id = self.chain_id
+        if chain_id is None:
+            # 同步 Web3 可直接查询；AsyncWeb3 需在构造时传入 chain_id
+            chain_id = self.w3.eth.chain_id
+            self.chain_id = chain_id
+        return os.path.join(DEPLOYMENTS_DIR, f'chain-{chain_id}', 'deployed_addresses.json')
+
+    def addresses(self):
+        """读取部署清单（只读取一次），键为合约名"""
+        if self._addresses is None:
+            path = self._manifest_file()
+            try:
+                with open(path, 'r') as f:
+                    deployed = json.load(f)
+                # Ignition 清单的键形如 "CitationSystemModule#AuthorToken"
+                self._addresses = {key.split('#', 1)[-1]: Web3.to_checksum_address(value)
+                                   for key, value in deployed.items()}
+            except FileNotFoundError:
+                print(f"找不到部署清单 {path}，使用默认的本地部署地址")
+                self._addresses = dict(FALLBACK_ADDRESSES)
+        return self._addresses
+
+    def entry(self, contract_name):
+        """获取合约缓存项，首次访问时加载ABI并创建合约对象"""
+        entry = self._entries.get(contract_name)
+        if entry is not None:
+            return entry
+
+        contract_json_path = os.path.join(ARTIFACTS_DIR, f"{contract_name}.sol", f"{contract_name}.json")
+        try:
+            with open(contract_json_path, 'r') as f:
+                abi = json.load(f)['abi']
+        except FileNotFoundError:
+            print(f"找不到合约ABI文件: {contract_json_path}")
+            return None
+
+        address = self.addresses().get(contract_name)
+        if not address:
+            print(f"警告: {contract_name}合约地址未设置")
+            return None
+
+        entry = ContractEntry(contract_name, abi, address, self.w3.eth.contract(address=address, abi=abi))
+        self._entries[contract_name] = entry
+        return entry
+
+    def contract(self, contract_name):
+        entry = self.entry(contract_name)
+        return entry.contract if entry else None
+
+    def selector(self, contract_name, function_name):
+        return self.entry(contract_name).selectors[function_name]
+
+    def topic(self, contract_name, event_name):
+        return self.entry(contract_name).topics[event_name]
+
+    def entry_for_address(self, address):
+        """按地址查找已加载的合约"""
+        address = Web3.to_checksum_address(address)
+        for entry in self._entries.values():
+            if entry.address == address:
+                return entry
+        return None
@@ -0,0 +1,150 @@
+"""
+JSON-RPC批量读取
+将多个合约只读调用编码为 eth_call，按批次大小合并为一次HTTP请求发送，
+N个调用只需 ceil(N / chunk_size) 次往返。
+"""
+
+import asyncio
+import itertools
+import requests
+from eth_abi import decode, encode
+from web3 import Web3
+from registry import abi_type
+
+
+class RPCError(Exception):
+    """单个批量调用返回的错误"""
+
+
+def normalize(abi_types, values):
+    """与 web3 一致：地址转为校验和格式（含数组和tuple中的地址）"""
+    def convert(type_name, value):
+        if type_name.endswith(']'):
+            inner = type_name[:type_name.rindex('[')]
+            return [convert(inner, item) for item in value]
+        if type_name.startswith('('):
+            return tuple(convert(t, v) for t, v in zip(split_tuple(type_name), value))
+        if type_name == 'address':
+            return Web3.to_checksum_address(value)
+        return value
+    return [convert(t, v) for t, v in zip(abi_types, values)]
+
+
+def split_tuple(type_name):
+    """拆分 "(address,uint256[],(bool,bytes32))" 形式的tuple类型"""
+    parts, depth, current = [], 0, ''
+    for char in type_name[1:-1]:
+        if char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        depth += char == '('
+        depth -= char == ')'
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+class ContractCall:
+    """一次合约只读调用"""
+
+    def __init__(self, entry, function_name, *args):
+        self.entry = entry  # registry.ContractEntry
+        self.function_name = function_name
+        self.args = args
+
+    def calldata(self):
+        item = self.entry.functions[self.function_name]
+        input_types = [abi_type(param) for param in item.get('inputs', [])]
+        return Web3.to_hex(self.entry.selectors[self.function_name] + encode(input_types, list(self.args)))
+
+    def decode(self, result):
+        """与 web3 的 call() 返回值一致：单个返回值直接返回，多个返回值返回列表"""
+        outputs = self.entry.functions[self.function_name].get('outputs', [])
+        output_types = [abi_type(param) for param in outputs]
+        values = normalize(output_types, decode(output_types, Web3.to_bytes(hexstr=result)))
+        return values[0] if len(values) == 1 else list(values)
+
+
+def encode_request(request_id, call, block_identifier='latest'):
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'method': 'eth_call',
+        'params': [{'to': call.entry.address, 'data': call.calldata()}, block_identifier]
+    }
+
+
+def error_message(error):
+    return error.get('message', str(error)) if isinstance(error, dict) else str(error)
+
+
+def decode_response(call, response):
+    """解码单个响应；错误或无法解码的结果转为该位置的 RPCError，不影响同批次的其他调用"""
+    if 'error' in response:
+        return RPCError(error_message(response['error']))
+    try:
+        return call.decode(response['result'])
+    except Exception as e:
+        return RPCError(f"{call.function_name}: failed to decode result: {e}")
+
+
+def decode_batch(payload, chunk, body):
+    """按请求ID匹配批量响应（节点不保证响应顺序）"""
+    if not isinstance(body, list):
+        # 节点拒绝整个批量请求（如超出批量上限）时返回单个错误对象
+        error = body.get('error', body) if isinstance(body, dict) else body
+        raise RPCError(f"batch request rejected: {error_message(error)}")
+    by_id = {item['id']: item for item in body if isinstance(item, dict) and 'id' in item}
+    results = []
+    for request, call in zip(payload, chunk):
+        item = by_id.get(request['id'])
+        results.append(RPCError('missing response') if item is None else decode_response(call, item))
+    return results
+
+
+class BatchReader:
+    """同步批量读取"""
+
+    def __init__(self, endpoint_uri, chunk_size=100, timeout=30):
+        self.endpoint_uri = endpoint_uri
+        self.chunk_size = chunk_size  # 每个批量请求包含的调用数
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._ids = itertools.count(1)
+
+    def call_many(self, calls, block_identifier='latest'):
+        """执行一组调用，按顺序返回解码结果；失败的调用对应位置为 RPCError 实例，
+        整个批量请求被节点拒绝时抛出 RPCError"""
+        results = []
+        for start in range(0, len(calls), self.chunk_size):
+            chunk = calls[start:start + self.chunk_size]
+            payload = [encode_request(next(self._ids), call, block_identifier) for call in chunk]
+            response = self.session.post(self.endpoint_uri, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            results.extend(decode_batch(payload, chunk, response.json()))
+        return results
+
+
+class AsyncBatchReader:
+    """异步批量读取：各批次并发发送，使用调用方提供的 aiohttp 会话"""
+
+    def __init__(self, endpoint_uri, session=None, chunk_size=100):
+        self.endpoint_uri = endpoint_uri
+        self.session = session  # aiohttp.ClientSession，通常与 AsyncWeb3 的 provider 共享
+        self.chunk_size = chunk_size
+        self._ids = itertools.count(1)
+
+    async def _post(self, chunk, block_identifier):
+        payload = [encode_request(next(self._ids), call, block_identifier) for call in chunk]
+        async with self.session.post(self.endpoint_uri, json=payload) as response:
+            response.raise_for_status()
+            body = await response.json()
+        return decode_batch(payload, chunk, body)
+
+    async def call_many(self, calls, block_identifier='latest'):
+        """与 BatchReader.call_many 相同的返回约定"""
+        chunks = [calls[start:start + self.chunk_size] for start in range(0, len(calls), self.chunk_size)]
+        results = await asyncio.gather(*(self._post(chunk, block_identifier) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
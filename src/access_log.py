@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, Optional, TextIO
+import json
+import queue
+import random
+import sys
+import threading
+import time
+
+# 不记录原值的请求头和请求体字段
+REDACTED_HEADERS = {"public-key", "signature", "session-token", "authorization", "cookie"}
+REDACTED_BODY_FIELDS = {"private_key", "signature", "session_token"}
+REDACTED = "[REDACTED]"
+
+class AccessLogger:
+    """访问日志：请求路径上只做一次非阻塞入队，格式化和写出由后台线程完成"""
+
+    def __init__(self, stream: Optional[TextIO] = None, sample_rate: float = 1.0,
+                 max_body_bytes: int = 1024, queue_size: int = 10000):
+        self.stream = stream or sys.stdout
+        self.sample_rate = sample_rate  # 正常请求的采样率，5xx响应总是记录
+        self.max_body_bytes = max_body_bytes  # 记录的请求体上限
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+
+    def should_sample(self) -> bool:
+        """决定是否记录当前请求"""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def log(self, record: Dict) -> None:
+        """提交一条日志记录，队列已满时直接丢弃"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+                self._writer.start()
+
+    def _run(self) -> None:
+        """后台线程：批量取出记录，脱敏后写出"""
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            lines = [self._format(record)]
+            # 顺带取出已积压的记录，合并为一次写入
+            while len(lines) < 256:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._write(lines)
+                    return
+                lines.append(self._format(record))
+            self._write(lines)
+
+    def _write(self, lines: Iterable[str]) -> None:
+        try:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+        except Exception:
+            pass
+
+    def _format(self, record: Dict) -> str:
+        """脱敏请求头和请求体，序列化为一行JSON"""
+        headers = record.pop("headers", None)
+        if headers is not None:
+            record["headers"] = {}
+            for name, value in headers:
+                name = name.decode("latin-1")
+                record["headers"][name] = REDACTED if name in REDACTED_HEADERS else value.decode("latin-1")
+        body = record.pop("body", None)
+        if body:
+            record["body"] = self._redact_body(body)
+        return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+    def _redact_body(self, body: bytes):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            # 被截断或非JSON的请求体无法逐字段脱敏，只记录长度
+            return f"<{len(body)} bytes>"
+        if isinstance(data, dict):
+            return {key: (REDACTED if key in REDACTED_BODY_FIELDS else value) for key, value in data.items()}
+        return data
+
+    def close(self, timeout: float = 1.0) -> None:
+        """通知后台线程写完剩余记录后退出"""
+        if self._writer is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._writer.join(timeout)
+        self._writer = None
+
+    def stats(self) -> Dict:
+        """获取访问日志统计信息"""
+        return {
+            "sample_rate": self.sample_rate,
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped
+        }
+
+class AccessLogMiddleware:
+    """ASGI中间件：在应用读取请求体时顺带截取，不额外等待请求体"""
+
+    def __init__(self, app, logger: AccessLogger):
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        sampled = self.logger.should_sample()
+        body = bytearray()
+        body_size = 0
+        status_code = 500
+        max_body = self.logger.max_body_bytes
+
+        async def receive_wrapper():
+            nonlocal body_size
+            message = await receive()
+            if sampled and message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_size += len(chunk)
+                if len(body) < max_body:
+                    body.extend(chunk[:max_body - len(body)])
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if sampled or status_code >= 500:
+                client = scope.get("client")
+                self.logger.log({
+                    "ts": time.time(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                    "client": client[0] if client else None,
+                    "headers": scope["headers"],
+                    "body": bytes(body) if body_size <= max_body else None,
+                    "body_bytes": body_size,
+                })
@@ -1,27 +1,178 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, FrozenSet, List, Literal, Optional, Tuple, Type
+from datetime import datetime
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import math
+import threading
+import uuid
 from .models import Author, Paper, Citation, TokenTransaction
-from .auth import AuthSystem
-from .citation_network import CitationNetwork
-from .token_system import TokenSystem
-
-app = FastAPI(title="Academic Citation System API")
-
-# 添加CORS中间件
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:8097"],  # 允许的前端源
-    allow_credentials=True,
-    allow_methods=["*"],  # 允许所有HTTP方法
-    allow_headers=["*"],  # 允许所有HTTP头
-)
-
-# 初始化系统组件
-auth_system = AuthSystem()
-citation_network = CitationNetwork()
-token_system = TokenSystem(citation_network)
+from .config import AppConfig
+from .rate_limit import TokenBucketLimiter
+from .pagination import encode_cursor, decode_cursor
+from .export import ndjson_stream, gzip_stream
+from .access_log import AccessLogger, AccessLogMiddleware
+from .encoding import SnapshotCache, encode_json
+from .events import EventBus, sse_stream
+from .metrics import REGISTRY, MetricsMiddleware
+
+# 启动耗时：模块导入、子系统加载、状态重放及首个响应
+STARTUP_SECONDS = REGISTRY.gauge("app_startup_seconds", "Seconds spent in each startup phase", ["phase"])
+
+# 系统组件在 init_components 中按需导入和构建，导入本模块不会加载 networkx、numpy 和 cryptography
+state_backend = None
+auth_system = None
+event_bus = None
+citation_network = None
+token_system = None
+shared_state = None
+mint_jobs = None
+repository = None  # 持久化仓库（SQLite后端时可用），供内存中未建索引的查询使用
+
+# 由 create_app 按配置创建
+config: Optional[AppConfig] = None
+access_logger: Optional[AccessLogger] = None
+key_rate_limiter: Optional[TokenBucketLimiter] = None
+ip_rate_limiter: Optional[TokenBucketLimiter] = None
+
+_ready = threading.Event()
+_init_lock = threading.Lock()
+startup_timings: Dict[str, float] = {}
+
+def _record_startup(phase: str, seconds: float) -> None:
+    startup_timings[phase] = round(seconds, 6)
+    STARTUP_SECONDS.set(seconds, phase)
+
+def init_components() -> None:
+    """导入并构建各子系统，重放共享后端中已有的状态；多次调用只执行一次"""
+    global state_backend, auth_system, event_bus, citation_network, token_system
+    global shared_state, mint_jobs, repository
+    with _init_lock:
+        if _ready.is_set():
+            return
+        started = time.perf_counter()
+        from .auth import AuthSystem
+        from .citation_network import CitationNetwork
+        from .token_system import TokenSystem
+        from .storage import create_backend
+        from .state import SharedState
+        from .repository import Repository
+        from .jobs import MintJobQueue
+        _record_startup("imports", time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        # STATE_BACKEND=sqlite:///path/to/state.db 时多个worker进程共享同一份状态
+        state_backend = create_backend(config.state_backend)
+        auth_system = AuthSystem(session_secret=state_backend.get_secret("session"))
+        event_bus = EventBus()
+        citation_network = CitationNetwork(event_bus)
+        token_system = TokenSystem(citation_network, event_bus)
+        shared_state = SharedState(state_backend, auth_system, citation_network, token_system)
+        # 铸币任务在引用写入后异步合并结算
+        mint_jobs = MintJobQueue(shared_state, token_system, window=config.mint_batch_window)
+        repository = state_backend if isinstance(state_backend, Repository) else None
+        _register_state_metrics()
+        _record_startup("components", time.perf_counter() - started)
+        
+        # 从共享后端的变更流重放已有状态，并预先编码统计快照
+        started = time.perf_counter()
+        shared_state.sync()
+        snapshot_cache.get_or_encode(snapshot_key(NETWORK_STATS_KEY), citation_network.version, network_stats)
+        _record_startup("replay", time.perf_counter() - started)
+        _ready.set()
+
+async def sync_shared_state():
+    """处理请求前确保子系统已加载，并重放其他worker写入的变更"""
+    if not _ready.is_set():
+        # 后台预热尚未完成（或未开启）时在线程池中等待加载，不阻塞事件循环
+        await asyncio.get_running_loop().run_in_executor(None, init_components)
+    # 首个请求时继续结算重启前未完成的铸币任务（之后为空操作）
+    mint_jobs.resume()
+    await shared_state.sync_async()
+
+# 业务接口都挂在该路由上；健康检查接口不依赖子系统
+router = APIRouter(dependencies=[Depends(sync_shared_state)])
+health_router = APIRouter()
+
+# 已编码响应的缓存，按存储版本失效
+snapshot_cache = SnapshotCache()
+
+def _register_state_metrics() -> None:
+    """注册抓取时计算的指标：存储规模和各缓存命中率"""
+    REGISTRY.callback_gauge("citation_store_size", "Number of records held in memory", ["store"], lambda: [
+        (("papers",), len(citation_network.papers)),
+        (("citations",), len(citation_network.citations)),
+        (("authors",), len(token_system.authors)),
+        (("transactions",), len(token_system.transactions)),
+        (("pending_mint_jobs",), mint_jobs.stats()["pending"]),
+    ])
+    REGISTRY.callback_gauge("citation_cache_hit_ratio", "Hit ratio of in-process caches", ["cache"], lambda: [
+        (("signature_verification",), auth_system.get_verification_cache_stats()["hit_rate"]),
+        (("response_snapshot",), snapshot_cache.stats()["hit_rate"]),
+        (("graph_traversal",), citation_network.get_traversal_cache_stats()["hit_rate"]),
+    ])
+
+# ETag中包含进程标识，避免重启后版本计数器归零导致误匹配
+ETAG_EPOCH = uuid.uuid4().hex[:12]
+
+def make_etag(key: Tuple, version) -> str:
+    """由完整的缓存键（路径、查询参数、游标和字段投影）及存储版本生成ETag"""
+    versions = version if isinstance(version, tuple) else (version,)
+    parts = [sorted(part) if isinstance(part, frozenset) else part for part in key]
+    digest = hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).hexdigest()
+    return f'"{ETAG_EPOCH}-{key[0].replace("/", "-")}-{digest}-{".".join(str(v) for v in versions)}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def snapshot_key(key: Tuple, projection: Optional[FrozenSet[str]] = None) -> Tuple:
+    """快照缓存和ETag使用的完整键，预热时也需通过它生成"""
+    return key + (projection,)
+
+def cached_json(request: Request, key: Tuple, version, build,
+                projection: Optional[FrozenSet[str]] = None) -> Response:
+    """返回缓存的JSON响应：ETag匹配时直接返回304，存储版本变化时重新编码"""
+    key = snapshot_key(key, projection)
+    etag = make_etag(key, version)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+    body, headers = snapshot_cache.get_or_encode(key, version, build, projection)
+    return Response(content=body, media_type="application/json", headers={**headers, **cache_headers})
+
+# 字段投影：列表接口默认返回不含公钥PEM、引用列表等大字段的精简视图，fields=* 返回全部字段
+COMPACT_FIELDS = {
+    Author: frozenset({"id", "name", "token_balance", "created_at"}),
+    Paper: frozenset({"id", "title", "authors", "created_at"}),
+}
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel],
+                 default: Optional[FrozenSet[str]] = None) -> Optional[FrozenSet[str]]:
+    """解析逗号分隔的 fields 参数，返回需要序列化的字段集合（None表示全部字段）"""
+    if fields is None:
+        return default
+    if fields.strip() == "*":
+        return None
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - model.model_fields.keys()
+    if not requested or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown)) or fields}")
+    return requested
+
+def projected(data, projection: Optional[FrozenSet[str]]):
+    """未指定投影时交给 response_model 序列化，否则只编码请求的字段"""
+    if projection is None:
+        return data
+    return Response(content=encode_json(data, projection), media_type="application/json")
 
 # 请求模型
 class AuthorCreate(BaseModel):
@@ -48,126 +199,420 @@ class SignMessageRequest(BaseModel):
     message: str
 
 # 依赖项
-async def verify_author(public_key: str = Header(...), signature: str = Header(...), message: str = Header(...)):
-    if not auth_system.verify_author(public_key, message, signature):
+def admit_request(limiter: TokenBucketLimiter, key: str) -> None:
+    """令牌不足时直接返回429，不进行任何签名运算"""
+    if not limiter.acquire(key):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(limiter.retry_after(key)))}
+        )
+
+async def verify_signed_author(request: Request, public_key: Optional[str] = Header(None),
+                               signature: Optional[str] = Header(None), message: Optional[str] = Header(None),
+                               key_id: Optional[str] = Header(None)):
+    # key-id 请求头（公钥指纹）可代替完整的 public-key 请求头
+    if not ((public_key or key_id) and signature and message):
+        raise HTTPException(status_code=401, detail="Missing author signature headers")
+    admit_request(ip_rate_limiter, request.client.host if request.client else "unknown")
+    admit_request(key_rate_limiter, key_id.lower() if key_id else auth_system.key_fingerprint(public_key))
+    if not auth_system.verify_author(public_key, message, signature, key_id=key_id):
         raise HTTPException(status_code=401, detail="Invalid author signature")
-    return auth_system.get_author_id(public_key)
+    return auth_system.get_author_id(public_key, key_id=key_id)
+
+async def verify_author(request: Request, public_key: Optional[str] = Header(None), signature: Optional[str] = Header(None),
+                        message: Optional[str] = Header(None), key_id: Optional[str] = Header(None),
+                        session_token: Optional[str] = Header(None)):
+    # 优先使用会话令牌（仅需一次HMAC校验），否则回退到签名验证
+    if session_token:
+        author_id = auth_system.verify_session(session_token)
+        if author_id is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired session token")
+        return author_id
+    return await verify_signed_author(request, public_key, signature, message, key_id)
+
+# 分页参数
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def parse_cursor(cursor: Optional[str], sort: str) -> Optional[Tuple]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def next_cursor_headers(sort: str, next_key: Optional[Tuple]) -> dict:
+    # 列表接口的响应体保持为数组，下一页游标通过响应头返回
+    return {"X-Next-Cursor": encode_cursor(sort, next_key)} if next_key is not None else {}
 
 # 作者相关接口
-@app.get("/authors", response_model=List[Author])
-async def get_authors():
-    """获取所有作者列表"""
-    return list(token_system.authors.values())
+@router.get("/authors", response_model=List[Author])
+async def get_authors(request: Request,
+                      limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                      cursor: Optional[str] = None,
+                      order: Literal["asc", "desc"] = "asc",
+                      fields: Optional[str] = None):
+    """分页获取作者列表（按创建时间排序）"""
+    after = parse_cursor(cursor, "created_at")
+    projection = parse_fields(fields, Author, COMPACT_FIELDS[Author])
+    
+    def build():
+        authors, next_key = token_system.list_authors(limit, after, descending=order == "desc")
+        return authors, next_cursor_headers("created_at", next_key)
+    
+    return cached_json(request, ("authors", limit, cursor, order),
+                       (token_system.version, auth_system.version), build, projection)
 
-@app.post("/authors", response_model=Author)
+@router.post("/authors", response_model=Author)
 async def create_author(author_data: AuthorCreate):
     author = Author(**author_data.dict())
-    auth_system.register_author(author.id, author.public_key)
-    token_system.register_author(author)
-    return author
+    await shared_state.record_async("author", author)
+    return token_system.authors[author.id]
 
-@app.get("/authors/{author_id}", response_model=Author)
-async def get_author(author_id: str):
+@router.get("/authors/{author_id}", response_model=Author)
+async def get_author(author_id: str, fields: Optional[str] = None):
+    projection = parse_fields(fields, Author)
     author = token_system.authors.get(author_id)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
-    return author
+    return projected(author, projection)
 
 # 论文相关接口
-@app.get("/papers", response_model=List[Paper])
-async def get_papers():
-    """获取所有论文列表"""
-    return list(citation_network.papers.values())
+@router.get("/papers", response_model=List[Paper])
+async def get_papers(request: Request,
+                     limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                     cursor: Optional[str] = None,
+                     sort: Literal["created_at", "citation_count"] = "created_at",
+                     order: Literal["asc", "desc"] = "asc",
+                     author_id: Optional[str] = None,
+                     fields: Optional[str] = None):
+    """分页获取论文列表，可按作者过滤"""
+    after = parse_cursor(cursor, sort)
+    projection = parse_fields(fields, Paper, COMPACT_FIELDS[Paper])
+    
+    def build():
+        papers, next_key = citation_network.list_papers(
+            limit, after, sort=sort, descending=order == "desc", author_id=author_id
+        )
+        return papers, next_cursor_headers(sort, next_key)
+    
+    return cached_json(request, ("papers", limit, cursor, sort, order, author_id),
+                       citation_network.version, build, projection)
 
-@app.post("/papers", response_model=Paper)
+@router.get("/papers/search", response_model=List[Paper])
+async def search_papers(request: Request, q: str = Query(..., max_length=200),
+                        limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+                        fields: Optional[str] = None):
+    """按标题前缀搜索论文（供前端输入联想使用）"""
+    projection = parse_fields(fields, Paper, COMPACT_FIELDS[Paper])
+    
+    def build():
+        return citation_network.search_papers(q, limit), {}
+    
+    return cached_json(request, ("papers_search", q.casefold(), limit),
+                       citation_network.version, build, projection)
+
+@router.post("/papers", response_model=Paper)
 async def create_paper(paper_data: PaperCreate, author_id: str = Depends(verify_author)):
     if author_id not in paper_data.authors:
         raise HTTPException(status_code=403, detail="Author must be included in paper authors")
     paper = Paper(**paper_data.dict())
-    citation_network.add_paper(paper)
-    return paper
+    await shared_state.record_async("paper", paper)
+    return citation_network.papers[paper.id]
 
-@app.get("/papers/{paper_id}", response_model=Paper)
-async def get_paper(paper_id: str):
+@router.get("/papers/{paper_id}", response_model=Paper)
+async def get_paper(paper_id: str, fields: Optional[str] = None):
+    projection = parse_fields(fields, Paper)
     paper = citation_network.papers.get(paper_id)
     if not paper:
         raise HTTPException(status_code=404, detail="Paper not found")
-    return paper
+    return projected(paper, projection)
 
 # 引用相关接口
-@app.get("/citations", response_model=List[Citation])
-async def get_citations():
-    """获取所有引用列表"""
-    return list(citation_network.citations.values())
+@router.get("/citations", response_model=List[Citation])
+async def get_citations(request: Request,
+                        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                        cursor: Optional[str] = None,
+                        order: Literal["asc", "desc"] = "asc",
+                        citing_paper_id: Optional[str] = None,
+                        cited_paper_id: Optional[str] = None,
+                        fields: Optional[str] = None):
+    """分页获取引用列表（按创建时间排序），可按引用/被引论文过滤"""
+    after = parse_cursor(cursor, "created_at")
+    projection = parse_fields(fields, Citation)
+    
+    def build():
+        citations, next_key = citation_network.list_citations(
+            limit, after, descending=order == "desc",
+            citing_paper_id=citing_paper_id, cited_paper_id=cited_paper_id
+        )
+        return citations, next_cursor_headers("created_at", next_key)
+    
+    return cached_json(request, ("citations", limit, cursor, order, citing_paper_id, cited_paper_id),
+                       citation_network.version, build, projection)
 
-@app.post("/citations", response_model=Citation)
-async def create_citation(citation_data: CitationCreate, author_id: str = Depends(verify_author)):
+@router.post("/citations", response_model=Citation)
+async def create_citation(citation_data: CitationCreate, response: Response, author_id: str = Depends(verify_author)):
     # 验证引用论文的作者身份
     citing_paper = citation_network.papers.get(citation_data.citing_paper_id)
     if not citing_paper or author_id not in citing_paper.authors:
         raise HTTPException(status_code=403, detail="Author must be the citing paper's author")
     
     citation = Citation(**citation_data.dict())
-    if not citation_network.add_citation(citation):
+    if not citation_network.validate_citation(citation):
         raise HTTPException(status_code=400, detail="Invalid citation")
+    await shared_state.record_async("citation", citation)
     
-    # 为被引用者铸造代币
-    cited_paper = citation_network.papers.get(citation.cited_paper_id)
-    for author_id in cited_paper.authors:
-        token_system.mint_tokens_for_citation(author_id)
-    
+    # 引用写入后立即返回，被引用者的铸币由任务队列合并结算
+    mint_jobs.submit(citation.id)
+    response.headers["Location"] = f"/citations/{citation.id}/mint"
     return citation
 
+@router.get("/citations/{citation_id}/mint")
+async def get_mint_status(citation_id: str):
+    """查询引用对应的铸币任务状态"""
+    job = mint_jobs.get(citation_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Mint job not found")
+    return job.to_dict()
+
 # 代币相关接口
-@app.get("/authors/{author_id}/balance")
+@router.get("/authors/{author_id}/balance")
 async def get_balance(author_id: str):
     return {"balance": token_system.get_author_balance(author_id)}
 
-@app.post("/authors/{author_id}/burn")
+@router.post("/authors/{author_id}/burn")
 async def burn_tokens(author_id: str, burn_request: TokenBurnRequest):
-    if not token_system.burn_tokens(author_id, burn_request.amount, burn_request.reason):
+    transaction = token_system.build_burn_transaction(author_id, burn_request.amount, burn_request.reason)
+    if transaction is None:
         raise HTTPException(status_code=400, detail="Invalid burn request")
+    await shared_state.record_async("transaction", transaction)
+    # 其他worker的并发销毁先写入变更流时，本次销毁在重放时因余额不足被拒绝
+    if token_system.is_rejected(transaction.id):
+        raise HTTPException(status_code=400, detail="Insufficient balance")
     return {"status": "success"}
 
-@app.get("/authors/{author_id}/transactions", response_model=List[TokenTransaction])
-async def get_transactions(author_id: str):
-    return token_system.get_author_token_history(author_id)
+@router.get("/authors/{author_id}/transactions", response_model=List[TokenTransaction])
+async def get_transactions(author_id: str, since: Optional[datetime] = None,
+                           limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE)):
+    if since is not None and since.tzinfo is not None:
+        # 交易的创建时间为不带时区的本地时间，带时区的 since 先转换为本地时间
+        since = since.astimezone().replace(tzinfo=None)
+    if repository:
+        # 按 (author_id, created_at) 索引查询，无需扫描全部交易
+        return await repository.run(repository.get_author_token_history, author_id, since, limit)
+    history = token_system.get_author_token_history(author_id)
+    if since is not None:
+        history = [tx for tx in history if tx.created_at >= since]
+    return history[:limit] if limit else history
+
+# 图遍历接口（遍历深度、展开数和访问节点数均有上限，超出时返回 truncated=true）
+GraphDirection = Literal["cites", "cited_by", "both"]
+
+@router.get("/graph/papers/{paper_id}/neighborhood")
+async def get_paper_neighborhood(paper_id: str, depth: int = Query(2, ge=1, le=4),
+                                 direction: GraphDirection = "both",
+                                 max_fanout: int = Query(50, ge=1, le=500)):
+    """获取论文的k跳引用邻域"""
+    result = citation_network.get_neighborhood(paper_id, depth, direction, max_fanout)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return result
+
+@router.get("/graph/path")
+async def get_citation_path(source_id: str, target_id: str, direction: GraphDirection = "cites",
+                            max_depth: int = Query(6, ge=1, le=10)):
+    """查找两篇论文之间的最短引用路径，未找到时 path 为 null"""
+    result = citation_network.find_citation_path(source_id, target_id, direction, max_depth)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return result
+
+@router.get("/graph/papers/{paper_id}/co-citing")
+async def get_paper_co_citing(paper_id: str, limit: int = Query(20, ge=1, le=200)):
+    """引用了该论文参考文献的其他论文"""
+    if paper_id not in citation_network.papers:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return citation_network.get_co_citing_papers([paper_id], limit)
+
+@router.get("/graph/authors/{author_id}/co-citing")
+async def get_author_co_citing(author_id: str, limit: int = Query(20, ge=1, le=200)):
+    """引用了作者所引文献的其他论文"""
+    if author_id not in token_system.authors:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return citation_network.get_co_citing_papers(citation_network.get_author_papers(author_id), limit)
 
 # 统计信息接口
-@app.get("/stats/network")
-async def get_network_stats():
-    return citation_network.get_citation_network_stats()
+NETWORK_STATS_KEY = ("stats/network",)
+
+def network_stats():
+    return citation_network.get_citation_network_stats(), None
+
+@router.get("/stats/network")
+async def get_network_stats(request: Request):
+    return cached_json(request, NETWORK_STATS_KEY, citation_network.version, network_stats)
+
+@router.get("/stats/tokens")
+async def get_token_stats(request: Request):
+    return cached_json(request, ("stats/tokens",), token_system.version,
+                       lambda: (token_system.get_token_stats(), None))
+
+@router.get("/stats/auth")
+async def get_auth_stats():
+    return {
+        "verification_cache": auth_system.get_verification_cache_stats(),
+        "rate_limits": {
+            "per_key": key_rate_limiter.stats(),
+            "per_ip": ip_rate_limiter.stats()
+        }
+    }
+
+@router.get("/stats/graph")
+async def get_graph_stats():
+    return {"traversal_cache": citation_network.get_traversal_cache_stats()}
+
+@router.get("/stats/mint-jobs")
+async def get_mint_job_stats():
+    return mint_jobs.stats()
+
+@router.get("/stats/events")
+async def get_event_stats():
+    return event_bus.stats()
+
+# 导出接口
+EXPORT_SOURCES = {
+    "papers": lambda limit, after: citation_network.list_papers(limit, after),
+    "citations": lambda limit, after: citation_network.list_citations(limit, after),
+    "transactions": lambda limit, after: token_system.list_transactions(limit, after),
+}
 
-@app.get("/stats/tokens")
-async def get_token_stats():
-    return token_system.get_token_stats()
+@router.get("/export/{dataset}.ndjson")
+async def export_ndjson(dataset: Literal["papers", "citations", "transactions"],
+                        chunk_size: int = Query(500, ge=1, le=10000),
+                        compress: bool = False):
+    """以NDJSON流的形式导出全部论文、引用或交易记录"""
+    stream = ndjson_stream(EXPORT_SOURCES[dataset], chunk_size)
+    headers = {"Content-Disposition": f'attachment; filename="{dataset}.ndjson"'}
+    if compress:
+        stream = gzip_stream(stream)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(stream, media_type="application/x-ndjson", headers=headers)
+
+# 实时事件接口
+@router.get("/events/stream")
+async def stream_events(coalesce: float = Query(0.0, ge=0.0, le=60.0)):
+    """以SSE推送新论文、引用、铸币和销毁事件；coalesce>0时按秒数窗口合并为统计增量"""
+    def totals():
+        return {
+            "total_papers": len(citation_network.papers),
+            "total_citations": len(citation_network.citations),
+            "total_supply": token_system.total_supply
+        }
+    
+    stream = sse_stream(event_bus, coalesce=coalesce, totals=totals)
+    return StreamingResponse(stream, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# 监控指标接口
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """以Prometheus文本格式导出指标"""
+    return Response(content=REGISTRY.render(), media_type=REGISTRY.content_type)
 
 # 工具接口
-@app.post("/auth/generate-keys")
+@router.post("/auth/generate-keys")
 async def generate_keys():
     return auth_system.generate_key_pair()
 
-@app.post("/auth/sign")
+@router.post("/auth/session")
+async def create_session(author_id: str = Depends(verify_signed_author)):
+    """验证一次签名后签发短期会话令牌"""
+    session = auth_system.new_session(author_id)
+    await shared_state.record_async("session", session)
+    return auth_system.encode_session_token(session)
+
+@router.delete("/auth/session")
+async def revoke_session(session_token: str = Header(...)):
+    """撤销会话令牌"""
+    if auth_system.verify_session(session_token) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await shared_state.record_async("session_revoked", {"session_id": auth_system.session_id_from_token(session_token)})
+    return {"status": "success"}
+
+@router.post("/auth/sign")
 async def sign_message(request: SignMessageRequest):
     """使用私钥签名消息"""
     try:
-        print(f"Received sign request with data: {request.dict()}")  # 添加日志
         signature = auth_system.sign_message(request.private_key, request.message)
         return {"signature": signature}
     except Exception as e:
-        print(f"Error in sign_message: {str(e)}")  # 添加错误日志
         raise HTTPException(status_code=400, detail=str(e))
 
-# 添加请求日志中间件
-@app.middleware("http")
-async def log_requests(request, call_next):
-    print(f"\nRequest: {request.method} {request.url}")
-    print(f"Headers: {request.headers}")
-    try:
-        body = await request.body()
-        if body:
-            print(f"Body: {body.decode()}")
-    except:
-        pass
-    response = await call_next(request)
-    return response 
\ No newline at end of file
+# 健康检查接口
+@health_router.get("/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+@health_router.get("/health/ready")
+async def readiness():
+    """子系统加载、状态重放和缓存预热完成后返回200，否则返回503"""
+    body = {"ready": _ready.is_set(), "startup": startup_timings}
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+# 应用工厂
+async def _warm_start():
+    # 在后台线程中加载子系统，启动后立即开始接受请求
+    threading.Thread(target=init_components, name="warm-start", daemon=True).start()
+
+async def _shutdown():
+    if _ready.is_set():
+        await mint_jobs.close()
+        state_backend.close()
+    access_logger.close()
+
+def create_app(app_config: Optional[AppConfig] = None) -> FastAPI:
+    """按配置创建应用；子系统在后台预热（warm_start）或首个请求时加载。每个进程同一时间只服务一个应用实例"""
+    global config, access_logger, key_rate_limiter, ip_rate_limiter
+    created = time.perf_counter()
+    config = app_config or AppConfig.from_env()
+    _ready.clear()
+    
+    app = FastAPI(title="Academic Citation System API")
+    
+    # 添加CORS中间件
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=config.cors_origins,  # 允许的前端源
+        allow_credentials=True,
+        allow_methods=["*"],  # 允许所有HTTP方法
+        allow_headers=["*"],  # 允许所有HTTP头
+        expose_headers=["X-Next-Cursor", "ETag"],  # 分页游标和缓存校验
+    )
+    
+    # 结构化访问日志（后台线程写出，可配置采样率和请求体上限）
+    access_logger = AccessLogger(
+        stream=open(config.access_log_file, "a", encoding="utf-8") if config.access_log_file else None,
+        sample_rate=config.access_log_sample_rate,
+        max_body_bytes=config.access_log_max_body
+    )
+    app.add_middleware(AccessLogMiddleware, logger=access_logger)
+    app.add_middleware(MetricsMiddleware, registry=REGISTRY,
+                       on_first_response=lambda: _record_startup("first_byte", time.perf_counter() - created))
+    
+    # 签名请求的准入控制：在任何签名验证之前按公钥和客户端IP限流
+    key_rate_limiter = TokenBucketLimiter(rate=config.rate_limit_key_rate, burst=config.rate_limit_key_burst)
+    ip_rate_limiter = TokenBucketLimiter(rate=config.rate_limit_ip_rate, burst=config.rate_limit_ip_burst)
+    
+    app.include_router(health_router)
+    app.include_router(router)
+    if config.warm_start:
+        app.add_event_handler("startup", _warm_start)
+    app.add_event_handler("shutdown", _shutdown)
+    return app
+
+_record_startup("import", time.perf_counter() - _import_started)
+
+# 兼容 uvicorn src.api:app；也可使用 uvicorn --factory src.api:create_app
+app = create_app()
@@ -2,12 +2,33 @@ from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
+from collections import OrderedDict
+from typing import Dict, Optional
 import base64
+import hashlib
+import hmac
 import json
+import os
+import time
+import uuid
+from .cache import TTLCache
+from .metrics import timed
 
 class AuthSystem:
-    def __init__(self):
-        self._authors = {}  # public_key -> author_id mapping
+    def __init__(self, session_secret: Optional[bytes] = None, session_ttl: int = 900,
+                 max_sessions: int = 10000, verify_cache_size: int = 10000,
+                 verify_cache_ttl: float = 300.0):
+        self._authors = {}  # key fingerprint -> (author_id, parsed public key)
+        self.version = 0  # 每次注册递增，用于缓存失效
+        
+        # 签名验证结果缓存（只缓存验证成功的结果）
+        self._verify_cache = TTLCache(max_size=verify_cache_size, ttl=verify_cache_ttl)
+        
+        # 会话令牌参数
+        self._session_secret = session_secret or os.urandom(32)
+        self.session_ttl = session_ttl  # 会话有效期（秒）
+        self.max_sessions = max_sessions  # 会话存储上限
+        self._sessions: OrderedDict = OrderedDict()  # session_id -> (author_id, expires_at)
         
     def generate_key_pair(self):
         """生成RSA密钥对"""
@@ -31,9 +52,11 @@ class AuthSystem:
             format=serialization.PublicFormat.SubjectPublicKeyInfo
         )
         
+        encoded_public_key = base64.b64encode(public_pem).decode('utf-8')
         return {
             'private_key': base64.b64encode(private_pem).decode('utf-8'),
-            'public_key': base64.b64encode(public_pem).decode('utf-8')
+            'public_key': encoded_public_key,
+            'key_id': self.key_fingerprint(encoded_public_key)
         }
     
     def sign_message(self, private_key_pem: str, message: str) -> str:
@@ -55,14 +78,28 @@ class AuthSystem:
         
         return base64.b64encode(signature).decode('utf-8')
     
-    def verify_signature(self, public_key_pem: str, message: str, signature: str) -> bool:
-        """验证签名"""
+    @staticmethod
+    def key_fingerprint(public_key_pem: str) -> str:
+        """计算公钥指纹（PEM内容的SHA-256十六进制摘要）"""
+        try:
+            key_bytes = base64.b64decode(public_key_pem, validate=True)
+        except ValueError:
+            key_bytes = public_key_pem.encode('utf-8')
+        return hashlib.sha256(key_bytes).hexdigest()
+    
+    @staticmethod
+    def _load_public_key(public_key_pem: str):
+        """解析Base64编码的PEM公钥"""
+        return serialization.load_pem_public_key(
+            base64.b64decode(public_key_pem),
+            backend=default_backend()
+        )
+    
+    @staticmethod
+    @timed("verify_signature")
+    def _verify_with_key(public_key, message: str, signature: str) -> bool:
+        """使用已解析的公钥验证签名"""
         try:
-            public_key = serialization.load_pem_public_key(
-                base64.b64decode(public_key_pem),
-                backend=default_backend()
-            )
-            
             public_key.verify(
                 base64.b64decode(signature),
                 message.encode('utf-8'),
@@ -76,16 +113,157 @@ class AuthSystem:
         except Exception:
             return False
     
-    def register_author(self, author_id: str, public_key: str):
-        """注册作者公钥"""
-        self._authors[public_key] = author_id
+    def verify_signature(self, public_key_pem: str, message: str, signature: str) -> bool:
+        """验证签名"""
+        try:
+            public_key = self._load_public_key(public_key_pem)
+        except Exception:
+            return False
+        return self._verify_with_key(public_key, message, signature)
+    
+    def register_author(self, author_id: str, public_key: str) -> str:
+        """注册作者公钥，返回公钥指纹"""
+        try:
+            parsed_key = self._load_public_key(public_key)
+        except Exception:
+            parsed_key = None  # 无效公钥仍可注册，但无法通过签名验证
+        fingerprint = self.key_fingerprint(public_key)
+        self._authors[fingerprint] = (author_id, parsed_key)
+        self.version += 1
+        return fingerprint
+    
+    def _resolve_fingerprint(self, public_key: Optional[str] = None, key_id: Optional[str] = None) -> Optional[str]:
+        """将公钥或公钥指纹解析为已注册的指纹"""
+        fingerprint = key_id.lower() if key_id else (self.key_fingerprint(public_key) if public_key else None)
+        if fingerprint is None or fingerprint not in self._authors:
+            return None
+        return fingerprint
+    
+    def get_author_id(self, public_key: Optional[str] = None, key_id: Optional[str] = None) -> Optional[str]:
+        """通过公钥或公钥指纹获取作者ID"""
+        fingerprint = self._resolve_fingerprint(public_key, key_id)
+        if fingerprint is None:
+            return None
+        return self._authors[fingerprint][0]
     
-    def get_author_id(self, public_key: str) -> str:
-        """通过公钥获取作者ID"""
-        return self._authors.get(public_key)
+    def verify_author(self, public_key: Optional[str], message: str, signature: str,
+                      key_id: Optional[str] = None) -> bool:
+        """验证作者身份（可用公钥或公钥指纹标识作者）"""
+        fingerprint = self._resolve_fingerprint(public_key, key_id)
+        if fingerprint is None:
+            return False
+        parsed_key = self._authors[fingerprint][1]
+        if parsed_key is None:
+            return False
+        
+        cache_key = self._verification_cache_key(fingerprint, message, signature)
+        if self._verify_cache.get(cache_key):
+            return True
+        if not self._verify_with_key(parsed_key, message, signature):
+            return False
+        self._verify_cache.set(cache_key, True)
+        return True
+    
+    def _verification_cache_key(self, fingerprint: str, message: str, signature: str) -> bytes:
+        """计算 (公钥指纹, 消息, 签名) 的摘要作为缓存键"""
+        digest = hashlib.sha256()
+        for part in (fingerprint, message, signature):
+            part = part.encode('utf-8')
+            # 长度前缀避免不同字段拼接后产生歧义
+            digest.update(len(part).to_bytes(4, 'big'))
+            digest.update(part)
+        return digest.digest()
+    
+    def get_verification_cache_stats(self) -> Dict:
+        """获取签名验证缓存统计信息"""
+        return self._verify_cache.stats()
+    
+    def _sign_session_payload(self, payload: str) -> str:
+        """计算会话载荷的HMAC签名"""
+        digest = hmac.new(self._session_secret, payload.encode('utf-8'), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode('utf-8').rstrip('=')
+    
+    def _prune_sessions(self, now: float) -> None:
+        """清理过期会话，并在超出上限时淘汰最早的会话"""
+        # 会话按签发顺序存储且有效期相同，过期的会话总在队首
+        while self._sessions:
+            _, expires_at = next(iter(self._sessions.values()))
+            if expires_at > now and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+    
+    def new_session(self, author_id: str) -> dict:
+        """生成新的会话记录（尚未存储）"""
+        return {
+            'session_id': uuid.uuid4().hex,
+            'author_id': author_id,
+            'expires_at': int(time.time() + self.session_ttl)
+        }
+    
+    def add_session(self, session_id: str, author_id: str, expires_at: int) -> None:
+        """存储会话记录"""
+        self._sessions[session_id] = (author_id, expires_at)
+        self._prune_sessions(time.time())
+    
+    def remove_session(self, session_id: str) -> bool:
+        """删除会话记录"""
+        return self._sessions.pop(session_id, None) is not None
+    
+    def encode_session_token(self, session: dict) -> dict:
+        """将会话记录编码为签名令牌"""
+        payload = f"{session['session_id']}:{session['author_id']}:{session['expires_at']}"
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('utf-8').rstrip('=')
+        return {
+            'session_token': f"{encoded}.{self._sign_session_payload(payload)}",
+            'author_id': session['author_id'],
+            'expires_at': session['expires_at']
+        }
+    
+    def create_session(self, author_id: str) -> dict:
+        """为已验证的作者签发会话令牌"""
+        session = self.new_session(author_id)
+        self.add_session(**session)
+        return self.encode_session_token(session)
+    
+    def session_id_from_token(self, token: str) -> Optional[str]:
+        """校验令牌签名并返回会话ID"""
+        decoded = self._decode_session(token)
+        return decoded[0] if decoded else None
+    
+    def _decode_session(self, token: str) -> Optional[tuple]:
+        """校验令牌签名并解析出 (session_id, author_id, expires_at)"""
+        try:
+            encoded, signature = token.split('.', 1)
+            payload = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode('utf-8')
+            session_id, author_id, expires_at = payload.split(':', 2)
+            expires_at = int(expires_at)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        # 按字节比较：请求头中的非ASCII字符会让str比较抛出TypeError
+        expected = self._sign_session_payload(payload).encode('utf-8')
+        if not hmac.compare_digest(signature.encode('utf-8', 'surrogateescape'), expected):
+            return None
+        return session_id, author_id, expires_at
+    
+    def verify_session(self, token: str) -> Optional[str]:
+        """验证会话令牌，成功时返回作者ID"""
+        decoded = self._decode_session(token)
+        if decoded is None:
+            return None
+        session_id, author_id, expires_at = decoded
+        
+        if expires_at <= time.time():
+            self._sessions.pop(session_id, None)
+            return None
+        # 已撤销或已被淘汰的会话不在存储中
+        stored = self._sessions.get(session_id)
+        if stored is None or stored[0] != author_id:
+            return None
+        return author_id
     
-    def verify_author(self, public_key: str, message: str, signature: str) -> bool:
-        """验证作者身份"""
-        if public_key not in self._authors:
+    def revoke_session(self, token: str) -> bool:
+        """撤销会话令牌"""
+        session_id = self.session_id_from_token(token)
+        if session_id is None:
             return False
-        return self.verify_signature(public_key, message, signature) 
\ No newline at end of file
+        return self.remove_session(session_id)
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import time
+
+_MISSING = object()
+
+class TTLCache:
+    """带过期时间和容量上限的LRU缓存"""
+    
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (value, expires_at)
+        self.hits = 0
+        self.misses = 0
+        
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存项，过期项视为未命中"""
+        value = self.peek(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+        
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存项但不计入命中统计，由调用方判断缓存项是否可用"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+        
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存项，超出容量时淘汰最久未使用的项"""
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """删除缓存项"""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+        
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+        
+    def __len__(self) -> int:
+        return len(self._data)
+        
+    def stats(self) -> Dict:
+        """获取缓存统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -1,40 +1,115 @@
 import networkx as nx
 import numpy as np
-from typing import Dict, List, Tuple
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from .models import Paper, Citation
+from .pagination import paginate
+from .events import EventBus
+from .cache import TTLCache
+from .metrics import timed
+
+# 遍历方向：cites 沿引用方向，cited_by 沿被引方向，both 忽略方向
+REVERSE_DIRECTION = {'cites': 'cited_by', 'cited_by': 'cites', 'both': 'both'}
 
 class CitationNetwork:
-    def __init__(self):
+    def __init__(self, event_bus: Optional[EventBus] = None):
+        self.event_bus = event_bus  # 写入时发布事件
         self.graph = nx.DiGraph()
         self.papers: Dict[str, Paper] = {}
         self.citations: Dict[str, Citation] = {}
+        self.version = 0  # 每次写入递增，用于缓存失效
+        
+        # 有序索引，供分页和过滤查询使用
+        self._papers_by_created: List[Tuple] = []  # (created_at, paper_id)
+        self._papers_by_citations: List[Tuple] = []  # (citation_count, paper_id)
+        self._papers_by_title: List[Tuple] = []  # (casefold后的标题, paper_id)，供标题前缀搜索
+        self._author_papers: Dict[str, List[str]] = {}  # author_id -> 按添加顺序的paper_id
+        self._citations_by_created: List[Tuple] = []  # (created_at, citation_id)
+        self._citations_by_citing: Dict[str, List[str]] = {}  # citing_paper_id -> citation_id
+        self._citations_by_cited: Dict[str, List[str]] = {}  # cited_paper_id -> citation_id
+        
+        # 图遍历结果缓存，键中包含图版本，旧版本的结果按LRU淘汰
+        self._traversal_cache = TTLCache(max_size=1024, ttl=float('inf'))
         
     def add_paper(self, paper: Paper) -> None:
         """添加论文到网络"""
+        if paper.id in self.papers:
+            self._unindex_paper(self.papers[paper.id])
         self.papers[paper.id] = paper
         self.graph.add_node(paper.id)
         
-    def add_citation(self, citation: Citation) -> bool:
-        """添加引用关系"""
+        insort(self._papers_by_created, (paper.created_at, paper.id))
+        insort(self._papers_by_citations, (self.get_citation_count(paper.id), paper.id))
+        insort(self._papers_by_title, (paper.title.casefold(), paper.id))
+        # 作者列表可能重复，按首次出现去重，避免同一论文被重复计数
+        for author_id in dict.fromkeys(paper.authors):
+            self._author_papers.setdefault(author_id, []).append(paper.id)
+        self.version += 1
+        if self.event_bus:
+            self.event_bus.publish("paper_added", {"id": paper.id, "title": paper.title, "authors": paper.authors})
+            
+    def _unindex_paper(self, paper: Paper) -> None:
+        """从有序索引中移除论文（用于覆盖同ID论文）"""
+        self._remove_key(self._papers_by_created, (paper.created_at, paper.id))
+        self._remove_key(self._papers_by_citations, (self.get_citation_count(paper.id), paper.id))
+        self._remove_key(self._papers_by_title, (paper.title.casefold(), paper.id))
+        for author_id in dict.fromkeys(paper.authors):
+            author_papers = self._author_papers.get(author_id, [])
+            if paper.id in author_papers:
+                author_papers.remove(paper.id)
+                
+    @staticmethod
+    def _remove_key(keys: List[Tuple], key: Tuple) -> None:
+        """从有序列表中删除指定键"""
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            del keys[index]
+        
+    def validate_citation(self, citation: Citation) -> bool:
+        """检查引用关系是否可以添加"""
         # 验证论文是否存在
         if citation.citing_paper_id not in self.papers or citation.cited_paper_id not in self.papers:
             return False
             
         # 验证不是自引用
-        if citation.citing_paper_id == citation.cited_paper_id:
+        return citation.citing_paper_id != citation.cited_paper_id
+        
+    def add_citation(self, citation: Citation) -> bool:
+        """添加引用关系"""
+        if not self.validate_citation(citation):
             return False
             
         # 添加引用关系
+        old_count = self.get_citation_count(citation.cited_paper_id)
         self.citations[citation.id] = citation
         self.graph.add_edge(citation.citing_paper_id, citation.cited_paper_id)
         
+        # 更新有序索引
+        insort(self._citations_by_created, (citation.created_at, citation.id))
+        self._citations_by_citing.setdefault(citation.citing_paper_id, []).append(citation.id)
+        self._citations_by_cited.setdefault(citation.cited_paper_id, []).append(citation.id)
+        new_count = self.get_citation_count(citation.cited_paper_id)
+        if new_count != old_count:
+            self._remove_key(self._papers_by_citations, (old_count, citation.cited_paper_id))
+            insort(self._papers_by_citations, (new_count, citation.cited_paper_id))
+        
         # 更新论文的引用列表
         citing_paper = self.papers[citation.citing_paper_id]
         if citation.cited_paper_id not in citing_paper.citations:
             citing_paper.citations.append(citation.cited_paper_id)
             
+        self.version += 1
+        if self.event_bus:
+            self.event_bus.publish("citation_added", {
+                "id": citation.id,
+                "citing_paper_id": citation.citing_paper_id,
+                "cited_paper_id": citation.cited_paper_id
+            })
         return True
         
+    @timed()
     def calculate_pagerank(self, damping: float = 0.85, max_iter: int = 100) -> Dict[str, float]:
         """计算论文的PageRank值"""
         return nx.pagerank(self.graph, alpha=damping, max_iter=max_iter)
@@ -53,8 +128,7 @@ class CitationNetwork:
         
     def get_author_papers(self, author_id: str) -> List[str]:
         """获取作者的所有论文ID"""
-        return [paper_id for paper_id, paper in self.papers.items() 
-                if author_id in paper.authors]
+        return list(self._author_papers.get(author_id, []))
         
     def get_author_citation_count(self, author_id: str) -> int:
         """获取作者所有论文的总被引用次数"""
@@ -70,6 +144,7 @@ class CitationNetwork:
         paper_ranks = self.calculate_pagerank(damping=damping)
         return sum(paper_ranks.get(paper_id, 0.0) for paper_id in author_papers)
         
+    @timed()
     def get_citation_network_stats(self) -> Dict:
         """获取引用网络统计信息"""
         total_papers = len(self.papers)
@@ -93,4 +168,202 @@ class CitationNetwork:
             'max_citations': max_citations,
             'network_density': network_density,
             'is_dag': nx.is_directed_acyclic_graph(self.graph) if total_papers > 0 else True
-        } 
\ No newline at end of file
+        }
+        
+    def list_papers(self, limit: int, after: Optional[Tuple] = None, sort: str = 'created_at',
+                    descending: bool = False, author_id: Optional[str] = None) -> Tuple[List[Paper], Optional[Tuple]]:
+        """分页获取论文，返回 (论文列表, 下一页起点键)"""
+        if author_id is not None:
+            # 单个作者的论文数量有限，直接在其论文集合上排序
+            paper_ids = self._author_papers.get(author_id, [])
+            if sort == 'citation_count':
+                keys = sorted((self.get_citation_count(paper_id), paper_id) for paper_id in paper_ids)
+            else:
+                keys = sorted((self.papers[paper_id].created_at, paper_id) for paper_id in paper_ids)
+        elif sort == 'citation_count':
+            keys = self._papers_by_citations
+        else:
+            keys = self._papers_by_created
+        page, next_key = paginate(keys, limit, after, descending)
+        return [self.papers[paper_id] for _, paper_id in page], next_key
+        
+    def search_papers(self, prefix: str, limit: int) -> List[Paper]:
+        """按标题前缀（不区分大小写）查找论文，结果按标题排序"""
+        prefix = prefix.casefold()
+        keys = self._papers_by_title
+        index = bisect_left(keys, (prefix,))
+        papers = []
+        while index < len(keys) and len(papers) < limit and keys[index][0].startswith(prefix):
+            papers.append(self.papers[keys[index][1]])
+            index += 1
+        return papers
+        
+    def list_citations(self, limit: int, after: Optional[Tuple] = None, descending: bool = False,
+                       citing_paper_id: Optional[str] = None,
+                       cited_paper_id: Optional[str] = None) -> Tuple[List[Citation], Optional[Tuple]]:
+        """分页获取引用（按创建时间排序），返回 (引用列表, 下一页起点键)"""
+        if citing_paper_id is not None or cited_paper_id is not None:
+            candidates = None
+            if citing_paper_id is not None:
+                candidates = set(self._citations_by_citing.get(citing_paper_id, []))
+            if cited_paper_id is not None:
+                cited = self._citations_by_cited.get(cited_paper_id, [])
+                candidates = set(cited) if candidates is None else candidates.intersection(cited)
+            keys = sorted((self.citations[citation_id].created_at, citation_id) for citation_id in candidates)
+        else:
+            keys = self._citations_by_created
+        page, next_key = paginate(keys, limit, after, descending)
+        return [self.citations[citation_id] for _, citation_id in page], next_key
+        
+    # 图遍历查询
+    def _neighbors(self, paper_id: str, direction: str) -> Iterator[str]:
+        if direction == 'cites':
+            return self.graph.successors(paper_id)
+        if direction == 'cited_by':
+            return self.graph.predecessors(paper_id)
+        if direction == 'both':
+            return chain(self.graph.successors(paper_id), self.graph.predecessors(paper_id))
+        raise ValueError(f"Unsupported direction: {direction}")
+        
+    def _cached_traversal(self, key: Tuple, compute: Callable[[], Dict]) -> Dict:
+        """按 (查询参数, 图版本) 缓存遍历结果"""
+        key = key + (self.version,)
+        result = self._traversal_cache.get(key)
+        if result is None:
+            result = compute()
+            self._traversal_cache.set(key, result)
+        return result
+        
+    def get_neighborhood(self, paper_id: str, depth: int = 2, direction: str = 'both',
+                         max_fanout: int = 50, max_nodes: int = 1000) -> Optional[Dict]:
+        """获取论文的k跳邻域；每个节点最多展开max_fanout个邻居，总节点数不超过max_nodes"""
+        if paper_id not in self.papers:
+            return None
+        
+        def compute():
+            depths = {paper_id: 0}
+            edges = []
+            frontier = [paper_id]
+            truncated = False
+            for level in range(1, depth + 1):
+                next_frontier = []
+                for node in frontier:
+                    neighbors = list(islice(self._neighbors(node, direction), max_fanout + 1))
+                    if len(neighbors) > max_fanout:
+                        neighbors = neighbors[:max_fanout]
+                        truncated = True
+                    for neighbor in neighbors:
+                        if neighbor not in depths:
+                            if len(depths) >= max_nodes:
+                                truncated = True
+                                continue
+                            depths[neighbor] = level
+                            next_frontier.append(neighbor)
+                        # 边统一记为 (引用论文, 被引论文)
+                        edges.append((node, neighbor) if self.graph.has_edge(node, neighbor) else (neighbor, node))
+                frontier = next_frontier
+                if not frontier:
+                    break
+            return {
+                'paper_id': paper_id,
+                'nodes': [{'id': node, 'depth': node_depth} for node, node_depth in depths.items()],
+                'edges': [list(edge) for edge in dict.fromkeys(edges)],
+                'truncated': truncated
+            }
+        
+        return self._cached_traversal(('neighborhood', paper_id, depth, direction, max_fanout, max_nodes), compute)
+        
+    def find_citation_path(self, source_id: str, target_id: str, direction: str = 'cites',
+                           max_depth: int = 6, max_nodes: int = 5000) -> Optional[Dict]:
+        """双向BFS查找两篇论文之间的最短引用路径，路径长度不超过max_depth，访问节点数不超过max_nodes"""
+        if source_id not in self.papers or target_id not in self.papers:
+            return None
+        
+        def compute():
+            # 两侧各自记录 节点 -> (父节点, 深度)
+            forward = {source_id: (None, 0)}
+            backward = {target_id: (None, 0)}
+            forward_frontier, backward_frontier = [source_id], [target_id]
+            meet = source_id if source_id == target_id else None
+            depth = 0
+            truncated = False
+            while meet is None and forward_frontier and backward_frontier and depth < max_depth:
+                # 每次扩展较小的一侧
+                if len(forward_frontier) <= len(backward_frontier):
+                    frontier, visited, other, step = forward_frontier, forward, backward, direction
+                else:
+                    frontier, visited, other, step = backward_frontier, backward, forward, REVERSE_DIRECTION[direction]
+                next_frontier = []
+                meets = []
+                for node in frontier:
+                    node_depth = visited[node][1]
+                    for neighbor in self._neighbors(node, step):
+                        if neighbor in visited:
+                            continue
+                        visited[neighbor] = (node, node_depth + 1)
+                        if neighbor in other:
+                            meets.append(neighbor)
+                        next_frontier.append(neighbor)
+                depth += 1
+                if meets:
+                    meet = min(meets, key=lambda n: forward[n][1] + backward[n][1])
+                    break
+                if len(forward) + len(backward) > max_nodes:
+                    truncated = True
+                    break
+                if frontier is forward_frontier:
+                    forward_frontier = next_frontier
+                else:
+                    backward_frontier = next_frontier
+            
+            path = None
+            if meet is not None:
+                path = []
+                node = meet
+                while node is not None:
+                    path.append(node)
+                    node = forward[node][0]
+                path.reverse()
+                node = backward[meet][0]
+                while node is not None:
+                    path.append(node)
+                    node = backward[node][0]
+            return {
+                'source_id': source_id,
+                'target_id': target_id,
+                'path': path,
+                'length': len(path) - 1 if path else None,
+                'explored': len(forward) + len(backward),
+                'truncated': truncated
+            }
+        
+        return self._cached_traversal(('path', source_id, target_id, direction, max_depth, max_nodes), compute)
+        
+    def get_co_citing_papers(self, paper_ids: Iterable[str], limit: int = 20,
+                             max_fanout: int = 200) -> Dict:
+        """查找与给定论文引用了相同文献的其他论文，按共同引用数排序"""
+        paper_ids = tuple(sorted(set(paper_ids)))
+        
+        def compute():
+            own = set(paper_ids)
+            shared = Counter()
+            truncated = False
+            references = {cited for paper_id in own if paper_id in self.graph for cited in self.graph.successors(paper_id)}
+            for cited in references:
+                citers = list(islice(self.graph.predecessors(cited), max_fanout + 1))
+                if len(citers) > max_fanout:
+                    citers = citers[:max_fanout]
+                    truncated = True
+                shared.update(citer for citer in citers if citer not in own)
+            ranked = sorted(shared.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            return {
+                'references': len(references),
+                'papers': [{'paper_id': paper_id, 'shared_references': count} for paper_id, count in ranked],
+                'truncated': truncated
+            }
+        
+        return self._cached_traversal(('co_citing', paper_ids, limit, max_fanout), compute)
+        
+    def get_traversal_cache_stats(self) -> Dict:
+        """获取图遍历缓存统计信息"""
+        return self._traversal_cache.stats()
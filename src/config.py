@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import List, Optional
+import os
+
+class AppConfig(BaseModel):
+    """应用配置，from_env 从环境变量读取"""
+    state_backend: Optional[str] = None  # 未配置时使用内存后端
+    cors_origins: List[str] = ["http://localhost:8097"]
+    access_log_file: Optional[str] = None  # 默认输出到标准输出
+    access_log_sample_rate: float = 1.0
+    access_log_max_body: int = 1024
+    rate_limit_key_rate: float = 5.0
+    rate_limit_key_burst: float = 20.0
+    rate_limit_ip_rate: float = 20.0
+    rate_limit_ip_burst: float = 60.0
+    mint_batch_window: float = 0.05
+    warm_start: bool = True  # 启动后在后台加载子系统并重放状态，否则在首个请求时加载
+
+    @classmethod
+    def from_env(cls) -> "AppConfig":
+        env = os.environ
+        defaults = cls()
+        return cls(
+            state_backend=env.get("STATE_BACKEND"),
+            cors_origins=env["CORS_ORIGINS"].split(",") if env.get("CORS_ORIGINS") else defaults.cors_origins,
+            access_log_file=env.get("ACCESS_LOG_FILE") or None,
+            access_log_sample_rate=float(env.get("ACCESS_LOG_SAMPLE_RATE", defaults.access_log_sample_rate)),
+            access_log_max_body=int(env.get("ACCESS_LOG_MAX_BODY", defaults.access_log_max_body)),
+            rate_limit_key_rate=float(env.get("RATE_LIMIT_KEY_RATE", defaults.rate_limit_key_rate)),
+            rate_limit_key_burst=float(env.get("RATE_LIMIT_KEY_BURST", defaults.rate_limit_key_burst)),
+            rate_limit_ip_rate=float(env.get("RATE_LIMIT_IP_RATE", defaults.rate_limit_ip_rate)),
+            rate_limit_ip_burst=float(env.get("RATE_LIMIT_IP_BURST", defaults.rate_limit_ip_burst)),
+            mint_batch_window=float(env.get("MINT_BATCH_WINDOW", defaults.mint_batch_window)),
+            warm_start=env.get("WARM_START", "1").lower() not in ("0", "false", "no"),
+        )
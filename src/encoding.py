@@ -0,0 +1,61 @@
+from typing import AbstractSet, Any, Callable, Dict, Hashable, Optional, Tuple
+from pydantic import BaseModel
+from .cache import TTLCache
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时退回标准库
+    orjson = None
+    import json
+
+def to_jsonable(data: Any, fields: Optional[AbstractSet[str]] = None) -> Any:
+    """将pydantic模型（及其列表）转换为可直接编码的基础类型，fields指定时只导出这些字段"""
+    if isinstance(data, BaseModel):
+        return data.model_dump(include=fields)
+    if isinstance(data, (list, tuple)):
+        return [to_jsonable(item, fields) for item in data]
+    return data
+
+def encode_json(data: Any, fields: Optional[AbstractSet[str]] = None) -> bytes:
+    """快速JSON编码"""
+    data = to_jsonable(data, fields)
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+def _default(value: Any) -> Any:
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class SnapshotCache:
+    """按存储版本缓存已编码的响应，版本变化后自动失效"""
+    
+    def __init__(self, max_size: int = 256):
+        self._cache = TTLCache(max_size=max_size, ttl=float('inf'))
+        self.hits = 0
+        self.misses = 0  # 包括版本已变化的缓存项
+        
+    def get_or_encode(self, key: Hashable, version: Hashable,
+                      build: Callable[[], Tuple[Any, Optional[Dict[str, str]]]],
+                      fields: Optional[AbstractSet[str]] = None) -> Tuple[bytes, Dict[str, str]]:
+        """返回 (编码后的响应体, 响应头)，版本未变化时直接复用缓存；key中应包含fields"""
+        entry = self._cache.peek(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1], entry[2]
+        self.misses += 1
+        data, headers = build()
+        body = encode_json(data, fields)
+        self._cache.set(key, (version, body, headers or {}))
+        return body, headers or {}
+        
+    def stats(self) -> Dict:
+        """获取缓存统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            **self._cache.stats(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
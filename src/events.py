@@ -0,0 +1,136 @@
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import time
+
+class Subscription:
+    """单个订阅者的有界事件队列"""
+
+    def __init__(self, maxsize: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = loop  # 订阅者所在的事件循环
+        self.overflowed = False  # 消费过慢被断开
+
+class EventBus:
+    """进程内事件总线：订阅者各自持有有界队列，队列满的慢消费者会被断开"""
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: List[Subscription] = []
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self) -> Subscription:
+        """在事件循环中调用，创建一个订阅"""
+        subscription = Subscription(self.queue_size, asyncio.get_running_loop())
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    def publish(self, event_type: str, data: Dict) -> None:
+        """发布事件，不会因为任何订阅者而阻塞"""
+        if not self._subscribers:
+            return
+        event = {"type": event_type, "data": data, "ts": time.time()}
+        self.published += 1
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for subscription in list(self._subscribers):
+            if subscription.loop is current:
+                self._deliver(subscription, event)
+            else:
+                # 同步接口在线程池中执行，asyncio.Queue不是线程安全的，交给订阅者的事件循环入队
+                try:
+                    subscription.loop.call_soon_threadsafe(self._deliver, subscription, event)
+                except RuntimeError:
+                    # 事件循环已关闭
+                    self.unsubscribe(subscription)
+
+    def _deliver(self, subscription: Subscription, event: Dict) -> None:
+        if subscription.overflowed:
+            return
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscription.overflowed = True
+            self.unsubscribe(subscription)
+            self.dropped_subscribers += 1
+
+    def stats(self) -> Dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers
+        }
+
+def format_sse(event_type: str, data: Dict) -> bytes:
+    """编码为SSE消息"""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n".encode('utf-8')
+
+class StatsDelta:
+    """将一段时间内的事件合并为一条统计增量"""
+
+    def __init__(self):
+        self.papers = 0
+        self.citations = 0
+        self.minted = 0.0
+        self.burned = 0.0
+
+    def add(self, event: Dict) -> None:
+        event_type, data = event["type"], event["data"]
+        if event_type == "paper_added":
+            self.papers += 1
+        elif event_type == "citation_added":
+            self.citations += 1
+        elif event_type == "tokens_minted":
+            self.minted += data["amount"]
+        elif event_type == "tokens_burned":
+            self.burned += data["amount"]
+
+    def is_empty(self) -> bool:
+        return not (self.papers or self.citations or self.minted or self.burned)
+
+    def to_dict(self) -> Dict:
+        return {"papers": self.papers, "citations": self.citations,
+                "minted": self.minted, "burned": self.burned}
+
+async def sse_stream(bus: EventBus, coalesce: float = 0.0,
+                     heartbeat: float = 15.0, totals=None) -> AsyncIterator[bytes]:
+    """订阅事件总线并转换为SSE流；coalesce>0时按时间窗口合并为统计增量。
+    在生成器内订阅：响应未开始发送就断开的连接不会留下订阅"""
+    last_sent = time.monotonic()
+    subscription = bus.subscribe()
+    try:
+        while True:
+            if subscription.overflowed and subscription.queue.empty():
+                yield format_sse("overflow", {"detail": "Consumer too slow, reconnect to resume"})
+                return
+            if coalesce > 0:
+                await asyncio.sleep(coalesce)
+                delta = StatsDelta()
+                while not subscription.queue.empty():
+                    delta.add(subscription.queue.get_nowait())
+                if delta.is_empty():
+                    if time.monotonic() - last_sent >= heartbeat:
+                        last_sent = time.monotonic()
+                        yield b": keep-alive\n\n"
+                    continue
+                payload = delta.to_dict()
+                if totals is not None:
+                    payload["totals"] = totals()
+                last_sent = time.monotonic()
+                yield format_sse("stats_delta", payload)
+            else:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield format_sse(event["type"], event["data"])
+    finally:
+        bus.unsubscribe(subscription)
@@ -0,0 +1,27 @@
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+import asyncio
+import zlib
+
+# fetch_page(limit, after) -> (本页对象列表, 下一页起点)，下一页起点为None表示结束
+PageFetcher = Callable[[int, Optional[object]], Tuple[List, Optional[object]]]
+
+async def ndjson_stream(fetch_page: PageFetcher, chunk_size: int = 500) -> AsyncIterator[bytes]:
+    """按块遍历存储并逐块输出NDJSON，内存占用只与块大小有关"""
+    after = None
+    while True:
+        items, after = fetch_page(chunk_size, after)
+        if items:
+            yield b"".join(item.model_dump_json().encode('utf-8') + b"\n" for item in items)
+        if after is None:
+            break
+        # 每块之后让出事件循环，发送方按客户端消费速度拉取下一块
+        await asyncio.sleep(0)
+
+async def gzip_stream(stream: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """对字节流做流式gzip压缩"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in stream:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
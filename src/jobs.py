@@ -0,0 +1,223 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+import asyncio
+import time
+from .models import TokenTransaction
+from .token_system import TokenSystem
+from .state import SharedState
+from .metrics import REGISTRY
+
+PENDING = "pending"
+SETTLED = "settled"
+FAILED = "failed"
+
+MINT_BATCH_SIZE = REGISTRY.histogram(
+    "citation_mint_batch_size", "Number of mint jobs settled per batch", buckets=(1, 2, 5, 10, 25, 50, 100, 250, 1000)
+)
+
+class MintJob:
+    """单条引用对应的铸币任务，以引用ID作为幂等键"""
+
+    __slots__ = ("citation_id", "author_ids", "citation_counts", "status", "transaction_ids", "error",
+                 "attempts", "queued", "submitted_at", "settled_at")
+
+    def __init__(self, citation_id: str, author_ids: List[str], citation_counts: Dict[str, int],
+                 status: str = PENDING):
+        self.citation_id = citation_id
+        self.author_ids = author_ids
+        self.citation_counts = citation_counts  # 写入该引用后各被引作者的被引次数
+        self.status = status
+        self.transaction_ids: List[str] = []
+        self.error: Optional[str] = None
+        self.attempts = 0  # 失败的结算次数
+        self.queued = False  # 是否已在本进程的结算队列中
+        self.submitted_at = time.time()
+        self.settled_at: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "citation_id": self.citation_id,
+            "status": self.status,
+            "transaction_ids": self.transaction_ids,
+            "error": self.error,
+            "attempts": self.attempts,
+            "submitted_at": self.submitted_at,
+            "settled_at": self.settled_at
+        }
+
+class MintJobQueue:
+    """铸币任务队列：引用写入后立即返回，窗口期内的任务按作者合并后一次结算
+
+    任务在重放引用变更时登记，结算记录（含铸币交易）写入同一条 mint_settled 变更，
+    因此重启后可从变更流中找回尚未结算的任务；多个worker重复结算同一引用时，
+    后写入的结算在重放时被整批忽略。
+    """
+
+    def __init__(self, shared_state: SharedState, token_system: TokenSystem,
+                 window: float = 0.05, max_jobs: int = 100000, max_attempts: int = 3):
+        self.shared_state = shared_state
+        self.token_system = token_system
+        self.window = window  # 合并窗口（秒）
+        self.max_jobs = max_jobs  # 保留的任务状态上限
+        self.max_attempts = max_attempts  # 结算失败后的最大尝试次数
+        self._jobs: OrderedDict = OrderedDict()  # citation_id -> MintJob
+        self._settled_ids: Set[str] = set()  # 已结算的引用ID
+        self._pending: List[MintJob] = []
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._resumed = False
+        self.settled = 0
+        self.failed = 0
+        self.retried = 0
+        self.duplicates = 0  # 被忽略的重复结算
+        shared_state.on("citation", self._register)
+        # 任何worker结算后都会写入 mint_settled 变更，各进程据此记入铸币交易并更新任务状态
+        shared_state.on("mint_settled", self.mark_settled)
+
+    def submit(self, citation_id: str) -> Optional[MintJob]:
+        """将本进程写入的引用加入结算队列（需在事件循环中调用），返回对应任务；已结算时直接返回"""
+        job = self._jobs.get(citation_id)
+        if job is not None and job.status == PENDING:
+            self._queue(job)
+        return job
+
+    def resume(self) -> int:
+        """重放完成后将尚未结算的任务加入结算队列（需在事件循环中调用，只执行一次），返回任务数"""
+        if self._resumed:
+            return 0
+        self._resumed = True
+        jobs = [job for job in self._jobs.values() if job.status == PENDING]
+        for job in jobs:
+            self._queue(job)
+        return len(jobs)
+
+    def get(self, citation_id: str) -> Optional[MintJob]:
+        return self._jobs.get(citation_id)
+
+    def _register(self, payload: Dict) -> None:
+        """重放引用变更时登记铸币任务，被引次数按逐条铸币时的方式在写入该引用后计算"""
+        citation_id = payload["id"]
+        network = self.token_system.citation_network
+        if citation_id not in network.citations or citation_id in self._jobs or citation_id in self._settled_ids:
+            return
+        author_ids = list(network.papers[payload["cited_paper_id"]].authors)
+        counts = {author_id: network.get_author_citation_count(author_id) for author_id in author_ids}
+        self._remember(MintJob(citation_id, author_ids, counts))
+
+    def _remember(self, job: MintJob) -> None:
+        self._jobs[job.citation_id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.status == PENDING:
+                break
+            self._jobs.popitem(last=False)
+
+    def _queue(self, job: MintJob) -> None:
+        if job.queued:
+            return
+        job.queued = True
+        self._pending.append(job)
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # 等待合并窗口，让同一作者的多次被引合并为一笔交易
+            await asyncio.sleep(self.window)
+            self._wakeup.clear()
+            await self.settle_pending()
+
+    async def settle_pending(self) -> int:
+        """结算当前所有待处理任务，返回结算的任务数"""
+        batch, self._pending = self._pending, []
+        for job in batch:
+            job.queued = False
+        if not batch:
+            return 0
+        # 先重放其他worker的写入，已被结算的任务不再重复铸币
+        await self.shared_state.sync_async()
+        batch = [job for job in batch if job.status == PENDING]
+        if not batch:
+            return 0
+        MINT_BATCH_SIZE.observe(len(batch))
+
+        try:
+            citation_counts: Dict[str, List[int]] = {}
+            for job in batch:
+                for author_id in job.author_ids:
+                    citation_counts.setdefault(author_id, []).append(job.citation_counts[author_id])
+            transactions = self.token_system.build_batch_mint_transactions(citation_counts)
+            by_author = {tx.author_id: tx.id for tx in transactions}
+            await self.shared_state.record_async("mint_settled", {
+                "settlements": {
+                    job.citation_id: [by_author[a] for a in dict.fromkeys(job.author_ids) if a in by_author]
+                    for job in batch
+                },
+                "transactions": [tx.model_dump(mode='json') for tx in transactions]
+            })
+        except Exception as e:
+            self._retry(batch, str(e))
+            return len(batch)
+        # 其他worker先结算了其中部分引用时本批次被整批忽略，其余任务重新排队
+        for job in batch:
+            if job.status == PENDING:
+                self._queue(job)
+        return len(batch)
+
+    def _retry(self, batch: List[MintJob], error: str) -> None:
+        """结算失败的任务在下一个窗口重试，超过尝试次数后标记为失败（重启后仍会从变更流中恢复）"""
+        for job in batch:
+            job.attempts += 1
+            job.error = error
+            if job.attempts >= self.max_attempts:
+                job.status = FAILED
+                self.failed += 1
+            else:
+                self.retried += 1
+                self._queue(job)
+
+    def mark_settled(self, payload: Dict) -> None:
+        """应用 mint_settled 变更：记入铸币交易并更新任务状态；包含已结算引用的变更整批忽略"""
+        settlements = payload["settlements"]
+        if any(citation_id in self._settled_ids for citation_id in settlements):
+            self.duplicates += 1
+            return
+        for transaction in payload.get("transactions", ()):
+            self.token_system.apply_transaction(TokenTransaction.model_validate(transaction))
+        now = time.time()
+        for citation_id, transaction_ids in settlements.items():
+            self._settled_ids.add(citation_id)
+            job = self._jobs.get(citation_id)
+            if job is None:
+                job = MintJob(citation_id, [], {})
+                self._remember(job)
+            job.status = SETTLED
+            job.transaction_ids = transaction_ids
+            job.error = None
+            job.settled_at = now
+            self.settled += 1
+
+    async def close(self) -> None:
+        """停止后台任务并结算剩余任务"""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        await self.settle_pending()
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "tracked_jobs": len(self._jobs),
+            "settled": self.settled,
+            "failed": self.failed,
+            "retried": self.retried,
+            "duplicates": self.duplicates,
+            "window": self.window
+        }
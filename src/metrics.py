@@ -0,0 +1,254 @@
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+import time
+
+# 默认延迟分桶（秒）
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Metric:
+    """带标签的指标基类，标签值按位置传入"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    """只增计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values]
+
+class Gauge(Counter):
+    """可增可减的瞬时值"""
+
+    type_name = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(Metric):
+    """分桶直方图：每次记录只做一次二分查找和三次加法"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}  # 标签值 -> [各桶计数..., +Inf桶计数, 总和]
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels) -> "Timer":
+        """计时上下文管理器"""
+        return Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series_items = [(labels, list(series)) for labels, series in self._series.items()]
+        lines = []
+        for labels, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+class Timer:
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+class CallbackGauge(Metric):
+    """抓取时才计算的指标（存储规模、缓存命中率等），记录路径上没有任何开销"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Tuple, float]]]):
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in self.collect()]
+
+class MetricsRegistry:
+    """指标注册表，按Prometheus文本格式导出"""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback_gauge(self, name: str, help_text: str, labelnames: Sequence[str],
+                       collect: Callable[[], Iterable[Tuple[Tuple, float]]]) -> CallbackGauge:
+        """注册抓取时计算的指标，重复注册时以新的回调为准"""
+        metric = CallbackGauge(name, help_text, labelnames, collect)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        """导出全部指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+# 进程级默认注册表
+REGISTRY = MetricsRegistry()
+
+FUNCTION_DURATION = REGISTRY.histogram(
+    "citation_function_duration_seconds", "Latency of instrumented hot-path functions", ["function"]
+)
+
+def timed(function_name: Optional[str] = None):
+    """记录被装饰函数的耗时"""
+    def decorator(fn):
+        label = function_name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                FUNCTION_DURATION.observe(time.perf_counter() - start, label)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    """ASGI中间件：按路由模板记录请求延迟，并统计处理中的请求数"""
+
+    def __init__(self, app, registry: MetricsRegistry = REGISTRY,
+                 on_first_response: Optional[Callable[[], None]] = None):
+        self.app = app
+        self.on_first_response = on_first_response  # 首个响应开始发送时回调一次，用于统计启动耗时
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+        )
+        self.in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+        self._route_paths: Dict = {}  # 端点函数 -> 路由模板
+
+    def _route_label(self, scope) -> str:
+        # 路由匹配后 starlette 会把端点函数写回 scope，用路由模板做标签避免路径参数导致标签爆炸
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            router = scope.get("router")
+            for route in getattr(router, "routes", ()):
+                if getattr(route, "endpoint", None) is endpoint:
+                    path = route.path
+                    break
+            path = self._route_paths[endpoint] = path or endpoint.__name__
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.on_first_response is not None:
+                    callback, self.on_first_response = self.on_first_response, None
+                    callback()
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            self.duration.observe(time.perf_counter() - start, scope["method"], self._route_label(scope), str(status_code))
@@ -0,0 +1,51 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+import base64
+import json
+
+# 排序索引中的键均为 (排序值, 对象ID) 元组，对象ID保证键唯一，从而分页稳定
+
+def encode_cursor(sort: str, key: Tuple) -> str:
+    """将分页位置编码为不透明的游标字符串"""
+    value, item_id = key
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, item_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('utf-8').rstrip('=')
+
+def decode_cursor(cursor: str, sort: str) -> Tuple:
+    """解析游标字符串，游标无效或与排序方式不符时抛出ValueError"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        cursor_sort, value, item_id = json.loads(payload)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor does not match sort order")
+    if not isinstance(item_id, str):
+        raise ValueError("Invalid cursor")
+    if sort == 'created_at':
+        # 创建时间为不带时区的ISO时间，与带时区的时间无法比较
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        value = datetime.fromisoformat(value)
+        if value.tzinfo is not None:
+            raise ValueError("Invalid cursor")
+    elif isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("Invalid cursor")
+    return value, item_id
+
+def paginate(keys: Sequence[Tuple], limit: int, after: Optional[Tuple] = None,
+             descending: bool = False) -> Tuple[List[Tuple], Optional[Tuple]]:
+    """在有序键列表上取一页，返回 (本页键列表, 下一页起点键)"""
+    if descending:
+        end = bisect_left(keys, after) if after is not None else len(keys)
+        start = max(0, end - limit)
+        page = list(reversed(keys[start:end]))
+        has_more = start > 0
+    else:
+        start = bisect_right(keys, after) if after is not None else 0
+        page = list(keys[start:start + limit])
+        has_more = start + limit < len(keys)
+    return page, (page[-1] if has_more and page else None)
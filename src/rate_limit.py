@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Dict, Hashable
+import time
+
+class TokenBucketLimiter:
+    """按键（公钥、客户端IP等）维护令牌桶的限流器"""
+    
+    def __init__(self, rate: float, burst: float, max_buckets: int = 100000):
+        self.rate = rate  # 每秒补充的令牌数
+        self.burst = burst  # 桶容量
+        self.max_buckets = max_buckets  # 最多跟踪的键数量
+        self._buckets: OrderedDict = OrderedDict()  # key -> (tokens, last_refill)
+        self.allowed = 0
+        self.rejected = 0
+        
+    def acquire(self, key: Hashable, cost: float = 1.0) -> bool:
+        """尝试为指定键消耗令牌，令牌不足时返回False"""
+        now = time.monotonic()
+        tokens, last_refill = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last_refill) * self.rate)
+        
+        admitted = tokens >= cost
+        if admitted:
+            tokens -= cost
+            self.allowed += 1
+        else:
+            self.rejected += 1
+            
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        # 淘汰最久未活动的桶，防止伪造的键耗尽内存
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return admitted
+        
+    def retry_after(self, key: Hashable, cost: float = 1.0) -> float:
+        """估算距离下次可获取令牌的秒数"""
+        entry = self._buckets.get(key)
+        if entry is None or self.rate <= 0:
+            return 0.0
+        tokens, last_refill = entry
+        tokens = min(self.burst, tokens + (time.monotonic() - last_refill) * self.rate)
+        return max(0.0, (cost - tokens) / self.rate)
+        
+    def stats(self) -> Dict:
+        """获取限流统计信息"""
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'tracked_keys': len(self._buckets),
+            'allowed': self.allowed,
+            'rejected': self.rejected
+        }
@@ -0,0 +1,144 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+import json
+import sqlite3
+from .models import TokenTransaction
+from .storage import SQLiteBackend
+
+class Repository:
+    """持久化查询接口：内存中没有对应索引的查询直接读取实体表。
+    各进程仍在内存中保存完整状态（启动时从变更流重放），实体表是随变更同步维护的持久化投影"""
+
+    def get_author_token_history(self, author_id: str, since: Optional[datetime] = None,
+                                 limit: Optional[int] = None) -> List[TokenTransaction]:
+        """按应用顺序返回作者的交易，与 TokenSystem.get_author_token_history 一致"""
+        raise NotImplementedError
+
+class SQLiteRepository(SQLiteBackend, Repository):
+    """在变更流之外维护带索引的实体表，写入变更时在同一事务中更新"""
+
+    SCHEMA = SQLiteBackend.SCHEMA + """
+        CREATE TABLE IF NOT EXISTS authors (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            public_key TEXT NOT NULL,
+            token_balance REAL NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_authors_created ON authors (created_at);
+
+        CREATE TABLE IF NOT EXISTS papers (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            citations TEXT NOT NULL DEFAULT '[]',
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_papers_created ON papers (created_at);
+
+        CREATE TABLE IF NOT EXISTS paper_authors (
+            paper_id TEXT NOT NULL,
+            author_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (paper_id, author_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_paper_authors_author ON paper_authors (author_id, paper_id);
+
+        CREATE TABLE IF NOT EXISTS citations (
+            id TEXT PRIMARY KEY,
+            citing_paper_id TEXT NOT NULL,
+            cited_paper_id TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_citations_citing ON citations (citing_paper_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_citations_cited ON citations (cited_paper_id, created_at);
+
+        CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY,
+            author_id TEXT NOT NULL,
+            amount REAL NOT NULL,
+            transaction_type TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_author_time ON transactions (author_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_transactions_time ON transactions (created_at);
+
+        CREATE TABLE IF NOT EXISTS mint_settlements (
+            citation_id TEXT PRIMARY KEY
+        );
+    """
+
+    # 写入
+    def _project_many(self, conn: sqlite3.Connection, kind: str, payloads: List[Dict]) -> None:
+        if kind == "author":
+            conn.executemany(
+                "INSERT OR REPLACE INTO authors (id, name, public_key, token_balance, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(p["id"], p["name"], p["public_key"], p["token_balance"], p["created_at"]) for p in payloads]
+            )
+        elif kind == "paper":
+            conn.executemany(
+                "INSERT OR REPLACE INTO papers (id, title, citations, created_at) VALUES (?, ?, ?, ?)",
+                [(p["id"], p["title"], json.dumps(p["citations"]), p["created_at"]) for p in payloads]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO paper_authors (paper_id, author_id, position) VALUES (?, ?, ?)",
+                [(p["id"], author_id, position) for p in payloads for position, author_id in enumerate(p["authors"])]
+            )
+        elif kind == "citation":
+            # 与 CitationNetwork.add_citation 一致：两篇论文都存在且不是自引用
+            conn.executemany(
+                """INSERT OR IGNORE INTO citations (id, citing_paper_id, cited_paper_id, created_at)
+                   SELECT ?, ?, ?, ?
+                   WHERE ? != ?
+                     AND EXISTS (SELECT 1 FROM papers WHERE id = ?)
+                     AND EXISTS (SELECT 1 FROM papers WHERE id = ?)""",
+                [(p["id"], p["citing_paper_id"], p["cited_paper_id"], p["created_at"],
+                  p["citing_paper_id"], p["cited_paper_id"], p["citing_paper_id"], p["cited_paper_id"])
+                 for p in payloads]
+            )
+            conn.executemany(
+                """UPDATE papers SET citations = json_insert(citations, '$[#]', ?)
+                   WHERE id = ? AND ? != id
+                     AND NOT EXISTS (SELECT 1 FROM json_each(papers.citations) WHERE value = ?)""",
+                [(p["cited_paper_id"], p["citing_paper_id"], p["cited_paper_id"], p["cited_paper_id"]) for p in payloads]
+            )
+        elif kind == "transaction":
+            # 逐条处理：与 TokenSystem.apply_transaction 一致，余额不足的销毁交易不写入
+            for p in payloads:
+                burn = p["transaction_type"] == "BURN"
+                if burn:
+                    row = conn.execute("SELECT token_balance FROM authors WHERE id = ?", (p["author_id"],)).fetchone()
+                    if row is None or row[0] < p["amount"]:
+                        continue
+                conn.execute(
+                    "INSERT OR IGNORE INTO transactions (id, author_id, amount, transaction_type, reason, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (p["id"], p["author_id"], p["amount"], p["transaction_type"], p["reason"], p["created_at"])
+                )
+                conn.execute("UPDATE authors SET token_balance = token_balance + ? WHERE id = ?", (-p["amount"] if burn else p["amount"], p["author_id"]))
+        elif kind == "mint_settled":
+            # 与 MintJobQueue.mark_settled 一致：包含已结算引用的结算记录整批忽略
+            for p in payloads:
+                citation_ids = json.dumps(list(p["settlements"]))
+                if conn.execute(
+                    "SELECT 1 FROM mint_settlements WHERE citation_id IN (SELECT value FROM json_each(?)) LIMIT 1",
+                    (citation_ids,)
+                ).fetchone():
+                    continue
+                conn.execute("INSERT INTO mint_settlements (citation_id) SELECT value FROM json_each(?)", (citation_ids,))
+                self._project_many(conn, "transaction", p.get("transactions", []))
+
+    # 查询
+    def get_author_token_history(self, author_id: str, since: Optional[datetime] = None,
+                                 limit: Optional[int] = None) -> List[TokenTransaction]:
+        # rowid随插入递增，即变更流的应用顺序；创建时间由写入方生成，多个worker之间不保证有序
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                """SELECT id, author_id, amount, transaction_type, reason, created_at FROM transactions
+                   WHERE author_id = ? AND created_at >= ? ORDER BY rowid LIMIT ?""",
+                (author_id, since.isoformat() if since else "", -1 if limit is None else limit)
+            ).fetchall()
+        return [
+            TokenTransaction(id=row[0], author_id=row[1], amount=row[2], transaction_type=row[3],
+                             reason=row[4], created_at=row[5])
+            for row in rows
+        ]
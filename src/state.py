@@ -0,0 +1,111 @@
+from typing import Callable, Dict, Iterable, List
+import asyncio
+import functools
+import threading
+from pydantic import BaseModel
+from .models import Author, Paper, Citation, TokenTransaction
+from .auth import AuthSystem
+from .citation_network import CitationNetwork
+from .token_system import TokenSystem
+from .storage import StateBackend
+
+class SharedState:
+    """将三个子系统的写入统一记录到共享后端，并把变更流重放到本进程的内存状态"""
+
+    def __init__(self, backend: StateBackend, auth_system: AuthSystem,
+                 citation_network: CitationNetwork, token_system: TokenSystem):
+        self.backend = backend
+        self.auth_system = auth_system
+        self.citation_network = citation_network
+        self.token_system = token_system
+        self.last_seq = 0  # 已重放的最后一条变更序号
+        self._lock = threading.Lock()
+        self._listeners: Dict[str, List[Callable[[Dict], None]]] = {}  # 其他组件的变更类型
+        
+    def on(self, kind: str, callback: Callable[[Dict], None]) -> None:
+        """注册变更的重放回调：内置类型在应用到子系统之后调用，其他组件也可注册自定义类型"""
+        self._listeners.setdefault(kind, []).append(callback)
+
+    def sync(self) -> int:
+        """重放其他进程写入的新变更，返回本次应用的变更数"""
+        applied = 0
+        while True:
+            changes = self.backend.changes_since(self.last_seq)
+            if not changes:
+                self.backend.acknowledge(self.last_seq)
+                return applied
+            applied += self._apply_changes(changes)
+
+    def record(self, kind: str, payload) -> None:
+        """写入一条变更并立即应用到本进程"""
+        self.backend.append(kind, self._dump(payload))
+        # 通过变更流应用，保证各进程按相同顺序看到所有写入
+        self.sync()
+
+    def record_many(self, kind: str, payloads: Iterable) -> None:
+        """批量写入同类型的变更并应用到本进程"""
+        payloads = [self._dump(p) for p in payloads]
+        if payloads:
+            self.backend.append_many(kind, payloads)
+        self.sync()
+
+    # 供请求处理函数使用的异步版本：后端读写在线程池中执行，变更仍在事件循环线程中应用
+    async def sync_async(self) -> int:
+        applied = 0
+        while True:
+            changes = await self._call(self.backend.changes_since, self.last_seq)
+            if not changes:
+                self.backend.acknowledge(self.last_seq)
+                return applied
+            applied += self._apply_changes(changes)
+
+    async def record_async(self, kind: str, payload) -> None:
+        await self._call(self.backend.append, kind, self._dump(payload))
+        await self.sync_async()
+
+    async def record_many_async(self, kind: str, payloads: Iterable) -> None:
+        payloads = [self._dump(p) for p in payloads]
+        if payloads:
+            await self._call(self.backend.append_many, kind, payloads)
+        await self.sync_async()
+
+    async def _call(self, fn: Callable, *args):
+        # SQLite后端等待写锁时最长阻塞30秒，不能在事件循环中执行
+        if not self.backend.blocking:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+
+    @staticmethod
+    def _dump(payload) -> Dict:
+        return payload.model_dump(mode='json') if isinstance(payload, BaseModel) else payload
+
+    def _apply_changes(self, changes) -> int:
+        applied = 0
+        with self._lock:
+            for seq, kind, payload in changes:
+                # 并发的两次读取可能取到相同的变更，已应用的跳过
+                if seq <= self.last_seq:
+                    continue
+                self._apply(kind, payload)
+                self.last_seq = seq
+                applied += 1
+        return applied
+
+    def _apply(self, kind: str, payload: Dict) -> None:
+        if kind == "author":
+            author = Author.model_validate(payload)
+            self.auth_system.register_author(author.id, author.public_key)
+            self.token_system.register_author(author)
+        elif kind == "paper":
+            self.citation_network.add_paper(Paper.model_validate(payload))
+        elif kind == "citation":
+            self.citation_network.add_citation(Citation.model_validate(payload))
+        elif kind == "transaction":
+            # 余额不足的销毁交易在各进程重放时都会被拒绝（并发销毁中后写入的一方）
+            self.token_system.apply_transaction(TokenTransaction.model_validate(payload))
+        elif kind == "session":
+            self.auth_system.add_session(**payload)
+        elif kind == "session_revoked":
+            self.auth_system.remove_session(payload["session_id"])
+        for callback in self._listeners.get(kind, ()):
+            callback(payload)
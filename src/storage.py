@@ -0,0 +1,210 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import functools
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+# 变更记录: (序号, 类型, 内容)
+Change = Tuple[int, str, Dict]
+
+class StateBackend:
+    """共享状态后端：所有写入追加为有序的变更记录，各进程按序号读取变更流重放到内存"""
+
+    blocking = True  # 读写是否可能阻塞（异步调用方需放到线程池中执行）
+
+    def append(self, kind: str, payload: Dict) -> int:
+        """追加一条变更记录，返回其序号"""
+        raise NotImplementedError
+
+    def append_many(self, kind: str, payloads: Iterable[Dict]) -> None:
+        """批量追加同类型的变更记录"""
+        for payload in payloads:
+            self.append(kind, payload)
+
+    def changes_since(self, seq: int, limit: int = 1000) -> List[Change]:
+        """读取序号大于seq的变更记录"""
+        raise NotImplementedError
+
+    def acknowledge(self, seq: int) -> None:
+        """消费者已应用序号不超过seq的变更；多进程共享的后端需保留完整变更流供其他worker重放"""
+        pass
+
+    def get_secret(self, name: str) -> bytes:
+        """获取（首次调用时生成）各进程共用的密钥"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class MemoryBackend(StateBackend):
+    """单进程内存后端：只有一个消费者，已应用的变更即被丢弃，日志不会无限增长"""
+
+    blocking = False
+
+    def __init__(self):
+        self._changes: List[Change] = []
+        self._offset = 0  # 已丢弃的变更数，即 _changes[0] 的序号减1
+        self._secrets: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def append(self, kind: str, payload: Dict) -> int:
+        with self._lock:
+            seq = self._offset + len(self._changes) + 1
+            self._changes.append((seq, kind, payload))
+            return seq
+
+    def changes_since(self, seq: int, limit: int = 1000) -> List[Change]:
+        # 序号从1开始连续递增，减去已丢弃的数量即为下标
+        with self._lock:
+            start = seq - self._offset
+            if start < 0:
+                raise ValueError(f"Changes up to {self._offset} were already discarded")
+            return self._changes[start:start + limit]
+
+    def acknowledge(self, seq: int) -> None:
+        with self._lock:
+            drop = min(seq - self._offset, len(self._changes))
+            if drop > 0:
+                del self._changes[:drop]
+                self._offset += drop
+
+    def __len__(self) -> int:
+        """尚未被消费者确认的变更数"""
+        return len(self._changes)
+
+    def get_secret(self, name: str) -> bytes:
+        with self._lock:
+            return self._secrets.setdefault(name, os.urandom(32))
+
+class ConnectionPool:
+    """SQLite连接池，连接可在线程间复用（供线程池中执行的查询使用）"""
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 自动提交模式，显式BEGIN开启事务；语句缓存即预编译语句的复用
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """借出一个连接，用完归还；连接数达到上限时等待空闲连接"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+class SQLiteBackend(StateBackend):
+    """基于SQLite WAL模式的共享后端，同一主机上的多个worker进程共用一个数据库文件"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS secrets (
+            name TEXT PRIMARY KEY,
+            value BLOB NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """在单个写事务中执行多条语句"""
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """在线程池中执行阻塞的数据库操作，供异步请求处理函数调用"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+    def append(self, kind: str, payload: Dict) -> int:
+        with self.transaction() as conn:
+            return self._insert_change(conn, kind, payload)
+
+    def append_many(self, kind: str, payloads: Iterable[Dict]) -> None:
+        payloads = list(payloads)
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO changes (kind, payload) VALUES (?, ?)",
+                [(kind, json.dumps(payload, separators=(',', ':'))) for payload in payloads]
+            )
+            self._project_many(conn, kind, payloads)
+
+    def _insert_change(self, conn: sqlite3.Connection, kind: str, payload: Dict) -> int:
+        cursor = conn.execute(
+            "INSERT INTO changes (kind, payload) VALUES (?, ?)",
+            (kind, json.dumps(payload, separators=(',', ':')))
+        )
+        self._project_many(conn, kind, [payload])
+        return cursor.lastrowid
+
+    def _project_many(self, conn: sqlite3.Connection, kind: str, payloads: List[Dict]) -> None:
+        """在写入变更的同一事务中更新派生数据，子类可覆盖"""
+
+    def changes_since(self, seq: int, limit: int = 1000) -> List[Change]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT seq, kind, payload FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit)
+            ).fetchall()
+        return [(row_seq, kind, json.loads(payload)) for row_seq, kind, payload in rows]
+
+    def get_secret(self, name: str) -> bytes:
+        with self.pool.connection() as conn:
+            conn.execute("INSERT OR IGNORE INTO secrets (name, value) VALUES (?, ?)", (name, os.urandom(32)))
+            return conn.execute("SELECT value FROM secrets WHERE name = ?", (name,)).fetchone()[0]
+
+    def close(self) -> None:
+        self.pool.close()
+
+def create_backend(url: Optional[str] = None) -> StateBackend:
+    """根据配置创建后端：未配置时使用内存后端，sqlite:///path 使用SQLite共享后端"""
+    if not url or url == "memory":
+        return MemoryBackend()
+    if url.startswith("sqlite:///"):
+        from .repository import SQLiteRepository
+        return SQLiteRepository(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported state backend: {url}")
@@ -1,14 +1,24 @@
-from typing import Dict, List
+from bisect import insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import math
 from .models import Author, TokenTransaction
 from .citation_network import CitationNetwork
+from .pagination import paginate
+from .events import EventBus
+from .metrics import timed
 
 class TokenSystem:
-    def __init__(self, citation_network: CitationNetwork):
+    def __init__(self, citation_network: CitationNetwork, event_bus: Optional[EventBus] = None):
         self.citation_network = citation_network
+        self.event_bus = event_bus  # 铸币和销毁时发布事件
         self.authors: Dict[str, Author] = {}
         self.transactions: List[TokenTransaction] = []
         self.total_supply: float = 0.0
+        self.version = 0  # 每次写入递增，用于缓存失效
+        self._authors_by_created: List[Tuple] = []  # (created_at, author_id) 有序索引
+        self._rejected: OrderedDict = OrderedDict()  # 最近被拒绝的销毁交易ID
+        self.rejected_burns = 0
         
         # 引用曲线参数
         self.base_mint_rate = 1.0  # 基础铸币率
@@ -17,7 +27,10 @@ class TokenSystem:
         
     def register_author(self, author: Author) -> None:
         """注册新作者"""
+        if author.id not in self.authors:
+            insort(self._authors_by_created, (author.created_at, author.id))
         self.authors[author.id] = author
+        self.version += 1
         
     def calculate_citation_curve(self, citation_count: int) -> float:
         """计算引用曲线值，用于确定铸币数量"""
@@ -26,55 +39,101 @@ class TokenSystem:
         # 使用对数函数实现边际收益递减
         return self.base_mint_rate * math.log(1 + citation_count * self.citation_decay)
         
-    def mint_tokens_for_citation(self, cited_author_id: str) -> float:
-        """为被引用者铸造代币"""
+    @timed()
+    def build_mint_transaction(self, cited_author_id: str) -> Optional[TokenTransaction]:
+        """根据当前引用数计算铸币交易（不修改状态）"""
         if cited_author_id not in self.authors:
-            return 0.0
+            return None
             
         citation_count = self.citation_network.get_author_citation_count(cited_author_id)
         if citation_count > self.max_citations_for_mint:
             citation_count = self.max_citations_for_mint
             
         mint_amount = self.calculate_citation_curve(citation_count)
-        
-        # 记录交易
-        transaction = TokenTransaction(
+        return TokenTransaction(
             author_id=cited_author_id,
             amount=mint_amount,
             transaction_type="MINT",
             reason=f"Citation reward for {citation_count} citations"
         )
-        self.transactions.append(transaction)
-        
-        # 更新作者余额和总供应量
-        self.authors[cited_author_id].token_balance += mint_amount
-        self.total_supply += mint_amount
         
-        return mint_amount
+    @timed()
+    def build_batch_mint_transactions(self, citation_counts: Dict[str, List[int]]) -> List[TokenTransaction]:
+        """为一批新引用计算铸币交易（不修改状态），每位作者合并为一笔交易
+
+        citation_counts 为 作者ID -> 本批次每条引用写入后该作者的被引次数。每条引用按写入它之后的
+        被引次数计算曲线值，合计与逐条铸币一致（重复引用不增加被引次数，同样按当时的次数铸币）。
+        """
+        transactions = []
+        for author_id, counts in citation_counts.items():
+            if author_id not in self.authors or not counts:
+                continue
+            mint_amount = sum(self.calculate_citation_curve(min(n, self.max_citations_for_mint)) for n in counts)
+            reason = (f"Citation reward for {counts[0]} citations" if len(counts) == 1
+                      else f"Citation reward for {len(counts)} new citations ({max(counts)} total)")
+            transactions.append(TokenTransaction(
+                author_id=author_id,
+                amount=mint_amount,
+                transaction_type="MINT",
+                reason=reason
+            ))
+        return transactions
         
-    def burn_tokens(self, author_id: str, amount: float, reason: str) -> bool:
-        """销毁作者代币"""
+    def build_burn_transaction(self, author_id: str, amount: float, reason: str) -> Optional[TokenTransaction]:
+        """校验余额并生成销毁交易（不修改状态）"""
         if author_id not in self.authors:
-            return False
-            
-        author = self.authors[author_id]
-        if author.token_balance < amount:
-            return False
-            
-        # 记录交易
-        transaction = TokenTransaction(
+            return None
+        if self.authors[author_id].token_balance < amount:
+            return None
+        return TokenTransaction(
             author_id=author_id,
             amount=amount,
             transaction_type="BURN",
             reason=reason
         )
+        
+    def apply_transaction(self, transaction: TokenTransaction) -> bool:
+        """记录交易并更新作者余额和总供应量；余额不足的销毁交易被拒绝，返回False"""
+        if (transaction.transaction_type == "BURN"
+                and self.authors[transaction.author_id].token_balance < transaction.amount):
+            self._rejected[transaction.id] = None
+            while len(self._rejected) > 10000:
+                self._rejected.popitem(last=False)
+            self.rejected_burns += 1
+            return False
         self.transactions.append(transaction)
+        delta = transaction.amount if transaction.transaction_type == "MINT" else -transaction.amount
+        self.authors[transaction.author_id].token_balance += delta
+        self.total_supply += delta
+        self.version += 1
+        if self.event_bus:
+            event_type = "tokens_minted" if transaction.transaction_type == "MINT" else "tokens_burned"
+            self.event_bus.publish(event_type, {
+                "transaction_id": transaction.id,
+                "author_id": transaction.author_id,
+                "amount": transaction.amount
+            })
+        return True
         
-        # 更新作者余额和总供应量
-        author.token_balance -= amount
-        self.total_supply -= amount
+    def is_rejected(self, transaction_id: str) -> bool:
+        """交易是否因余额不足在重放时被拒绝"""
+        return transaction_id in self._rejected
         
-        return True
+    @timed()
+    def mint_tokens_for_citation(self, cited_author_id: str) -> float:
+        """为被引用者铸造代币"""
+        transaction = self.build_mint_transaction(cited_author_id)
+        if transaction is None:
+            return 0.0
+        self.apply_transaction(transaction)
+        return transaction.amount
+        
+    def burn_tokens(self, author_id: str, amount: float, reason: str) -> bool:
+        """销毁作者代币"""
+        transaction = self.build_burn_transaction(author_id, amount, reason)
+        if transaction is None:
+            return False
+        return self.apply_transaction(transaction)
         
     def get_author_balance(self, author_id: str) -> float:
         """获取作者代币余额"""
@@ -86,10 +145,23 @@ class TokenSystem:
             'total_supply': self.total_supply,
             'total_authors': len(self.authors),
             'total_transactions': len(self.transactions),
+            'rejected_burns': self.rejected_burns,
             'average_balance': sum(author.token_balance for author in self.authors.values()) / len(self.authors) if self.authors else 0,
             'max_balance': max((author.token_balance for author in self.authors.values()), default=0)
         }
         
     def get_author_token_history(self, author_id: str) -> List[TokenTransaction]:
         """获取作者的代币交易历史"""
-        return [tx for tx in self.transactions if tx.author_id == author_id] 
\ No newline at end of file
+        return [tx for tx in self.transactions if tx.author_id == author_id]
+        
+    def list_authors(self, limit: int, after: Optional[Tuple] = None,
+                     descending: bool = False) -> Tuple[List[Author], Optional[Tuple]]:
+        """分页获取作者（按创建时间排序），返回 (作者列表, 下一页起点键)"""
+        page, next_key = paginate(self._authors_by_created, limit, after, descending)
+        return [self.authors[author_id] for _, author_id in page], next_key
+        
+    def list_transactions(self, limit: int, after: Optional[int] = None) -> Tuple[List[TokenTransaction], Optional[int]]:
+        """按记录顺序分页获取交易，after为已读取的交易数量"""
+        start = after or 0
+        end = start + limit
+        return self.transactions[start:end], (end if end < len(self.transactions) else None)
@@ -0,0 +1,120 @@
+import hashlib
+import importlib
+import os
+import sys
+import types
+from pathlib import Path
+import pytest
+
+# scripts/ 下的脚本以同目录模块互相导入
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+# 测试环境未安装链上依赖时，用最小替身模块让 scripts/ 可以导入；
+# 用例只通过替身的 w3 / 会话对象与链交互，不依赖真实节点
+def _hex(value=None, hexstr=None, text=None):
+    if hexstr is not None:
+        return hexstr
+    if text is not None:
+        value = text.encode('utf-8')
+    if isinstance(value, int):
+        return hex(value)
+    return '0x' + bytes(value).hex()
+
+
+def _bytes(primitive=None, hexstr=None, text=None):
+    if hexstr is not None:
+        return bytes.fromhex(hexstr[2:] if hexstr.startswith('0x') else hexstr)
+    if text is not None:
+        return text.encode('utf-8')
+    return bytes(primitive)
+
+
+def _keccak(primitive=None, hexstr=None, text=None):
+    return hashlib.sha3_256(_bytes(primitive, hexstr, text)).digest()
+
+
+class _Web3:
+    to_hex = staticmethod(_hex)
+    to_bytes = staticmethod(_bytes)
+    keccak = staticmethod(_keccak)
+    to_checksum_address = staticmethod(lambda value: value if isinstance(value, str) else _hex(value))
+    is_address = staticmethod(lambda value: isinstance(value, str) and len(value) == 42)
+    is_checksum_address = staticmethod(lambda value: isinstance(value, str) and len(value) == 42)
+    solidity_keccak = staticmethod(lambda types, values: _keccak(text=repr((types, values))))
+    to_wei = staticmethod(lambda number, unit: int(number * 10 ** 18))
+    from_wei = staticmethod(lambda number, unit: number / 10 ** 18)
+
+
+class _AsyncWeb3(_Web3):
+    AsyncHTTPProvider = staticmethod(lambda endpoint_uri: None)
+
+    def __init__(self, provider=None):
+        self.provider = provider
+
+
+class _Unavailable:
+    """替身中不可用的对象，用例需要时应自行替换"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        raise NotImplementedError(f"{name} is not available in the test stub")
+
+
+def _unavailable(*args, **kwargs):
+    raise NotImplementedError("not available in the test stub")
+
+
+STUBS = {
+    'web3': {'Web3': _Web3, 'AsyncWeb3': _AsyncWeb3},
+    'eth_account': {'Account': _Unavailable()},
+    'eth_account.messages': {'encode_defunct': _unavailable},
+    'eth_abi': {'encode': _unavailable, 'decode': _unavailable},
+    'requests': {'Session': _Unavailable},
+    'aiohttp': {'ClientSession': _Unavailable, 'TCPConnector': _Unavailable, 'ClientTimeout': _Unavailable},
+}
+
+for name, attrs in STUBS.items():
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        sys.modules[name] = module
+        if '.' in name:
+            parent, child = name.rsplit('.', 1)
+            setattr(sys.modules[parent], child, module)
+
+
+@pytest.fixture(scope="session")
+def back(tmp_path_factory):
+    """导入 scripts/back.py，数据目录指向临时目录；用例通过 monkeypatch 替换其中的链上组件"""
+    data_dir = tmp_path_factory.mktemp("back-data")
+    previous = os.environ.get("DATA_DIR")
+    os.environ["DATA_DIR"] = str(data_dir)
+    try:
+        return importlib.import_module("back")
+    finally:
+        if previous is None:
+            os.environ.pop("DATA_DIR")
+        else:
+            os.environ["DATA_DIR"] = previous
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def client(request, tmp_path):
+    """分别以内存和SQLite存储后端启动的API测试客户端"""
+    from fastapi.testclient import TestClient
+    from src import api
+    from src.config import AppConfig
+    from src.encoding import SnapshotCache
+    backend = "memory" if request.param == "memory" else f"sqlite:///{tmp_path / 'state.db'}"
+    config = AppConfig(state_backend=backend, warm_start=False, access_log_sample_rate=0.0)
+    # 快照缓存为模块级全局对象，各用例的存储版本从0开始，需要重新创建
+    api.snapshot_cache = SnapshotCache()
+    with TestClient(api.create_app(config)) as client:
+        yield client
@@ -0,0 +1,70 @@
+import asyncio
+import io
+import json
+from src.access_log import AccessLogger, AccessLogMiddleware, REDACTED
+
+def make_app(status):
+    async def app(scope, receive, send):
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+    return app
+
+def call(middleware, body, headers=()):
+    scope = {"type": "http", "method": "POST", "path": "/papers", "query_string": b"a=1",
+             "client": ("1.2.3.4", 1000), "headers": list(headers)}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    
+    async def receive():
+        return messages.pop(0)
+    
+    async def send(message):
+        pass
+    
+    asyncio.run(middleware(scope, receive, send))
+
+def records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_headers_and_body_fields_are_redacted():
+    stream = io.StringIO()
+    logger = AccessLogger(stream=stream)
+    body = json.dumps({"title": "t", "private_key": "secret"}).encode()
+    call(AccessLogMiddleware(make_app(200), logger), body,
+         headers=[(b"signature", b"sig"), (b"accept", b"*/*")])
+    logger.close()
+    
+    [record] = records(stream)
+    assert record["status"] == 200
+    assert record["client"] == "1.2.3.4"
+    assert record["headers"] == {"signature": REDACTED, "accept": "*/*"}
+    assert record["body"] == {"title": "t", "private_key": REDACTED}
+    assert "secret" not in stream.getvalue()
+
+def test_oversized_body_is_not_logged():
+    stream = io.StringIO()
+    logger = AccessLogger(stream=stream, max_body_bytes=8)
+    call(AccessLogMiddleware(make_app(200), logger), json.dumps({"private_key": "secret"}).encode())
+    logger.close()
+    
+    [record] = records(stream)
+    assert "body" not in record
+    assert record["body_bytes"] > 8
+
+def test_server_errors_are_logged_when_not_sampled():
+    stream = io.StringIO()
+    logger = AccessLogger(stream=stream, sample_rate=0.0)
+    call(AccessLogMiddleware(make_app(200), logger), b"")
+    call(AccessLogMiddleware(make_app(503), logger), b"")
+    logger.close()
+    
+    assert [record["status"] for record in records(stream)] == [503]
+
+def test_full_queue_drops_records_without_blocking():
+    logger = AccessLogger(stream=io.StringIO(), queue_size=1)
+    # 不启动后台线程，队列不会被消费
+    logger._ensure_writer = lambda: None
+    logger.log({"path": "/a"})
+    logger.log({"path": "/b"})
+    assert (logger.stats()["enqueued"], logger.stats()["dropped"]) == (1, 1)
@@ -0,0 +1,78 @@
+from src import api
+from src.models import Paper, TokenTransaction
+
+def test_etag_depends_on_full_query(client):
+    for i in range(3):
+        client.post("/authors", json={"name": f"author-{i}", "public_key": f"pk-{i}"})
+    first = client.get("/authors", params={"limit": 1})
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/authors", params={"limit": 1, "cursor": cursor})
+    full = client.get("/authors", params={"limit": 1, "fields": "*"})
+    etags = {first.headers["ETag"], second.headers["ETag"], full.headers["ETag"]}
+    assert len(etags) == 3
+
+    # 重新验证第二页时不能匹配第一页的ETag
+    revalidated = client.get("/authors", params={"limit": 1, "cursor": cursor},
+                             headers={"If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 200
+    assert revalidated.json() == second.json()
+    unchanged = client.get("/authors", params={"limit": 1, "cursor": cursor},
+                           headers={"If-None-Match": second.headers["ETag"]})
+    assert unchanged.status_code == 304
+
+def test_transactions_since_accepts_timezone_suffix(client):
+    author = client.post("/authors", json={"name": "author", "public_key": "pk"}).json()
+    api.shared_state.record("transaction", TokenTransaction(
+        author_id=author["id"], amount=1.0, transaction_type="MINT", reason="test"))
+    for since in ("2000-01-01T00:00:00Z", "2000-01-01T00:00:00+08:00", "2000-01-01T00:00:00"):
+        response = client.get(f"/authors/{author['id']}/transactions", params={"since": since})
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+    response = client.get(f"/authors/{author['id']}/transactions", params={"since": "2999-01-01T00:00:00Z"})
+    assert response.json() == []
+
+def test_co_citing_unknown_author_is_404(client):
+    assert client.get("/graph/authors/missing/co-citing").status_code == 404
+    author = client.post("/authors", json={"name": "author", "public_key": "pk"}).json()
+    response = client.get(f"/graph/authors/{author['id']}/co-citing")
+    assert response.status_code == 200
+    assert response.json()["papers"] == []
+
+def test_network_stats_served_from_warmed_snapshot(client):
+    # 首个业务请求加载子系统并预热统计快照
+    client.get("/stats/auth")
+    before = api.snapshot_cache.stats()
+    response = client.get("/stats/network")
+    assert response.status_code == 200
+    after = api.snapshot_cache.stats()
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+def test_paper_title_search_matches_prefix(client):
+    client.get("/papers")  # 子系统在首个请求时加载
+    for title in ("Graph Theory", "graph neural networks", "Token Economics"):
+        api.shared_state.record("paper", Paper(title=title, authors=["a"]))
+    found = client.get("/papers/search", params={"q": "GRAPH"}).json()
+    assert [paper["title"] for paper in found] == ["graph neural networks", "Graph Theory"]
+    assert client.get("/papers/search", params={"q": "graph t", "limit": 1}).json()[0]["title"] == "Graph Theory"
+    assert client.get("/papers/search", params={"q": "zzz"}).json() == []
+
+def test_list_endpoints_default_to_compact_fields(client):
+    client.get("/papers")
+    paper = Paper(title="t", authors=["a"], citations=[])
+    api.shared_state.record("paper", paper)
+    
+    [compact] = client.get("/papers").json()
+    assert set(compact) == {"id", "title", "authors", "created_at"}
+    [full] = client.get("/papers", params={"fields": "*"}).json()
+    assert set(full) == set(Paper.model_fields)
+    [titles] = client.get("/papers", params={"fields": "id, title"}).json()
+    assert titles == {"id": paper.id, "title": "t"}
+    
+    # 单个对象默认返回全部字段
+    assert set(client.get(f"/papers/{paper.id}").json()) == set(Paper.model_fields)
+    assert client.get(f"/papers/{paper.id}", params={"fields": "title"}).json() == {"title": "t"}
+
+def test_unknown_fields_are_rejected(client):
+    assert client.get("/papers", params={"fields": "title,secret"}).status_code == 400
+    assert client.get("/authors", params={"fields": ","}).status_code == 400
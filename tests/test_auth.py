@@ -0,0 +1,103 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import api
+from src.auth import AuthSystem
+from src.config import AppConfig
+from src.encoding import SnapshotCache
+
+MALFORMED_TOKENS = [
+    "YWJjOmRlZjoxMA.\xe9",
+    "YWJjOmRlZjoxMA",
+    "!!!.sig",
+    "",
+]
+
+@pytest.mark.parametrize("token", MALFORMED_TOKENS)
+def test_malformed_session_token_is_rejected(token):
+    auth_system = AuthSystem(session_secret=b"secret")
+    assert auth_system.verify_session(token) is None
+    assert auth_system.revoke_session(token) is False
+
+def test_malformed_session_token_header_is_rejected():
+    api.snapshot_cache = SnapshotCache()
+    config = AppConfig(state_backend="memory", warm_start=False, access_log_sample_rate=0.0)
+    with TestClient(api.create_app(config)) as client:
+        # 请求头按latin-1编码发送，服务端解码后得到非ASCII的签名
+        headers = [(b"session-token", "YWJjOmRlZjoxMA.\xe9".encode("latin-1"))]
+        created = client.post("/papers", json={"title": "t", "abstract": "a", "authors": []},
+                              headers=headers)
+        assert created.status_code == 401
+        revoked = client.delete("/auth/session", headers=headers)
+        assert revoked.status_code == 404
+
+@pytest.fixture(scope="module")
+def key_pair():
+    return AuthSystem().generate_key_pair()
+
+def test_successful_verification_is_cached(key_pair):
+    auth_system = AuthSystem()
+    auth_system.register_author("a1", key_pair['public_key'])
+    signature = auth_system.sign_message(key_pair['private_key'], "hello")
+    
+    assert auth_system.verify_author(key_pair['public_key'], "hello", signature)
+    assert auth_system.get_verification_cache_stats()['size'] == 1
+    assert auth_system.verify_author(None, "hello", signature, key_id=key_pair['key_id'])
+    stats = auth_system.get_verification_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['size'] == 1
+
+def test_failed_verification_is_not_cached(key_pair):
+    auth_system = AuthSystem()
+    auth_system.register_author("a1", key_pair['public_key'])
+    signature = auth_system.sign_message(key_pair['private_key'], "hello")
+    
+    # 缓存键包含消息和签名，已缓存的签名不能用于其他消息
+    assert auth_system.verify_author(key_pair['public_key'], "hello", signature)
+    assert not auth_system.verify_author(key_pair['public_key'], "other", signature)
+    assert not auth_system.verify_author(key_pair['public_key'], "hello", "AAAA")
+    assert auth_system.get_verification_cache_stats()['size'] == 1
+
+def test_verification_cache_is_bounded_and_expires(key_pair, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.cache.time.monotonic", lambda: now[0])
+    auth_system = AuthSystem(verify_cache_size=2, verify_cache_ttl=10.0)
+    auth_system.register_author("a1", key_pair['public_key'])
+    for message in ("m1", "m2", "m3"):
+        signature = auth_system.sign_message(key_pair['private_key'], message)
+        assert auth_system.verify_author(key_pair['public_key'], message, signature)
+    assert auth_system.get_verification_cache_stats()['size'] == 2
+    
+    now[0] += 11.0
+    signature = auth_system.sign_message(key_pair['private_key'], "m3")
+    assert auth_system.verify_author(key_pair['public_key'], "m3", signature)
+    assert auth_system.get_verification_cache_stats()['hits'] == 0
+
+def test_author_is_resolved_by_fingerprint_or_public_key(key_pair):
+    auth_system = AuthSystem()
+    fingerprint = auth_system.register_author("a1", key_pair['public_key'])
+    assert fingerprint == key_pair['key_id']
+    assert auth_system.get_author_id(key_pair['public_key']) == "a1"
+    assert auth_system.get_author_id(key_id=fingerprint.upper()) == "a1"
+    assert auth_system.get_author_id(key_id="0" * 64) is None
+    assert auth_system.get_author_id() is None
+
+def test_unparseable_key_is_registered_but_never_verifies():
+    auth_system = AuthSystem()
+    fingerprint = auth_system.register_author("a1", "not-a-pem")
+    assert auth_system.get_author_id(key_id=fingerprint) == "a1"
+    assert not auth_system.verify_author("not-a-pem", "hello", "AAAA")
+
+def test_key_id_header_replaces_public_key_header(key_pair):
+    api.snapshot_cache = SnapshotCache()
+    config = AppConfig(state_backend="memory", warm_start=False, access_log_sample_rate=0.0)
+    with TestClient(api.create_app(config)) as client:
+        author = client.post("/authors", json={"name": "a", "public_key": key_pair['public_key']}).json()
+        signature = client.post("/auth/sign", json={"private_key": key_pair['private_key'],
+                                                    "message": "hello"}).json()["signature"]
+        paper = {"title": "t", "abstract": "a", "authors": [author["id"]]}
+        created = client.post("/papers", json=paper, headers={
+            "key-id": key_pair['key_id'], "signature": signature, "message": "hello"})
+        assert created.status_code == 200
+        rejected = client.post("/papers", json=paper, headers={
+            "key-id": "0" * 64, "signature": signature, "message": "hello"})
+        assert rejected.status_code == 401
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import authors
+from authors import AuthorDirectory, discover_authors, discover_authors_async
+
+def address(n):
+    # 纯数字地址的校验和格式与原地址相同
+    return "0x" + str(n) * 40
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class FakeEntry:
+    address = address(9)
+    topics = {"AuthorRegistered": b"\x01" * 32}
+
+def registration_log(author):
+    return {"topics": [b"\x01" * 32, bytes(12) + bytes.fromhex(author[2:])]}
+
+class FakeEth:
+    def __init__(self, block_number, logs_by_block):
+        self.block_number = block_number
+        self.logs_by_block = logs_by_block  # 区块号 -> 注册的作者地址
+        self.queries = []
+
+    def get_logs(self, log_filter):
+        self.queries.append((log_filter["fromBlock"], log_filter["toBlock"]))
+        return [registration_log(author) for block, author in sorted(self.logs_by_block.items())
+                if log_filter["fromBlock"] <= block <= log_filter["toBlock"]]
+
+class FakeW3:
+    def __init__(self, eth):
+        self.eth = eth
+
+class AsyncFakeEth(FakeEth):
+    @property
+    def block_number(self):
+        async def value():
+            return self._block_number
+        return value()
+
+    @block_number.setter
+    def block_number(self, value):
+        self._block_number = value
+
+    async def get_logs(self, log_filter):
+        return FakeEth.get_logs(self, log_filter)
+
+def test_checkpoint_written_only_with_new_authors_or_after_interval(tmp_path):
+    path = str(tmp_path / "authors.log")
+    directory = AuthorDirectory(path)
+    directory.load()
+    assert directory.record([address(1)], 10) == [address(1)]
+    # 链头小幅前进且没有新作者：只更新内存
+    for block in range(11, 20):
+        assert directory.record([], block) == []
+    assert directory.checkpoint == 19
+    assert read_records(path) == [{"author": address(1)}, {"checkpoint": 10}]
+
+    directory.record([], 10 + authors.CHECKPOINT_INTERVAL)
+    assert read_records(path)[-1] == {"checkpoint": 10 + authors.CHECKPOINT_INTERVAL}
+    directory.record([address(2)], 10 + authors.CHECKPOINT_INTERVAL + 1)
+    assert len(read_records(path)) == 5
+
+def test_load_compacts_redundant_records(tmp_path):
+    path = str(tmp_path / "authors.log")
+    with open(path, "w") as f:
+        for record in [{"author": address(1)}, {"checkpoint": 5}, {"checkpoint": 8},
+                       {"author": address(2)}, {"author": address(1)}, {"rewind": 3}, {"checkpoint": 7}]:
+            f.write(json.dumps(record) + "\n")
+        f.write('{"author": "0x')  # 中断留下的不完整行
+
+    directory = AuthorDirectory(path)
+    directory.load()
+    assert list(directory) == [address(1), address(2)]
+    assert directory.checkpoint == 7
+    assert read_records(path) == [{"author": address(1)}, {"author": address(2)}, {"checkpoint": 7}]
+
+    reloaded = AuthorDirectory(path)
+    reloaded.load()
+    assert list(reloaded) == list(directory)
+    assert reloaded.checkpoint == 7
+
+def test_discovery_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "authors.log")
+    eth = FakeEth(25000, {5: address(1), 15000: address(2), 24999: address(1)})
+    directory = AuthorDirectory(path)
+    directory.load()
+    assert discover_authors(FakeW3(eth), directory, FakeEntry()) == [address(1), address(2)]
+    assert eth.queries == [(0, 9999), (10000, 19999), (20000, 25000)]
+    assert directory.checkpoint == 25000
+
+    eth.block_number = 25003
+    eth.logs_by_block[25002] = address(3)
+    eth.queries.clear()
+    assert discover_authors(FakeW3(eth), directory, FakeEntry()) == [address(3)]
+    assert eth.queries == [(25001, 25003)]
+
+    # 链被重置：检查点超过链头时从头重新扫描
+    eth.block_number = 10
+    assert discover_authors(FakeW3(eth), directory, FakeEntry()) == []
+    assert directory.checkpoint == 10
+
+def test_async_discovery_matches_sync(tmp_path):
+    eth = AsyncFakeEth(25000, {5: address(1), 15000: address(2)})
+    directory = AuthorDirectory(str(tmp_path / "authors.log"))
+    directory.load()
+    discovered = asyncio.run(discover_authors_async(FakeW3(eth), directory, FakeEntry()))
+    assert discovered == [address(1), address(2)]
+    assert directory.checkpoint == 25000
+    reloaded = AuthorDirectory(str(tmp_path / "authors.log"))
+    reloaded.load()
+    assert list(reloaded) == discovered
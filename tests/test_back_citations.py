@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+CITER = "0x" + "1" * 40
+CITED = "0x" + "2" * 40
+OWNER = "0x" + "3" * 40
+
+class Call:
+    def __init__(self, value):
+        self.value = value
+
+    async def call(self):
+        return self.value
+
+class CitationAdded:
+    def process_receipt(self, receipt):
+        return [{"args": {"citationId": b"\xab\xcd"}}]
+
+class FakeContract:
+    def __init__(self, name, chain):
+        self.name = name
+        self.chain = chain
+        self.functions = self
+        self.events = SimpleNamespace(CitationAdded=CitationAdded)
+
+    def getAuthorInfo(self, address):
+        return Call((address, 1, 0, True))
+
+    def citations(self, key):
+        return Call((CITER, CITED, "", self.chain.existing_timestamp))
+
+    def owner(self):
+        return Call(OWNER)
+
+    def addCitation(self, *args):
+        return (self.name, "addCitation") + args
+
+class FakeChain:
+    """记录提交和回执顺序；回执等待 receipt_delay 秒，让并发请求有机会交错"""
+
+    def __init__(self, statuses=(1, 1), existing_timestamp=0, receipt_delay=0.01):
+        self.statuses = statuses  # (CitationNetwork, AuthorToken) 回执状态
+        self.existing_timestamp = existing_timestamp
+        self.receipt_delay = receipt_delay
+        self.events = []
+
+    async def submit_transaction(self, private_key, function_call, gas, retry=True):
+        self.events.append(("submit",) + function_call)
+        return bytes([len(self.events)]) * 4
+
+    async def wait_for_receipts(self, tx_hashes):
+        await asyncio.sleep(self.receipt_delay)
+        self.events.append(("receipts", len(tx_hashes)))
+        return [SimpleNamespace(status=status) for status in self.statuses]
+
+@pytest.fixture
+def chain(back, monkeypatch):
+    def install(**kwargs):
+        chain = FakeChain(**kwargs)
+
+        async def yes(*args):
+            return True
+
+        async def get_account(private_key=None):
+            return SimpleNamespace(address=CITER)
+
+        monkeypatch.setattr(back, "get_account", get_account)
+        monkeypatch.setattr(back, "load_contract", lambda name: FakeContract(name, chain))
+        monkeypatch.setattr(back, "check_contract_deployed", yes)
+        monkeypatch.setattr(back, "check_balance", yes)
+        monkeypatch.setattr(back, "submit_transaction", chain.submit_transaction)
+        monkeypatch.setattr(back, "wait_for_receipts", chain.wait_for_receipts)
+        return chain
+    return install
+
+def submissions(chain):
+    return [event for event in chain.events if event[0] == "submit"]
+
+def test_concurrent_duplicate_citation_is_rejected(back, chain):
+    fake = chain()
+
+    async def scenario():
+        return await asyncio.gather(back.add_citation1("0xkey", CITED, "paper"),
+                                    back.add_citation1("0xkey", CITED, "paper"))
+
+    results = asyncio.run(scenario())
+    assert results == ["abcd", None]
+    assert len(submissions(fake)) == 2
+    assert not back.citations_in_flight
+    assert not back.citation_pair_locks
+
+def test_citations_between_same_pair_are_serialized(back, chain):
+    fake = chain()
+
+    async def scenario():
+        return await asyncio.gather(back.add_citation1("0xkey", CITED, "paper-1"),
+                                    back.add_citation1("0xkey", CITED, "paper-2"))
+
+    assert asyncio.run(scenario()) == ["abcd", "abcd"]
+    # 第二次引用在第一次的回执之后才发送
+    kinds = [event[0] for event in fake.events]
+    assert kinds == ["submit", "submit", "receipts", "submit", "submit", "receipts"]
+    assert fake.events[0][-1] == "paper-1" and fake.events[3][-1] == "paper-2"
+
+def test_one_sided_write_is_reported(back, chain):
+    chain(statuses=(1, 0))
+    with pytest.raises(back.CitationInconsistent, match="AuthorToken"):
+        asyncio.run(back.add_citation1("0xkey", CITED, "paper"))
+    assert not back.citations_in_flight
+
+def test_both_writes_failing_is_a_plain_failure(back, chain):
+    chain(statuses=(0, 0))
+    assert asyncio.run(back.add_citation1("0xkey", CITED, "paper")) is None
+
+def test_existing_citation_is_rejected_before_sending(back, chain):
+    fake = chain(existing_timestamp=12345)
+    assert asyncio.run(back.add_citation1("0xkey", CITED, "paper")) is None
+    assert submissions(fake) == []
+
+def test_route_maps_one_sided_write_to_500(back, chain):
+    from fastapi import HTTPException
+    chain(statuses=(0, 1))
+    request = back.CitationRequest(private_key="0xkey", cited_address=CITED, paper_hash="paper")
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(back.add_citation(request))
+    assert excinfo.value.status_code == 500
@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+OWNER = "0x" + "1" * 40
+GOOD = "0x" + "2" * 40
+FAILED = "0x" + "3" * 40
+UNREGISTERED = "0x" + "4" * 40
+
+class FakeBatchReader:
+    """按 (函数名, 地址) 返回结果，记录每次批量调用的内容"""
+
+    def __init__(self, results):
+        self.results = results
+        self.batches = []
+
+    async def call_many(self, calls):
+        self.batches.append([(call.function_name,) + call.args for call in calls])
+        return [self.results[(call.function_name,) + call.args] for call in calls]
+
+def author_results(back):
+    return {
+        ("getAuthorInfo", GOOD): (GOOD, 3, 7, True),
+        ("getDirectCiters", GOOD): [OWNER],
+        ("getAuthorLineage", GOOD): [OWNER, FAILED],
+        ("getAuthorInfo", FAILED): (FAILED, 0, 0, True),
+        ("getDirectCiters", FAILED): back.RPCError("getDirectCiters: execution reverted"),
+        ("getAuthorLineage", FAILED): [],
+        ("getAuthorInfo", UNREGISTERED): (UNREGISTERED, 0, 0, False),
+        ("getDirectCiters", UNREGISTERED): [],
+        ("getAuthorLineage", UNREGISTERED): [],
+        ("getAuthorInfo", OWNER): (OWNER, 1, 9, True),
+        ("getDirectCiters", OWNER): [],
+        ("getAuthorLineage", OWNER): [],
+    }
+
+@pytest.fixture
+def reader(back, monkeypatch):
+    reader = FakeBatchReader(author_results(back))
+    monkeypatch.setattr(back, "batch_reader", reader)
+    monkeypatch.setattr(back, "contract_registry", SimpleNamespace(entry=lambda name: name))
+    monkeypatch.setattr(back, "indexer", None)
+    return reader
+
+def test_authors_are_read_in_one_batch_and_failures_skipped(back, reader):
+    authors = asyncio.run(back.fetch_authors_info([GOOD, FAILED, UNREGISTERED], OWNER))
+    assert len(reader.batches) == 1
+    assert len(reader.batches[0]) == 9
+    assert authors == [{
+        'address': GOOD,
+        'citation_count': 3,
+        'pagerank_score': 7,
+        'is_registered': True,
+        'direct_citers_count': 1,
+        'lineage_size': 2,
+        'is_owner': False
+    }]
+
+def test_all_authors_are_discovered_then_sorted_by_pagerank(back, reader, monkeypatch):
+    class Owner:
+        async def call(self):
+            return OWNER
+
+    async def discover(w3, directory, entry):
+        directory.extend([GOOD, OWNER])
+        return 2
+
+    monkeypatch.setattr(back, "author_directory", [])
+    monkeypatch.setattr(back, "discover_authors_async", discover)
+    monkeypatch.setattr(back, "load_contract", lambda name: SimpleNamespace(
+        functions=SimpleNamespace(owner=lambda: Owner())))
+    authors = asyncio.run(back.get_all_authors_info())
+    assert [author['address'] for author in authors] == [OWNER, GOOD]
+    assert authors[0]['is_owner']
+
+def test_ready_index_is_read_without_rpc_calls(back, reader, monkeypatch):
+    view = SimpleNamespace(
+        author_info=lambda address: (address, 2, 5, address != UNREGISTERED),
+        direct_citers={GOOD: {OWNER}},
+        lineage={},
+    )
+    monkeypatch.setattr(back, "indexer", SimpleNamespace(view=view, covers=lambda block: True))
+    monkeypatch.setattr(back, "READ_FROM_INDEX", True)
+    authors = asyncio.run(back.fetch_authors_info([GOOD, UNREGISTERED], OWNER))
+    assert reader.batches == []
+    assert [(author['address'], author['direct_citers_count']) for author in authors] == [(GOOD, 1)]
@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from gas import AsyncGasOracle
+
+class FakeAccount:
+    address = "0x" + "1" * 40
+
+class FakeCall:
+    address = "0x" + "9" * 40
+    fn_name = "setIdentity"
+    args = ("ipfs://a",)
+
+    def __init__(self, estimate):
+        self.estimate = estimate
+        self.built = []
+
+    async def estimate_gas(self, transaction):
+        return self.estimate
+
+    async def build_transaction(self, transaction):
+        self.built.append(transaction)
+        return transaction
+
+class FakeEth:
+    @property
+    def gas_price(self):
+        async def value():
+            return 10 ** 9
+        return value()
+
+class FakeW3:
+    eth = FakeEth()
+
+class FakeNonceManager:
+    """按顺序分配nonce；gas上限不低于 required_gas 的交易才执行成功"""
+
+    def __init__(self, required_gas):
+        self.required_gas = required_gas
+        self.sent = {}
+        self.next_nonce = 0
+        self.signers = []
+
+    async def send(self, signer, build_transaction):
+        self.signers.append(signer)
+        transaction = await build_transaction(self.next_nonce)
+        self.next_nonce += 1
+        tx_hash = bytes([len(self.sent) + 1]) * 32
+        self.sent[tx_hash] = transaction
+        return tx_hash
+
+    async def wait_for_receipts(self, tx_hashes, timeout=120):
+        receipts = []
+        for tx_hash in tx_hashes:
+            gas_limit = self.sent[tx_hash]['gas']
+            ok = gas_limit >= self.required_gas
+            receipts.append({'transactionHash': tx_hash, 'blockNumber': 10 + len(receipts),
+                             'status': 1 if ok else 0, 'gasUsed': self.required_gas if ok else gas_limit})
+        return receipts
+
+@pytest.fixture
+def chain(back, monkeypatch):
+    def install(required_gas):
+        nonce_manager = FakeNonceManager(required_gas)
+        monkeypatch.setattr(back, "nonce_manager", nonce_manager)
+        monkeypatch.setattr(back, "gas_oracle", AsyncGasOracle(FakeW3(), margin=1.2))
+        monkeypatch.setattr(back, "latest_write_block", -1)
+        return nonce_manager
+    return install
+
+def test_out_of_gas_transaction_is_resubmitted_once_with_fresh_estimate(back, chain):
+    nonce_manager = chain(required_gas=80000)
+    call = FakeCall(estimate=50000)
+    account = FakeAccount()
+
+    async def scenario():
+        tx_hash = await back.submit_transaction(account, call, 2000000)
+        call.estimate = 75000  # 链上状态变化后重新估算
+        return await back.wait_for_receipts([tx_hash])
+
+    receipt, = asyncio.run(scenario())
+    assert receipt['status'] == 1
+    assert [tx['gas'] for tx in call.built] == [60000, 90000]
+    assert [tx['nonce'] for tx in call.built] == [0, 1]
+    # 重发使用同一个账户对象，重发信息中不保存私钥
+    assert nonce_manager.signers == [account, account]
+    assert back.gas_oracle.stats()['out_of_gas'] == 1
+    assert back.latest_write_block == receipt['blockNumber']
+
+def test_resubmission_happens_only_once(back, chain):
+    chain(required_gas=200000)
+    call = FakeCall(estimate=50000)
+
+    async def scenario():
+        tx_hash = await back.submit_transaction(FakeAccount(), call, 2000000)
+        return await back.wait_for_receipts([tx_hash])
+
+    receipt, = asyncio.run(scenario())
+    assert receipt['status'] == 0
+    assert len(call.built) == 2
+    assert back.gas_oracle.stats()['out_of_gas'] == 2
@@ -0,0 +1,18 @@
+from src.citation_network import CitationNetwork
+from src.models import Citation, Paper
+
+def test_duplicate_authors_are_counted_once():
+    network = CitationNetwork()
+    cited = Paper(title="cited", authors=["alice", "alice", "bob"])
+    citing = Paper(title="citing", authors=["carol"])
+    network.add_paper(cited)
+    network.add_paper(citing)
+    assert network.add_citation(Citation(citing_paper_id=citing.id, cited_paper_id=cited.id))
+
+    assert network.get_author_papers("alice") == [cited.id]
+    assert network.get_author_citation_count("alice") == 1
+
+    # 覆盖同ID论文时去重后的索引也要完整移除
+    network.add_paper(Paper(id=cited.id, title="cited", authors=["bob"]))
+    assert network.get_author_papers("alice") == []
+    assert network.get_author_papers("bob") == [cited.id]
@@ -0,0 +1,29 @@
+import json
+from src.encoding import SnapshotCache
+
+def test_stale_entry_counts_as_miss():
+    cache = SnapshotCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"n": len(builds)}, None
+
+    body, _ = cache.get_or_encode(("stats",), 1, build)
+    assert json.loads(body) == {"n": 1}
+    cache.get_or_encode(("stats",), 1, build)
+    # 版本变化后重新编码，旧缓存项不算命中
+    body, _ = cache.get_or_encode(("stats",), 2, build)
+    assert json.loads(body) == {"n": 2}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["hit_rate"] == 1 / 3
+    assert len(builds) == 2
+
+def test_headers_cached_with_body():
+    cache = SnapshotCache()
+    cache.get_or_encode(("list",), 1, lambda: ([1, 2], {"X-Next-Cursor": "abc"}))
+    body, headers = cache.get_or_encode(("list",), 1, lambda: ([], None))
+    assert json.loads(body) == [1, 2]
+    assert headers == {"X-Next-Cursor": "abc"}
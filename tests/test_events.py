@@ -0,0 +1,60 @@
+import asyncio
+import json
+from src.events import EventBus, sse_stream
+
+def parse(message):
+    event_line, data_line = message.decode().strip().split("\n")
+    return event_line[len("event: "):], json.loads(data_line[len("data: "):])
+
+def test_unstarted_stream_leaves_no_subscription():
+    async def scenario():
+        bus = EventBus()
+        stream = sse_stream(bus)
+        assert bus.stats()["subscribers"] == 0
+        await stream.aclose()
+        assert bus.stats()["subscribers"] == 0
+    asyncio.run(scenario())
+
+def test_events_streamed_and_unsubscribed_on_close():
+    async def scenario():
+        bus = EventBus()
+        stream = sse_stream(bus)
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        assert bus.stats()["subscribers"] == 1
+        bus.publish("citation_added", {"id": "c1"})
+        assert parse(await pending) == ("citation_added", {"id": "c1"})
+        await stream.aclose()
+        assert bus.stats()["subscribers"] == 0
+    asyncio.run(scenario())
+
+def test_coalesced_stats_delta_includes_totals():
+    async def scenario():
+        bus = EventBus()
+        stream = sse_stream(bus, coalesce=0.05, totals=lambda: {"total_papers": 2})
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        bus.publish("paper_added", {"id": "p1"})
+        bus.publish("paper_added", {"id": "p2"})
+        bus.publish("tokens_minted", {"amount": 1.5})
+        event_type, data = parse(await pending)
+        await stream.aclose()
+        return event_type, data
+    event_type, data = asyncio.run(scenario())
+    assert event_type == "stats_delta"
+    assert data == {"papers": 2, "citations": 0, "minted": 1.5, "burned": 0.0, "totals": {"total_papers": 2}}
+
+def test_slow_consumer_is_dropped_with_overflow_notice():
+    async def scenario():
+        bus = EventBus(queue_size=1)
+        stream = sse_stream(bus)
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        for i in range(3):
+            bus.publish("citation_added", {"id": f"c{i}"})
+        messages = [await pending, await stream.__anext__()]
+        await stream.aclose()
+        return bus, [parse(message)[0] for message in messages]
+    bus, event_types = asyncio.run(scenario())
+    assert event_types == ["citation_added", "overflow"]
+    assert bus.stats()["dropped_subscribers"] == 1
@@ -0,0 +1,46 @@
+import asyncio
+import gzip
+import json
+from src.export import ndjson_stream, gzip_stream
+from src.models import Paper
+from src import api
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+def paged(items):
+    def fetch_page(limit, after):
+        start = after or 0
+        end = start + limit
+        return items[start:end], (end if end < len(items) else None)
+    return fetch_page
+
+def test_ndjson_stream_emits_one_chunk_per_page():
+    papers = [Paper(title=f"p{i}", authors=["a"]) for i in range(5)]
+    chunks = asyncio.run(collect(ndjson_stream(paged(papers), chunk_size=2)))
+    assert len(chunks) == 3
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line)["title"] for line in lines] == [f"p{i}" for i in range(5)]
+    assert asyncio.run(collect(ndjson_stream(paged([]), chunk_size=2))) == []
+
+def test_gzip_stream_round_trips():
+    papers = [Paper(title=f"p{i}", authors=["a"]) for i in range(5)]
+    plain = b"".join(asyncio.run(collect(ndjson_stream(paged(papers), chunk_size=2))))
+    compressed = b"".join(asyncio.run(collect(gzip_stream(ndjson_stream(paged(papers), chunk_size=2)))))
+    assert gzip.decompress(compressed) == plain
+
+def test_export_endpoint_streams_all_papers(client):
+    client.get("/papers")
+    titles = [f"paper-{i}" for i in range(5)]
+    for title in titles:
+        api.shared_state.record("paper", Paper(title=title, authors=["a"]))
+    
+    response = client.get("/export/papers.ndjson", params={"chunk_size": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(json.loads(line)["title"] for line in response.text.splitlines()) == titles
+    
+    compressed = client.get("/export/papers.ndjson", params={"chunk_size": 2, "compress": "true"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.text == response.text
+    assert client.get("/export/unknown.ndjson").status_code == 422
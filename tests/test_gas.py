@@ -0,0 +1,130 @@
+import asyncio
+import math
+import pytest
+import gas
+from gas import AsyncGasOracle, GasOracle
+
+SENDER = "0x" + "1" * 40
+OTHER_SENDER = "0x" + "2" * 40
+
+class FakeCall:
+    def __init__(self, fn_name, *args, estimate=50000, address="0x" + "9" * 40):
+        self.address = address
+        self.fn_name = fn_name
+        self.args = args
+        self.estimate = estimate
+        self.estimates = 0
+
+    def estimate_gas(self, transaction):
+        self.estimates += 1
+        return self.estimate
+
+class FakeEth:
+    def __init__(self):
+        self.price_reads = 0
+
+    @property
+    def gas_price(self):
+        self.price_reads += 1
+        return 10 ** 9
+
+class FakeW3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+def receipt(tx_hash, gas_used, status=1, block=1):
+    return {"transactionHash": tx_hash, "gasUsed": gas_used, "status": status, "blockNumber": block}
+
+@pytest.fixture
+def oracle():
+    return GasOracle(FakeW3(), margin=1.2)
+
+def test_estimates_cached_by_argument_shape(oracle):
+    first = FakeCall("setIdentity", "ipfs://a")
+    second = FakeCall("setIdentity", "ipfs://b")
+    assert oracle.gas_limit(first, SENDER, 1) == math.ceil(50000 * 1.2)
+    assert oracle.gas_limit(second, SENDER, 1) == math.ceil(50000 * 1.2)
+    assert (first.estimates, second.estimates) == (1, 0)
+    # 长度数量级不同的参数单独估算
+    longer = FakeCall("setIdentity", "ipfs://" + "x" * 100)
+    oracle.gas_limit(longer, SENDER, 1)
+    assert longer.estimates == 1
+
+def test_receipts_ratchet_estimates_upward(oracle):
+    call = FakeCall("setIdentity", "ipfs://a")
+    limit = oracle.gas_limit(call, SENDER, 1)
+    oracle.track(b"\x01", call, SENDER, limit)
+    assert oracle.observe_receipt(receipt(b"\x01", 55000)) is None
+    assert oracle.gas_limit(call, SENDER, 1) == math.ceil(55000 * 1.2)
+    oracle.track(b"\x02", call, SENDER, limit)
+    oracle.observe_receipt(receipt(b"\x02", 30000))
+    assert oracle.gas_limit(call, SENDER, 1) == math.ceil(55000 * 1.2)
+    assert call.estimates == 1
+
+def test_out_of_gas_drops_estimate_and_returns_retry(oracle):
+    call = FakeCall("setIdentity", "ipfs://a")
+    limit = oracle.gas_limit(call, SENDER, 1)
+    signer = object()
+    oracle.track(b"\x01", call, SENDER, limit, (signer, call, 1))
+    assert oracle.observe_receipt(receipt(b"\x01", limit, status=0)) == (signer, call, 1)
+    assert oracle.stats()["out_of_gas"] == 1
+    call.estimate = 80000
+    assert oracle.gas_limit(call, SENDER, 1) == math.ceil(80000 * 1.2)
+    assert call.estimates == 2
+    # 回滚但未耗尽gas的交易不重发
+    oracle.track(b"\x02", call, SENDER, 96000, (signer, call, 1))
+    assert oracle.observe_receipt(receipt(b"\x02", 40000, status=0)) is None
+
+def test_state_dependent_estimates_cached_per_sender_and_arguments(oracle, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gas.time, "monotonic", lambda: now[0])
+    call = FakeCall("addCitation", "0x" + "3" * 40)
+    oracle.gas_limit(call, SENDER, 1)
+    oracle.gas_limit(call, SENDER, 1)
+    assert call.estimates == 1
+    oracle.gas_limit(call, OTHER_SENDER, 1)
+    assert call.estimates == 2
+    other_args = FakeCall("addCitation", "0x" + "4" * 40)
+    oracle.gas_limit(other_args, SENDER, 1)
+    assert other_args.estimates == 1
+
+    now[0] += oracle.state_ttl + 1
+    oracle.gas_limit(call, SENDER, 1)
+    assert call.estimates == 3
+    # 过期条目在写入新估算时清理
+    assert oracle.stats()["cached_state_estimates"] == 1
+
+def test_pending_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gas.time, "monotonic", lambda: now[0])
+    oracle = GasOracle(FakeW3(), pending_ttl=60, max_pending=2)
+    call = FakeCall("setIdentity", "ipfs://a")
+    oracle.track(b"\x01", call, SENDER, 1, (object(), call, 1))
+    now[0] += 61
+    oracle.track(b"\x02", call, SENDER, 1)
+    assert oracle.stats()["pending"] == 1
+    assert oracle.observe_receipt(receipt(b"\x01", 1, status=0)) is None
+    for tx_hash in (b"\x03", b"\x04"):
+        oracle.track(tx_hash, call, SENDER, 1)
+    assert oracle.stats()["pending"] == 2
+
+def test_async_gas_price_cached_until_new_block():
+    class AsyncEth(FakeEth):
+        @property
+        def gas_price(self):
+            async def value():
+                return FakeEth.gas_price.fget(self)
+            return value()
+
+    w3 = FakeW3()
+    w3.eth = AsyncEth()
+    oracle = AsyncGasOracle(w3, price_ttl=60)
+
+    async def scenario():
+        await oracle.gas_price()
+        await oracle.gas_price()
+        assert w3.eth.price_reads == 1
+        oracle.observe_receipt(receipt(b"\x01", 1, block=5))
+        await oracle.gas_price()
+        assert w3.eth.price_reads == 2
+    asyncio.run(scenario())
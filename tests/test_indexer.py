@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from indexer import ChainView, EventIndexer
+
+TOKEN_ADDRESS = "0x" + "9" * 40
+TOPIC = b"\x01" * 32
+
+def address(n):
+    return "0x" + str(n) * 40
+
+class Event:
+    def __call__(self):
+        return self
+
+    def process_log(self, log):
+        return {"args": log["args"]}
+
+class Entry:
+    name = "AuthorToken"
+    address = TOKEN_ADDRESS
+    topics = {name: bytes([index + 1]) * 32 for index, name in
+              enumerate(("AuthorRegistered", "CitationAdded", "TokensMinted", "PageRankUpdated"))}
+    contract = SimpleNamespace(events={name: Event() for name in topics})
+
+class Registry:
+    def entry(self, name):
+        return Entry() if name == "AuthorToken" else None
+
+class FakeChain:
+    """每个区块注册若干作者；fork 的区块使用不同的哈希"""
+
+    def __init__(self):
+        self.blocks = []  # [(区块哈希, 作者列表)]
+        self.max_logs = None  # 单次查询允许的最大区块范围，超出时报错
+
+    def mine(self, *authors, fork=0):
+        number = len(self.blocks)
+        self.blocks.append((bytes([number, fork]) * 16, authors))
+
+    def reorg(self, depth, *blocks):
+        del self.blocks[len(self.blocks) - depth:]
+        for authors in blocks:
+            self.mine(*authors, fork=1)
+
+class FakeEth:
+    def __init__(self, chain):
+        self.chain = chain
+        self.queries = []
+
+    @property
+    def block_number(self):
+        async def value():
+            return len(self.chain.blocks) - 1
+        return value()
+
+    async def get_block(self, number):
+        if number >= len(self.chain.blocks):
+            raise ValueError("block not found")
+        return {"hash": self.chain.blocks[number][0]}
+
+    async def get_logs(self, log_filter):
+        start, end = log_filter["fromBlock"], log_filter["toBlock"]
+        if self.chain.max_logs is not None and end - start + 1 > self.chain.max_logs:
+            raise ValueError("query returned more than 10000 results")
+        self.queries.append((start, end))
+        logs = []
+        for number in range(start, min(end, len(self.chain.blocks) - 1) + 1):
+            block_hash, authors = self.chain.blocks[number]
+            for index, author in enumerate(authors):
+                logs.append({"address": TOKEN_ADDRESS, "topics": [TOPIC], "args": {"author": author},
+                             "blockNumber": number, "logIndex": index,
+                             "transactionHash": bytes([number, index]) * 16, "blockHash": block_hash})
+        return logs
+
+@pytest.fixture
+def chain():
+    return FakeChain()
+
+def make_indexer(chain, path, **kwargs):
+    return EventIndexer(SimpleNamespace(eth=FakeEth(chain)), Registry(), str(path), **kwargs)
+
+def test_reorg_rolls_back_to_fork_and_reindexes(chain, tmp_path):
+    db = tmp_path / "index.db"
+
+    async def scenario():
+        indexer = make_indexer(chain, db)
+        await indexer.open()
+        chain.mine(address(1))
+        chain.mine(address(2))
+        chain.mine(address(3))
+        assert await indexer.sync_once() == 3
+        assert indexer.view.author_addresses() == [address(1), address(2), address(3)]
+        assert indexer.covers(2)
+
+        # 最后两个区块被替换，新链上只有一个新作者
+        chain.reorg(2, [address(4)], [])
+        await indexer.sync_once()
+        assert indexer.reorgs == 1
+        assert indexer.view.author_addresses() == [address(1), address(4)]
+        assert indexer.checkpoint[0] == 2
+        await indexer.close()
+
+        reopened = make_indexer(chain, db)
+        await reopened.open()
+        assert reopened.view.author_addresses() == [address(1), address(4)]
+        assert reopened.checkpoint == indexer.checkpoint
+        await reopened.close()
+
+    asyncio.run(scenario())
+
+def test_reorg_past_retained_blocks_reindexes_from_start(chain, tmp_path):
+    async def scenario():
+        indexer = make_indexer(chain, tmp_path / "index.db", reorg_window=0)
+        await indexer.open()
+        chain.mine(address(1))
+        chain.mine(address(2))
+        await indexer.sync_once()
+        # 节点重置：所有区块都不同
+        chain.reorg(2, [address(3)], [])
+        await indexer.sync_once()
+        assert indexer.view.author_addresses() == [address(3)]
+        await indexer.close()
+
+    asyncio.run(scenario())
+
+def test_block_range_shrinks_when_node_rejects_query(chain, tmp_path):
+    async def scenario():
+        indexer = make_indexer(chain, tmp_path / "index.db", initial_range=8)
+        await indexer.open()
+        for n in range(6):
+            chain.mine(address(n % 10))
+        chain.max_logs = 2
+        await indexer.sync_once()
+        assert indexer.checkpoint[0] == 5
+        assert len(indexer.view.author_addresses()) == 6
+        assert all(end - start + 1 <= 2 for start, end in indexer.w3.eth.queries)
+        await indexer.close()
+
+    asyncio.run(scenario())
+
+def test_withdrawal_keeps_share_amount():
+    view = ChainView()
+    author = address(1)
+    view.apply("ProfitDistribution", "AuthorShareCalculated",
+               {"distributionId": 1, "author": author, "sharePercentage": 40})
+    view.apply("ProfitDistribution", "ProfitDistributed", {"distributionId": 1, "totalAmount": 1000})
+    view.apply("ProfitDistribution", "AuthorWithdrawal", {"distributionId": 1, "author": author, "amount": 999})
+    assert view.author_share(1, author) == (author, 40, 400, True)
+
+def test_back_reads_live_until_index_covers_own_write(back, monkeypatch):
+    indexer = SimpleNamespace(ready=True, checkpoint=(10, "0x"))
+    indexer.covers = lambda block: EventIndexer.covers(indexer, block)
+    monkeypatch.setattr(back, "READ_FROM_INDEX", True)
+    monkeypatch.setattr(back, "indexer", indexer)
+    monkeypatch.setattr(back, "latest_write_block", -1)
+    assert back.index_ready()
+    back.note_write([{"blockNumber": 12}, {"blockNumber": 11}])
+    assert back.latest_write_block == 12
+    assert not back.index_ready()
+    indexer.checkpoint = (12, "0x")
+    assert back.index_ready()
@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from src.auth import AuthSystem
+from src.citation_network import CitationNetwork
+from src.jobs import FAILED, PENDING, SETTLED, MintJobQueue
+from src.models import Author, Citation, Paper
+from src.repository import SQLiteRepository
+from src.state import SharedState
+from src.token_system import TokenSystem
+
+class Worker:
+    def __init__(self, backend):
+        citation_network = CitationNetwork()
+        self.token_system = TokenSystem(citation_network)
+        self.state = SharedState(backend, AuthSystem(session_secret=b"secret"), citation_network, self.token_system)
+        self.jobs = MintJobQueue(self.state, self.token_system, window=0)
+        self.state.sync()
+
+    def balance(self, author_id):
+        return self.token_system.get_author_balance(author_id)
+
+    def stored_balance(self, author_id):
+        """实体表中持久化的余额"""
+        with self.state.backend.pool.connection() as conn:
+            return conn.execute("SELECT token_balance FROM authors WHERE id = ?", (author_id,)).fetchone()[0]
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "state.db")
+
+def seed(worker):
+    """一位被引作者的一篇论文，以及引用它的三篇论文"""
+    cited_author = Author(name="cited", public_key="pk-cited")
+    citing_author = Author(name="citing", public_key="pk-citing")
+    worker.state.record_many("author", [cited_author, citing_author])
+    cited = Paper(title="cited", authors=[cited_author.id])
+    citing = [Paper(title=f"citing-{i}", authors=[citing_author.id]) for i in range(3)]
+    worker.state.record_many("paper", [cited] + citing)
+    return cited_author, cited, citing
+
+def sequential_total(token_system, counts):
+    return sum(token_system.calculate_citation_curve(n) for n in counts)
+
+def test_batch_matches_sequential_minting_with_duplicate_citations(path):
+    worker = Worker(SQLiteRepository(path))
+    cited_author, cited, citing = seed(worker)
+
+    async def run():
+        # 同一篇论文重复引用三次：被引次数保持为1，逐条铸币时每次都按 curve(1) 计算
+        for _ in range(3):
+            citation = Citation(citing_paper_id=citing[0].id, cited_paper_id=cited.id)
+            await worker.state.record_async("citation", citation)
+            worker.jobs.submit(citation.id)
+        await worker.jobs.settle_pending()
+
+    asyncio.run(run())
+    assert worker.balance(cited_author.id) == pytest.approx(sequential_total(worker.token_system, [1, 1, 1]))
+    assert worker.jobs.stats()["settled"] == 3
+
+def test_unsettled_jobs_recovered_after_restart(path):
+    first = Worker(SQLiteRepository(path))
+    cited_author, cited, citing = seed(first)
+    # 引用已写入，但进程在结算前退出
+    citations = [Citation(citing_paper_id=paper.id, cited_paper_id=cited.id) for paper in citing]
+    first.state.record_many("citation", citations)
+    assert all(first.jobs.get(c.id).status == PENDING for c in citations)
+
+    restarted = Worker(SQLiteRepository(path))
+
+    async def run():
+        assert restarted.jobs.resume() == 3
+        assert restarted.jobs.resume() == 0
+        await restarted.jobs.settle_pending()
+
+    asyncio.run(run())
+    expected = sequential_total(restarted.token_system, [1, 2, 3])
+    assert restarted.balance(cited_author.id) == pytest.approx(expected)
+
+    # 再次重启时所有任务都已结算
+    again = Worker(SQLiteRepository(path))
+    assert all(again.jobs.get(c.id).status == SETTLED for c in citations)
+    assert again.balance(cited_author.id) == pytest.approx(expected)
+    assert again.stored_balance(cited_author.id) == pytest.approx(expected)
+
+def test_duplicate_settlement_is_ignored(path):
+    workers = [Worker(SQLiteRepository(path)) for _ in range(2)]
+    cited_author, cited, citing = seed(workers[0])
+    citation = Citation(citing_paper_id=citing[0].id, cited_paper_id=cited.id)
+    workers[0].state.record("citation", citation)
+    workers[1].state.sync()
+
+    async def run():
+        # 两个进程都认为任务未结算：结算前的同步看不到对方的写入
+        for worker in workers:
+            worker.jobs.resume()
+        for worker in workers:
+            worker.state.sync_async = _no_sync
+        for worker in workers:
+            await worker.jobs.settle_pending()
+
+    asyncio.run(run())
+    for worker in workers:
+        worker.state.sync()
+        assert worker.balance(cited_author.id) == pytest.approx(sequential_total(worker.token_system, [1]))
+        assert worker.jobs.get(citation.id).status == SETTLED
+    assert workers[0].stored_balance(cited_author.id) == pytest.approx(
+        sequential_total(workers[0].token_system, [1]))
+
+async def _no_sync():
+    return 0
+
+def test_failed_settlement_is_retried(path):
+    worker = Worker(SQLiteRepository(path))
+    cited_author, cited, citing = seed(worker)
+    citation = Citation(citing_paper_id=citing[0].id, cited_paper_id=cited.id)
+    worker.state.record("citation", citation)
+    record_async = worker.state.record_async
+    failures = []
+
+    async def flaky_record(kind, payload):
+        if len(failures) < 1:
+            failures.append(kind)
+            raise RuntimeError("database is locked")
+        await record_async(kind, payload)
+
+    async def run():
+        worker.state.record_async = flaky_record
+        worker.jobs.submit(citation.id)
+        await worker.jobs.settle_pending()
+        job = worker.jobs.get(citation.id)
+        assert job.status == PENDING and job.attempts == 1
+        await worker.jobs.settle_pending()
+
+    asyncio.run(run())
+    assert worker.jobs.get(citation.id).status == SETTLED
+    assert worker.jobs.stats()["retried"] == 1
+
+def test_job_fails_after_max_attempts(path):
+    worker = Worker(SQLiteRepository(path))
+    cited_author, cited, citing = seed(worker)
+    citation = Citation(citing_paper_id=citing[0].id, cited_paper_id=cited.id)
+    worker.state.record("citation", citation)
+
+    async def broken_record(kind, payload):
+        raise RuntimeError("disk full")
+
+    async def run():
+        worker.state.record_async = broken_record
+        worker.jobs.submit(citation.id)
+        for _ in range(worker.jobs.max_attempts):
+            await worker.jobs.settle_pending()
+
+    asyncio.run(run())
+    job = worker.jobs.get(citation.id)
+    assert job.status == FAILED and job.error == "disk full"
+    assert worker.jobs.stats()["pending"] == 0
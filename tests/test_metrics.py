@@ -0,0 +1,48 @@
+from src.metrics import MetricsRegistry, timed, FUNCTION_DURATION
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "/papers")
+    lines = registry.render().splitlines()
+    
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/papers",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/papers",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/papers",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/papers"} 2.65' in lines
+    assert 'latency_seconds_count{route="/papers"} 4' in lines
+
+def test_registration_is_idempotent_and_labels_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events", ["kind"])
+    assert registry.counter("events_total", "Events", ["kind"]) is counter
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    assert 'events_total{kind="a\\"b"} 3.0' in registry.render().splitlines()
+    
+    registry.callback_gauge("size", "Size", ["store"], lambda: [(("papers",), 1)])
+    registry.callback_gauge("size", "Size", ["store"], lambda: [(("papers",), 5)])
+    assert 'size{store="papers"} 5.0' in registry.render().splitlines()
+
+def test_timed_records_function_latency():
+    @timed("test_timed_fn")
+    def fn():
+        return 1
+    fn()
+    fn()
+    assert 'citation_function_duration_seconds_count{function="test_timed_fn"} 2' in FUNCTION_DURATION.samples()
+
+def test_metrics_endpoint_labels_requests_by_route_template(client):
+    client.get("/papers/missing")
+    client.get("/papers/other")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    counts = [line for line in lines
+              if line.startswith('http_request_duration_seconds_count{method="GET",route="/papers/{paper_id}",status="404"}')]
+    assert counts
+    assert not any("/papers/missing" in line for line in lines)
+    assert any(line.startswith("citation_store_size") for line in lines)
@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+from nonces import AsyncNonceManager, NonceManager, is_nonce_error
+
+ADDRESS = "0x" + "1" * 40
+
+class SignedTransaction:
+    def __init__(self, transaction):
+        self.rawTransaction = transaction
+
+class FakeAccount:
+    address = ADDRESS
+
+    def sign_transaction(self, transaction):
+        return SignedTransaction(transaction)
+
+class FakeEth:
+    """pending交易数从 node_nonce 开始；failures 中的错误依次在发送时抛出"""
+
+    def __init__(self, node_nonce=5, failures=()):
+        self.node_nonce = node_nonce
+        self.failures = list(failures)
+        self.count_reads = 0
+        self.sent = []
+
+    def get_transaction_count(self, address, block_identifier):
+        self.count_reads += 1
+        return self.node_nonce
+
+    def send_raw_transaction(self, raw_transaction):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append(raw_transaction["nonce"])
+        self.node_nonce = max(self.node_nonce, raw_transaction["nonce"] + 1)
+        return bytes([raw_transaction["nonce"]])
+
+class FakeW3:
+    def __init__(self, eth):
+        self.eth = eth
+
+def build(nonce):
+    return {"nonce": nonce}
+
+def test_nonces_allocated_locally_after_one_read():
+    eth = FakeEth()
+    manager = NonceManager(FakeW3(eth))
+    for _ in range(3):
+        manager.send(FakeAccount(), build)
+    assert eth.sent == [5, 6, 7]
+    assert eth.count_reads == 1
+
+def test_nonce_error_resyncs_from_node():
+    eth = FakeEth()
+    manager = NonceManager(FakeW3(eth))
+    manager.send(FakeAccount(), build)
+    # 其他进程用同一账户发送了交易，节点的pending计数已前进
+    eth.node_nonce = 9
+    eth.failures = [ValueError("nonce too low")]
+    manager.send(FakeAccount(), build)
+    assert eth.sent == [5, 9]
+    assert eth.count_reads == 2
+
+def test_nonce_errors_give_up_after_max_retries():
+    eth = FakeEth(failures=[ValueError("nonce too low")] * 3)
+    manager = NonceManager(FakeW3(eth), max_retries=2)
+    with pytest.raises(ValueError):
+        manager.send(FakeAccount(), build)
+    assert eth.count_reads == 3
+
+def test_failed_send_releases_last_nonce():
+    eth = FakeEth(failures=[ValueError("insufficient funds")])
+    manager = NonceManager(FakeW3(eth))
+    with pytest.raises(ValueError):
+        manager.send(FakeAccount(), build)
+    manager.send(FakeAccount(), build)
+    assert eth.sent == [5]
+    assert eth.count_reads == 1
+
+def test_releasing_an_earlier_nonce_resyncs():
+    manager = NonceManager(FakeW3(FakeEth()))
+    first = manager.allocate(ADDRESS)
+    manager.allocate(ADDRESS)
+    # 释放的不是最后分配的nonce，回收会留下空洞，改为下次从节点读取
+    manager.release(ADDRESS, first)
+    assert ADDRESS not in manager._next
+
+def test_concurrent_async_sends_get_distinct_nonces():
+    class AsyncEth(FakeEth):
+        async def get_transaction_count(self, address, block_identifier):
+            await asyncio.sleep(0)
+            return FakeEth.get_transaction_count(self, address, block_identifier)
+
+        async def send_raw_transaction(self, raw_transaction):
+            await asyncio.sleep(0)
+            return FakeEth.send_raw_transaction(self, raw_transaction)
+
+    async def async_build(nonce):
+        return build(nonce)
+
+    eth = AsyncEth()
+    manager = AsyncNonceManager(FakeW3(eth))
+
+    async def scenario():
+        return await asyncio.gather(*(manager.send(FakeAccount(), async_build) for _ in range(10)))
+
+    asyncio.run(scenario())
+    assert sorted(eth.sent) == list(range(5, 15))
+    assert eth.count_reads == 1
+
+@pytest.mark.parametrize("message,expected", [
+    ("nonce too low: next nonce 9, tx nonce 5", True),
+    ("Known transaction: already known", True),
+    ("replacement transaction underpriced", True),
+    ("insufficient funds for gas * price + value", False),
+])
+def test_is_nonce_error(message, expected):
+    assert is_nonce_error(ValueError(message)) is expected
+
+class FakeFunctions:
+    def __init__(self, submitted):
+        self.submitted = submitted
+
+    def getAuthorInfo(self, address):
+        class Call:
+            async def call(self):
+                return (address, 0, 0, False)
+        return Call()
+
+    def __getattr__(self, name):
+        return lambda *args: name
+
+class FakeContract:
+    def __init__(self, submitted):
+        self.functions = FakeFunctions(submitted)
+
+@pytest.fixture
+def registration(back, monkeypatch, tmp_path):
+    """register_author 的链上依赖替身；statuses 为依次提交的交易的回执状态"""
+    from types import SimpleNamespace
+    from authors import AuthorDirectory
+
+    def install(statuses):
+        submitted = []
+        statuses = list(statuses)
+
+        class Account:
+            @staticmethod
+            def from_key(private_key):
+                return SimpleNamespace(address=ADDRESS)
+
+            @staticmethod
+            def sign_message(message, private_key):
+                return SimpleNamespace(r=1, s=2)
+
+        async def yes(*args):
+            return True
+
+        async def submit_transaction(private_key, function_call, gas, retry=True):
+            submitted.append(function_call)
+            return bytes([len(submitted)])
+
+        async def wait_for_receipts(tx_hashes):
+            return [SimpleNamespace(status=statuses.pop(0)) for _ in tx_hashes]
+
+        directory = AuthorDirectory(str(tmp_path / "authors.log"))
+        monkeypatch.setattr(back, "Account", Account)
+        monkeypatch.setattr(back, "encode_defunct", lambda text: text)
+        monkeypatch.setattr(back, "load_contract", lambda name: FakeContract(submitted))
+        monkeypatch.setattr(back, "check_contract_deployed", yes)
+        monkeypatch.setattr(back, "check_balance", yes)
+        monkeypatch.setattr(back, "submit_transaction", submit_transaction)
+        monkeypatch.setattr(back, "wait_for_receipts", wait_for_receipts)
+        monkeypatch.setattr(back, "author_directory", directory)
+        return submitted, directory
+    return install
+
+def test_identity_registered_after_author(back, registration):
+    submitted, directory = registration([1, 1])
+    assert asyncio.run(back.register_author("0xkey")) is True
+    assert submitted == ["registerAuthor", "registerIdentity"]
+    assert ADDRESS in directory
+
+def test_identity_not_sent_when_author_registration_fails(back, registration):
+    submitted, directory = registration([0])
+    assert asyncio.run(back.register_author("0xkey")) is False
+    assert submitted == ["registerAuthor"]
+    assert ADDRESS not in directory
+
+def test_failed_identity_reports_partial_registration(back, registration):
+    submitted, directory = registration([1, 0])
+    assert asyncio.run(back.register_author("0xkey")) is False
+    assert submitted == ["registerAuthor", "registerIdentity"]
+    # 作者注册已上链，目录中保留该作者
+    assert ADDRESS in directory
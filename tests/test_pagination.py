@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+import base64
+import json
+import pytest
+from src.pagination import decode_cursor, encode_cursor, paginate
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def test_cursor_round_trip():
+    created = datetime(2024, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor("created_at", (created, "a")), "created_at") == (created, "a")
+    assert decode_cursor(encode_cursor("citation_count", (7, "b")), "citation_count") == (7, "b")
+
+@pytest.mark.parametrize("sort, payload", [
+    ("created_at", ["created_at", 5, "x"]),
+    ("created_at", ["created_at", "not a date", "x"]),
+    ("created_at", ["created_at", datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(), "x"]),
+    ("citation_count", ["citation_count", "abc", "x"]),
+    ("citation_count", ["citation_count", 1.5, "x"]),
+    ("citation_count", ["citation_count", True, "x"]),
+    ("citation_count", ["citation_count", 3, None]),
+    ("citation_count", ["created_at", 3, "x"]),
+    ("created_at", ["created_at", "2024-01-01T00:00:00"]),
+])
+def test_invalid_cursor_values_rejected(sort, payload):
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor(payload), sort)
+
+def test_garbage_cursor_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("!!not-base64!!", "created_at")
+
+def test_paginate_ascending_and_descending():
+    keys = [(n, f"id-{n}") for n in range(5)]
+    page, next_key = paginate(keys, 2)
+    assert page == keys[:2] and next_key == keys[1]
+    page, next_key = paginate(keys, 2, after=next_key)
+    assert page == keys[2:4] and next_key == keys[3]
+    page, next_key = paginate(keys, 2, after=next_key)
+    assert page == keys[4:] and next_key is None
+
+    page, next_key = paginate(keys, 3, descending=True)
+    assert page == keys[:1:-1] and next_key == keys[2]
+    page, next_key = paginate(keys, 3, after=next_key, descending=True)
+    assert page == [keys[1], keys[0]] and next_key is None
@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import api
+from src.config import AppConfig
+from src.encoding import SnapshotCache
+from src.rate_limit import TokenBucketLimiter
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.rate_limit.time.monotonic", lambda: now[0])
+    return now
+
+def test_bucket_allows_burst_then_refills(clock):
+    limiter = TokenBucketLimiter(rate=2.0, burst=3.0)
+    assert all(limiter.acquire("k") for _ in range(3))
+    assert not limiter.acquire("k")
+    assert limiter.retry_after("k") == pytest.approx(0.5)
+    # 其他键拥有独立的令牌桶
+    assert limiter.acquire("other")
+    
+    clock[0] += 0.5
+    assert limiter.acquire("k")
+    assert not limiter.acquire("k")
+    stats = limiter.stats()
+    assert (stats['allowed'], stats['rejected']) == (5, 2)
+
+def test_least_recently_active_buckets_are_evicted(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1.0, max_buckets=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+    assert limiter.stats()['tracked_keys'] == 2
+    assert limiter.retry_after("a") == 0.0
+    assert limiter.retry_after("c") == pytest.approx(1.0)
+
+def test_signed_request_over_limit_is_rejected_before_verification(monkeypatch):
+    api.snapshot_cache = SnapshotCache()
+    config = AppConfig(state_backend="memory", warm_start=False, access_log_sample_rate=0.0,
+                       rate_limit_key_rate=0.01, rate_limit_key_burst=1.0)
+    with TestClient(api.create_app(config)) as client:
+        client.get("/papers")
+        calls = []
+        monkeypatch.setattr(api.auth_system, "verify_author", lambda *args, **kwargs: calls.append(args) or False)
+        headers = {"key-id": "a" * 64, "signature": "sig", "message": "m"}
+        paper = {"title": "t", "abstract": "a", "authors": []}
+        
+        assert client.post("/papers", json=paper, headers=headers).status_code == 401
+        limited = client.post("/papers", json=paper, headers=headers)
+        assert limited.status_code == 429
+        assert int(limited.headers["Retry-After"]) > 0
+        assert len(calls) == 1
+        # 同一IP的其他公钥仍可通过
+        other = dict(headers, **{"key-id": "b" * 64})
+        assert client.post("/papers", json=paper, headers=other).status_code == 401
@@ -0,0 +1,80 @@
+import json
+import types
+import pytest
+import registry
+from registry import ContractRegistry, abi_signature
+
+ABI = [
+    {"type": "function", "name": "addCitation",
+     "inputs": [{"type": "address"}, {"type": "string"}]},
+    {"type": "function", "name": "setShares",
+     "inputs": [{"type": "tuple[]", "components": [{"type": "address"}, {"type": "uint256"}]}]},
+    {"type": "event", "name": "CitationAdded", "inputs": [{"type": "bytes32"}]},
+]
+
+ADDRESS = "0x" + "1" * 40
+
+
+class FakeEth:
+    chain_id = 31337
+
+    def __init__(self):
+        self.created = []
+
+    def contract(self, address, abi):
+        self.created.append(address)
+        return types.SimpleNamespace(address=address, abi=abi)
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    contract_dir = tmp_path / "artifacts" / "CitationNetwork.sol"
+    contract_dir.mkdir(parents=True)
+    (contract_dir / "CitationNetwork.json").write_text(json.dumps({"abi": ABI}))
+    monkeypatch.setattr(registry, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(registry, "DEPLOYMENTS_DIR", str(tmp_path / "deployments"))
+    return tmp_path
+
+
+def test_abi_signature_expands_tuples():
+    assert abi_signature(ABI[0]) == "addCitation(address,string)"
+    assert abi_signature(ABI[1]) == "setShares((address,uint256)[])"
+    assert abi_signature(ABI[2]) == "CitationAdded(bytes32)"
+
+
+def test_contract_is_loaded_once_from_manifest(artifacts):
+    manifest = artifacts / "deployed_addresses.json"
+    manifest.write_text(json.dumps({"CitationSystemModule#CitationNetwork": ADDRESS}))
+    w3 = types.SimpleNamespace(eth=FakeEth())
+    contracts = ContractRegistry(w3, manifest_path=str(manifest))
+
+    first = contracts.contract("CitationNetwork")
+    assert first.address == ADDRESS
+    assert contracts.contract("CitationNetwork") is first
+    assert w3.eth.created == [ADDRESS]
+    assert contracts.selector("CitationNetwork", "addCitation") == \
+        registry.Web3.keccak(text="addCitation(address,string)")[:4]
+    assert contracts.topic("CitationNetwork", "CitationAdded") == \
+        registry.Web3.keccak(text="CitationAdded(bytes32)")
+    assert contracts.entry_for_address(ADDRESS).name == "CitationNetwork"
+    assert contracts.entry_for_address("0x" + "2" * 40) is None
+
+
+def test_manifest_is_located_by_chain_id(artifacts):
+    chain_dir = artifacts / "deployments" / "chain-31337"
+    chain_dir.mkdir(parents=True)
+    (chain_dir / "deployed_addresses.json").write_text(
+        json.dumps({"CitationSystemModule#CitationNetwork": ADDRESS}))
+    contracts = ContractRegistry(types.SimpleNamespace(eth=FakeEth()))
+    assert contracts.contract("CitationNetwork").address == ADDRESS
+    assert contracts.chain_id == 31337
+
+
+def test_missing_artifact_or_address_returns_none(artifacts):
+    manifest = artifacts / "deployed_addresses.json"
+    manifest.write_text(json.dumps({}))
+    w3 = types.SimpleNamespace(eth=FakeEth())
+    contracts = ContractRegistry(w3, manifest_path=str(manifest))
+    assert contracts.contract("AuthorToken") is None
+    assert contracts.contract("CitationNetwork") is None
+    assert w3.eth.created == []
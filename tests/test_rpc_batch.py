@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from rpc_batch import AsyncBatchReader, BatchReader, RPCError, decode_batch, encode_request
+
+class FakeEntry:
+    address = "0x" + "1" * 40
+
+class FakeCall:
+    """按结果字符串解码的替身调用：结果不是十六进制数时解码失败"""
+
+    def __init__(self, function_name="getValue"):
+        self.entry = FakeEntry()
+        self.function_name = function_name
+
+    def calldata(self):
+        return "0x00"
+
+    def decode(self, result):
+        return int(result, 16)
+
+def make_payload(chunk, first_id=1):
+    return [encode_request(first_id + index, call) for index, call in enumerate(chunk)]
+
+def test_responses_matched_by_id_and_errors_isolated():
+    chunk = [FakeCall() for _ in range(4)]
+    payload = make_payload(chunk)
+    body = [
+        {"jsonrpc": "2.0", "id": 3, "result": "0xzz"},
+        {"jsonrpc": "2.0", "id": 2, "error": {"code": 3, "message": "execution reverted"}},
+        {"jsonrpc": "2.0", "id": 1, "result": "0x2a"},
+    ]
+    results = decode_batch(payload, chunk, body)
+    assert results[0] == 42
+    assert isinstance(results[1], RPCError) and "execution reverted" in str(results[1])
+    # 无法解码的结果只影响该位置
+    assert isinstance(results[2], RPCError) and "getValue" in str(results[2])
+    assert isinstance(results[3], RPCError) and "missing response" in str(results[3])
+
+def test_batch_rejected_with_single_error_object():
+    chunk = [FakeCall(), FakeCall()]
+    body = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch limit exceeded"}}
+    with pytest.raises(RPCError, match="batch limit exceeded"):
+        decode_batch(make_payload(chunk), chunk, body)
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+def echo_body(payload):
+    """按请求ID回显结果，结果值等于请求ID"""
+    return [{"jsonrpc": "2.0", "id": request["id"], "result": hex(request["id"])} for request in reversed(payload)]
+
+class FakeSession:
+    def __init__(self):
+        self.batches = []
+
+    def post(self, url, json=None, timeout=None):
+        self.batches.append(json)
+        return FakeResponse(echo_body(json))
+
+class FakeAsyncSession(FakeSession):
+    def post(self, url, json=None):
+        response = super().post(url, json=json)
+        async def body():
+            return response.body
+        response.json = body
+        return response
+
+def test_call_many_chunks_requests_and_keeps_order():
+    reader = BatchReader("http://node", chunk_size=2)
+    reader.session = FakeSession()
+    results = reader.call_many([FakeCall() for _ in range(5)])
+    assert results == [1, 2, 3, 4, 5]
+    assert [len(batch) for batch in reader.session.batches] == [2, 2, 1]
+
+def test_async_call_many_chunks_requests_and_keeps_order():
+    reader = AsyncBatchReader("http://node", session=FakeAsyncSession(), chunk_size=2)
+    results = asyncio.run(reader.call_many([FakeCall() for _ in range(5)]))
+    assert results == [1, 2, 3, 4, 5]
+    assert [len(batch) for batch in reader.session.batches] == [2, 2, 1]
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta
+from src.auth import AuthSystem
+from src.citation_network import CitationNetwork
+from src.models import Author, TokenTransaction
+from src.repository import SQLiteRepository
+from src.state import SharedState
+from src.storage import MemoryBackend
+from src.token_system import TokenSystem
+
+def make_worker(backend):
+    auth_system = AuthSystem(session_secret=b"secret")
+    citation_network = CitationNetwork()
+    token_system = TokenSystem(citation_network)
+    return SharedState(backend, auth_system, citation_network, token_system)
+
+def test_replay_into_second_worker(tmp_path):
+    path = str(tmp_path / "state.db")
+    first = make_worker(SQLiteRepository(path))
+    author = Author(name="Alice", public_key="pk", token_balance=10)
+    first.record("author", author)
+
+    second = make_worker(SQLiteRepository(path))
+    assert second.sync() == 1
+    assert second.token_system.get_author_balance(author.id) == 10
+    assert second.sync() == 0
+
+def test_concurrent_burns_cannot_overdraw(tmp_path):
+    path = str(tmp_path / "state.db")
+    workers = [make_worker(SQLiteRepository(path)) for _ in range(2)]
+    author = Author(name="Alice", public_key="pk", token_balance=10)
+    workers[0].record("author", author)
+    for worker in workers:
+        worker.sync()
+
+    # 两个worker都在本地副本上通过了余额检查
+    burns = [worker.token_system.build_burn_transaction(author.id, 8, "burn") for worker in workers]
+    assert all(burn is not None for burn in burns)
+    for worker, burn in zip(workers, burns):
+        worker.record("transaction", burn)
+    for worker in workers:
+        worker.sync()
+
+    for worker in workers:
+        assert worker.token_system.get_author_balance(author.id) == 2
+        assert not worker.token_system.is_rejected(burns[0].id)
+        assert worker.token_system.is_rejected(burns[1].id)
+    repository = workers[0].backend
+    with repository.pool.connection() as conn:
+        balance, = conn.execute("SELECT token_balance FROM authors WHERE id = ?", (author.id,)).fetchone()
+    assert balance == 2
+    assert [tx.id for tx in repository.get_author_token_history(author.id)] == [burns[0].id]
+
+def test_async_record_applies_each_change_once():
+    worker = make_worker(MemoryBackend())
+    authors = [Author(name=f"author-{i}", public_key=f"pk-{i}") for i in range(5)]
+
+    async def write_all():
+        await asyncio.gather(*(worker.record_async("author", author) for author in authors))
+        await asyncio.gather(worker.sync_async(), worker.sync_async())
+
+    asyncio.run(write_all())
+    assert worker.last_seq == 5
+    assert len(worker.token_system.authors) == 5
+    assert worker.token_system.version == 5
+
+def test_memory_backend_discards_applied_changes():
+    backend = MemoryBackend()
+    worker = make_worker(backend)
+    for i in range(3):
+        worker.record("author", Author(name=f"author-{i}", public_key=f"pk-{i}"))
+    assert len(backend) == 0
+    # 序号在丢弃后继续递增
+    assert backend.append("session_revoked", {"session_id": "s"}) == 4
+    assert [seq for seq, _, _ in backend.changes_since(3)] == [4]
+    assert worker.sync() == 1
+    assert len(backend) == 0
+    assert len(worker.token_system.authors) == 3
+
+def test_token_history_order_matches_memory(tmp_path):
+    worker = make_worker(SQLiteRepository(str(tmp_path / "state.db")))
+    author = Author(name="Alice", public_key="pk")
+    worker.record("author", author)
+    now = datetime.now()
+    # 创建时间与写入顺序相反（例如来自时钟较慢的另一个worker）
+    for offset in (2, 1, 3):
+        worker.record("transaction", TokenTransaction(author_id=author.id, amount=1.0, transaction_type="MINT",
+                                                      reason="test", created_at=now - timedelta(minutes=offset)))
+    expected = [tx.id for tx in worker.token_system.get_author_token_history(author.id)]
+    assert [tx.id for tx in worker.backend.get_author_token_history(author.id)] == expected
+    since = now - timedelta(minutes=2, seconds=30)
+    assert [tx.id for tx in worker.backend.get_author_token_history(author.id, since=since, limit=1)] == expected[:1]